@@ -8,6 +8,8 @@ from api.booking_service.routes import router as booking_router
 from api.practice_service.routes import router as practice_router
 from api.ai_service.routes import router as ai_router
 from api.patient_service.routes import router as patient_router
+from api.metrics_service.routes import router as metrics_router
+from api.search_service.routes import router as search_router
 router = APIRouter(prefix="/api/v1")
 
 
@@ -19,4 +21,6 @@ router.include_router(example_router)
 router.include_router(booking_router)
 router.include_router(practice_router)
 router.include_router(patient_router)
-router.include_router(ai_router)
\ No newline at end of file
+router.include_router(ai_router)
+router.include_router(metrics_router)
+router.include_router(search_router)
\ No newline at end of file
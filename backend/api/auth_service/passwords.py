@@ -0,0 +1,117 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from api.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+
+ALGORITHM = "scrypt"
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+
+
+def make_password(password: str) -> str:
+    """Encode a password as scrypt$n$r$p$salt$hash. CPU-heavy: call through password_hasher."""
+    salt = secrets.token_bytes(16)
+    derived = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=SCRYPT_DKLEN)
+    return "$".join([
+        ALGORITHM, str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+        base64.b64encode(salt).decode(), base64.b64encode(derived).decode(),
+    ])
+
+
+def check_password(password: str, encoded: str) -> bool:
+    """Verify a password against an encoded scrypt hash. CPU-heavy: call through password_hasher."""
+    _algorithm, n, r, p, salt, expected = encoded.split("$")
+    expected = base64.b64decode(expected)
+    derived = hashlib.scrypt(
+        password.encode(), salt=base64.b64decode(salt), n=int(n), r=int(r), p=int(p), dklen=len(expected)
+    )
+    return hmac.compare_digest(derived, expected)
+
+
+def is_hashed(encoded: Optional[str]) -> bool:
+    return bool(encoded) and encoded.startswith(ALGORITHM + "$")
+
+
+def needs_rehash(encoded: Optional[str]) -> bool:
+    """Legacy rows hold the plaintext password or a hash with outdated parameters"""
+    if not is_hashed(encoded):
+        return True
+    _algorithm, n, r, p, _salt, _hash = encoded.split("$")
+    return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+class PasswordHasherPool:
+    """Runs password hashing on a dedicated, size-limited process pool.
+
+    Keeping the KDF off the anyio threadpool means a login burst cannot starve
+    other run_in_threadpool calls. Submissions beyond max_pending are rejected
+    instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        # Only touched from the event loop thread
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs Django and the threadpool is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Exception("Too many sign-in requests in progress, please retry")
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(make_password, password)
+
+    async def verify(self, password: str, encoded: Optional[str]) -> bool:
+        if not encoded:
+            return False
+        if not is_hashed(encoded):
+            # Legacy plaintext row; cheap to compare, upgraded by the caller via needs_rehash
+            return hmac.compare_digest(password.encode(), encoded.encode())
+        return await self._run(check_password, password, encoded)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.pending,
+            "peak_queue_depth": self.peak_pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
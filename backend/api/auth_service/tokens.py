@@ -0,0 +1,130 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+from starlette.concurrency import run_in_threadpool
+
+from api.config import LOGGER_NAME, ACCESS_TOKEN_TTL_SECONDS, REVOCATION_RELOAD_INTERVAL_SECONDS
+from authapp.models import RevokedSession
+
+logger = logging.getLogger(LOGGER_NAME)
+
+PRACTITIONER = "practitioner"
+PATIENT = "patient"
+
+# sid -> unix time after which every access token of that session has expired anyway
+_revoked_sids = {}
+_revoked_lock = threading.Lock()
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    key = settings.ACCESS_TOKEN_SIGNING_KEY.encode()
+    return _b64encode(hmac.new(key, payload.encode(), hashlib.sha256).digest())
+
+
+def session_id(subject_type: str, session) -> str:
+    """Revocation key shared by every access token minted from one session"""
+    return f"{subject_type}:{session.id}"
+
+
+def is_access_token(token: Optional[str]) -> bool:
+    """Session tokens are url-safe base64 without dots; access tokens are payload.signature"""
+    return bool(token) and token.count(".") == 1
+
+
+def issue_access_token(subject_type: str, subject, sid: str, practice_id: Optional[int] = None, role: Optional[str] = None) -> str:
+    """Mint a short-lived HMAC-signed token that can be checked without touching the database"""
+    now = int(time.time())
+    claims = {
+        "typ": subject_type,
+        "sub": subject,
+        "pid": practice_id,
+        "role": role,
+        "sid": sid,
+        "iat": now,
+        "exp": now + ACCESS_TOKEN_TTL_SECONDS,
+        "jti": secrets.token_urlsafe(8),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_access_token(token: str, subject_type: str) -> Optional[dict]:
+    """Return the claims of a valid access token, or None when the token is not an access token at all.
+
+    Raises for tokens that are access tokens but are forged, expired, revoked or
+    were issued to the other kind of user.
+    """
+    if not is_access_token(token):
+        return None
+
+    payload, signature = token.split(".")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise Exception("Invalid access token")
+
+    claims = json.loads(_b64decode(payload))
+    if claims.get("typ") != subject_type:
+        raise Exception("Invalid access token")
+    if claims["exp"] <= time.time():
+        raise Exception("Access token expired")
+    if is_revoked(claims["sid"]):
+        raise Exception("Access token revoked")
+    return claims
+
+
+def is_revoked(sid: str) -> bool:
+    with _revoked_lock:
+        return sid in _revoked_sids
+
+
+def revoke_session(sid: str):
+    """Reject access tokens of a logged-out session until the last of them would have expired"""
+    expires_at = time.time() + ACCESS_TOKEN_TTL_SECONDS
+    with _revoked_lock:
+        _revoked_sids[sid] = expires_at
+    RevokedSession.objects.update_or_create(
+        sid=sid,
+        defaults={"expires_at": datetime.fromtimestamp(expires_at, tz=dt_timezone.utc)},
+    )
+
+
+def reload_revocations() -> int:
+    """Replace the in-memory revocation list with the live rows, pruning expired ones"""
+    now = timezone.now()
+    RevokedSession.objects.filter(expires_at__lte=now).delete()
+    revoked = {
+        sid: expires_at.timestamp()
+        for sid, expires_at in RevokedSession.objects.filter(expires_at__gt=now).values_list("sid", "expires_at")
+    }
+    with _revoked_lock:
+        _revoked_sids.clear()
+        _revoked_sids.update(revoked)
+    return len(revoked)
+
+
+async def run_revocation_refresher(interval_seconds: int = REVOCATION_RELOAD_INTERVAL_SECONDS):
+    """Background loop that picks up logouts made on other workers"""
+    while True:
+        try:
+            await run_in_threadpool(reload_revocations)
+        except Exception as e:
+            logger.error(f"Revocation list reload failed: {e}")
+        await asyncio.sleep(interval_seconds)
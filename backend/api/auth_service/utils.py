@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import logging
+import secrets
+from datetime import timedelta
+
+from django.utils import timezone
+from starlette.concurrency import run_in_threadpool
+
+from api.config import (
+    LOGGER_NAME, SESSION_TTL_DAYS, SESSION_SWEEP_INTERVAL_SECONDS, SESSION_SWEEP_BATCH_SIZE
+)
+from authapp.models import PractionerSession, PatientSession
+from .tokens import PRACTITIONER, PATIENT, verify_access_token, revoke_session, session_id
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def hash_token(token: str) -> str:
+    """Tokens are random, so a plain SHA-256 is enough to keep them out of the database"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _new_session(session_model, **owner):
+    token = secrets.token_urlsafe(32)
+    session = session_model.objects.create(
+        token_hash=hash_token(token),
+        expires_at=timezone.now() + timedelta(days=SESSION_TTL_DAYS),
+        **owner
+    )
+    return token, session
+
+
+def create_practitioner_session(practice_user):
+    """Open a new session for a practice user and return (bearer token, session)"""
+    return _new_session(PractionerSession, user=practice_user)
+
+
+def create_patient_session(patient):
+    """Open a new session for a patient and return (bearer token, session)"""
+    return _new_session(PatientSession, patient=patient)
+
+
+def get_practitioner_session(token: str):
+    """Return the live session (with its user) for a token, or None"""
+    if not token:
+        return None
+    return (
+        PractionerSession.objects
+        .select_related('user')
+        .filter(token_hash=hash_token(token), expires_at__gt=timezone.now())
+        .first()
+    )
+
+
+def get_patient_session(token: str):
+    """Return the live session (with its patient) for a token, or None"""
+    if not token:
+        return None
+    return (
+        PatientSession.objects
+        .select_related('patient')
+        .filter(token_hash=hash_token(token), expires_at__gt=timezone.now())
+        .first()
+    )
+
+
+def _end_session(token: str, subject_type: str, session_model, get_session):
+    claims = verify_access_token(token, subject_type)
+    if claims is not None:
+        sid = claims["sid"]
+        session_model.objects.filter(id=int(sid.split(":")[1])).delete()
+    else:
+        session = get_session(token)
+        if not session:
+            raise Exception("Session not found")
+        sid = session_id(subject_type, session)
+        session.delete()
+    # Access tokens minted from this session stay valid until revoked
+    revoke_session(sid)
+
+
+def end_practitioner_session(token: str):
+    """Log out a practice user's session given either its refresh token or an access token"""
+    _end_session(token, PRACTITIONER, PractionerSession, get_practitioner_session)
+
+
+def end_patient_session(token: str):
+    """Log out a patient's session given either its refresh token or an access token"""
+    _end_session(token, PATIENT, PatientSession, get_patient_session)
+
+
+def sweep_expired_sessions(batch_size: int = SESSION_SWEEP_BATCH_SIZE) -> int:
+    """Delete expired sessions in primary-key batches so no single statement locks the table for long"""
+    deleted = 0
+    now = timezone.now()
+    for session_model in (PractionerSession, PatientSession):
+        while True:
+            expired_ids = list(
+                session_model.objects
+                .filter(expires_at__lte=now)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not expired_ids:
+                break
+            session_model.objects.filter(id__in=expired_ids).delete()
+            deleted += len(expired_ids)
+            if len(expired_ids) < batch_size:
+                break
+    return deleted
+
+
+async def run_session_sweeper(interval_seconds: int = SESSION_SWEEP_INTERVAL_SECONDS):
+    """Background loop started with the app"""
+    while True:
+        try:
+            deleted = await run_in_threadpool(sweep_expired_sessions)
+            if deleted:
+                logger.info(f"Session sweeper removed {deleted} expired sessions")
+        except Exception as e:
+            logger.error(f"Session sweeper failed: {e}")
+        await asyncio.sleep(interval_seconds)
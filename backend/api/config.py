@@ -1,5 +1,100 @@
 MYSQL_DATABASE_CONNECTION = "mysql+pymysql://root@localhost:3306/apnacollege_db"
 LOGGER_NAME = "MedCN"
+
+# Practice auth token -> (user, practice, role) resolution cache
+AUTH_CACHE_MAX_ENTRIES = 10000
+AUTH_CACHE_TTL_SECONDS = 300
+
+# Login sessions (authapp)
+SESSION_TTL_DAYS = 30
+SESSION_SWEEP_INTERVAL_SECONDS = 3600
+SESSION_SWEEP_BATCH_SIZE = 500
+
+# Signed access tokens (api/auth_service/tokens.py)
+ACCESS_TOKEN_TTL_SECONDS = 900
+REVOCATION_RELOAD_INTERVAL_SECONDS = 30
+
+# Password KDF process pool (api/auth_service/passwords.py)
+PASSWORD_HASH_WORKERS = 2
+PASSWORD_HASH_MAX_PENDING = 64
+
+# Longest from/to window accepted by the availability endpoints
+AVAILABILITY_MAX_RANGE_DAYS = 62
+
+# Materialized CalendarSlot rows (api/practice_service/calendar.py). roll_calendar keeps
+# CALENDAR_HORIZON_WEEKS materialized; reads trust one week less so a missed nightly run is harmless.
+CALENDAR_HORIZON_WEEKS = 12
+CALENDAR_TRUSTED_WEEKS = CALENDAR_HORIZON_WEEKS - 1
+
+# Keyset-paginated list endpoints (api/pagination.py)
+PAGE_SIZE_DEFAULT = 20
+PAGE_SIZE_MAX = 100
+
+# Most occurrences a single recurring series booking may create
+SERIES_MAX_OCCURRENCES = 52
+
+# Booking holds (api/patient_service/holds.py)
+BOOKING_HOLD_TTL_SECONDS = 300
+BOOKING_HOLD_SWEEP_INTERVAL_SECONDS = 60
+BOOKING_HOLD_SWEEP_BATCH_SIZE = 500
+# How long a waitlisted patient has to confirm a freed slot before it moves down the queue
+WAITLIST_OFFER_TTL_SECONDS = 900
+
+# Notification outbox dispatcher (api/notification_service/dispatcher.py)
+NOTIFICATION_DISPATCH_INTERVAL_SECONDS = 5
+NOTIFICATION_BATCH_SIZE = 50
+NOTIFICATION_MAX_ATTEMPTS = 6
+NOTIFICATION_BACKOFF_BASE_SECONDS = 30
+NOTIFICATION_BACKOFF_MAX_SECONDS = 3600
+NOTIFICATION_SENDER_NAME = "MedCN"
+NOTIFICATION_SENDER_EMAIL = "no-reply@medcn.in"
+
+# Appointment reminders (api/notification_service/reminders.py)
+REMINDER_OFFSETS_HOURS = (24, 2)
+# Bookings starting within this many hours are kept in the in-memory schedule
+REMINDER_LOOKAHEAD_HOURS = 48
+REMINDER_TICK_SECONDS = 30
+
+# Live practice events over SSE (api/practice_service/events.py)
+PRACTICE_EVENTS_BUFFER_SIZE = 500
+# Events waiting for one client before it is dropped as too slow
+PRACTICE_EVENTS_QUEUE_SIZE = 100
+PRACTICE_EVENTS_HEARTBEAT_SECONDS = 15
+
+# Idempotency-Key replay for booking and registration POSTs (api/idempotency_service/)
+IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 60 * 60
+# A claim left IN_PROGRESS this long is treated as abandoned by a crashed request
+IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS = 60
+IDEMPOTENCY_POLL_INTERVAL_SECONDS = 0.2
+IDEMPOTENCY_CACHE_SIZE = 10000
+IDEMPOTENCY_SWEEP_INTERVAL_SECONDS = 3600
+IDEMPOTENCY_SWEEP_BATCH_SIZE = 500
+
+# Practice and practitioner full-text search (api/search_service/)
+SEARCH_MAX_TERMS = 8
+# bm25 costs time per matching document; broader queries are narrowed to title matches
+SEARCH_RANK_CANDIDATES = 4000
+# Facet counts returned per facet by /search/practices, most common first
+FACET_MAX_VALUES = 50
+# Each worker reloads its facet bitmaps this often to pick up other workers' writes
+FACET_INDEX_RELOAD_INTERVAL_SECONDS = 60
+# Search box type-ahead (/search/autocomplete), served from an in-memory prefix index
+AUTOCOMPLETE_LIMIT_DEFAULT = 10
+AUTOCOMPLETE_LIMIT_MAX = 25
+# Writes on this worker apply at once; a full reload is ~1s of CPU per 100k names
+AUTOCOMPLETE_RELOAD_INTERVAL_SECONDS = 300
+
+# Nearby practice search (api/patient_service/nearby.py)
+NEARBY_MAX_RADIUS_KM = 100
+# k-nearest starts this small and widens until k practices are in range
+NEARBY_INITIAL_RADIUS_KM = 5
+# Upper bound on geohash prefix ranges per query; picks the cell size
+NEARBY_MAX_CELLS = 32
+
+# Feature flag: fall back to PracticeRegistry.practice_owner / practice_associated_with
+# scans when a user has no PracticeMembers row. Off once practiceapp 0013 has backfilled.
+PRACTICE_LEGACY_TOKEN_ASSOCIATION = False
+
 from django.core.wsgi import get_wsgi_application
 from django.core.asgi import get_asgi_application
 import os
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from django.conf import settings
+from fastapi import HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from api.config import (
+    IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_KEY_TTL_SECONDS, IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS,
+    IDEMPOTENCY_POLL_INTERVAL_SECONDS
+)
+from .utils import (
+    StoredResponse, IdempotencyMismatch, IdempotencyInProgress, claim_key, complete_key, release_key
+)
+
+MAX_KEY_LENGTH = 255
+
+# Outcomes a retry would only repeat. Routes map every util error to a 400,
+# including transient ones (a busy password pool, a locked database), so
+# those release the key instead of being replayed for the key's lifetime.
+STORED_ERROR_STATUSES = {status.HTTP_409_CONFLICT, status.HTTP_422_UNPROCESSABLE_ENTITY}
+
+
+class CachedResponse(NamedTuple):
+    request_hash: str
+    response: StoredResponse
+    expires_at: float
+
+
+class InFlight(NamedTuple):
+    request_hash: str
+    future: asyncio.Future
+
+
+class IdempotencyCache:
+    """Per-process front for the IdempotencyKey table.
+
+    Completed responses are kept in a bounded LRU so most retries are answered
+    without a database round trip, and requests executing in this worker are
+    tracked so a concurrent duplicate awaits the first one instead of running.
+    """
+
+    def __init__(self, max_size: int = IDEMPOTENCY_CACHE_SIZE):
+        self.max_size = max_size
+        # Only touched from the event loop thread
+        self._responses = OrderedDict()
+        self._in_flight = {}
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+
+    def get(self, cache_key: tuple) -> Optional[CachedResponse]:
+        cached = self._responses.get(cache_key)
+        if cached is None:
+            return None
+        if cached.expires_at <= time.time():
+            del self._responses[cache_key]
+            return None
+        self._responses.move_to_end(cache_key)
+        return cached
+
+    def set(self, cache_key: tuple, request_hash: str, response: StoredResponse):
+        self._responses[cache_key] = CachedResponse(request_hash, response, time.time() + IDEMPOTENCY_KEY_TTL_SECONDS)
+        self._responses.move_to_end(cache_key)
+        while len(self._responses) > self.max_size:
+            self._responses.popitem(last=False)
+
+    def in_flight(self, cache_key: tuple) -> Optional[InFlight]:
+        return self._in_flight.get(cache_key)
+
+    def start(self, cache_key: tuple, request_hash: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = InFlight(request_hash, future)
+        return future
+
+    def finish(self, cache_key: tuple):
+        del self._in_flight[cache_key]
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._responses),
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "waited": self.waited,
+        }
+
+
+idempotency_cache = IdempotencyCache()
+
+
+def _fingerprint(payload: str) -> str:
+    """Keyed, so stored fingerprints of bodies with passwords or tokens cannot be brute-forced offline"""
+    return hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def _scope(request: Request) -> str:
+    """Route template plus a fingerprint of the query string, which carries the caller's token"""
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    caller = _fingerprint(str(request.query_params))[:16]
+    return f"{request.method} {path}:{caller}"
+
+
+def _request_hash(request: Request, body) -> str:
+    payload = json.dumps([request.path_params, jsonable_encoder(body)], sort_keys=True, default=str)
+    return _fingerprint(payload)
+
+
+def _response(stored: StoredResponse, replayed: bool) -> JSONResponse:
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(status_code=stored.status_code, content=stored.body, headers=headers)
+
+
+async def _claim(scope: str, key: str, request_hash: str) -> Optional[StoredResponse]:
+    """Claim the key, waiting while a request on another worker holds it"""
+    deadline = time.monotonic() + IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS
+    while True:
+        try:
+            return await run_in_threadpool(claim_key, scope, key, request_hash)
+        except IdempotencyMismatch:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        except IdempotencyInProgress:
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress"
+                )
+        await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL_SECONDS)
+
+
+async def idempotent(request: Request, key: Optional[str], body, handler: Callable[[], Awaitable]):
+    """Run handler at most once per Idempotency-Key and replay its response to retries.
+
+    Successful responses and STORED_ERROR_STATUSES are stored; anything else
+    releases the key so the client can retry. Without a key the handler runs
+    as usual.
+    """
+    if not key:
+        return await handler()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"
+        )
+    scope = _scope(request)
+    request_hash = _request_hash(request, body)
+    cache_key = (scope, key)
+
+    def check_hash(stored_hash: str):
+        if stored_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+
+    while True:
+        cached = idempotency_cache.get(cache_key)
+        if cached is not None:
+            check_hash(cached.request_hash)
+            idempotency_cache.replayed += 1
+            return _response(cached.response, replayed=True)
+        in_flight = idempotency_cache.in_flight(cache_key)
+        if in_flight is None:
+            break
+        check_hash(in_flight.request_hash)
+        idempotency_cache.waited += 1
+        try:
+            return _response(await asyncio.shield(in_flight.future), replayed=True)
+        except asyncio.CancelledError:
+            if not in_flight.future.cancelled():
+                raise
+            # The first request's client went away before it finished; run it here instead
+
+    future = idempotency_cache.start(cache_key, request_hash)
+    claimed = False
+    try:
+        stored = await _claim(scope, key, request_hash)
+        replayed = stored is not None
+        if replayed:
+            idempotency_cache.replayed += 1
+        else:
+            claimed = True
+            try:
+                stored = StoredResponse(status.HTTP_200_OK, jsonable_encoder(await handler()))
+            except HTTPException as e:
+                if e.status_code not in STORED_ERROR_STATUSES:
+                    raise
+                stored = StoredResponse(e.status_code, {"detail": jsonable_encoder(e.detail)})
+            await run_in_threadpool(complete_key, scope, key, stored)
+            idempotency_cache.executed += 1
+        idempotency_cache.set(cache_key, request_hash, stored)
+        future.set_result(stored)
+        return _response(stored, replayed=replayed)
+    except BaseException as e:
+        if claimed:
+            await asyncio.shield(run_in_threadpool(release_key, scope, key))
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved for when there are none
+            future.exception()
+        raise
+    finally:
+        idempotency_cache.finish(cache_key)
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, NamedTuple, Optional
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from starlette.concurrency import run_in_threadpool
+
+from api.config import (
+    LOGGER_NAME, IDEMPOTENCY_KEY_TTL_SECONDS, IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS,
+    IDEMPOTENCY_SWEEP_INTERVAL_SECONDS, IDEMPOTENCY_SWEEP_BATCH_SIZE
+)
+from idempotencyapp.models import IdempotencyKey
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    body: Any
+
+
+class IdempotencyMismatch(Exception):
+    """The key was already used for a different request"""
+
+
+class IdempotencyInProgress(Exception):
+    """Another worker is still executing the request for this key"""
+
+
+def claim_key(scope: str, key: str, request_hash: str) -> Optional[StoredResponse]:
+    """Claim the key for this request, or return the response stored by an earlier one.
+
+    The unique constraint on (scope, key) decides which of several concurrent
+    workers executes the request; the others see it IN_PROGRESS.
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                scope=scope,
+                key=key,
+                request_hash=request_hash,
+                expires_at=now + timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+            )
+        return None
+    except IntegrityError:
+        pass
+
+    record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+    if record is None:
+        # Swept between the insert and the read
+        return claim_key(scope, key, request_hash)
+    abandoned = (
+        record.state == IdempotencyKey.IN_PROGRESS
+        and record.created_at <= now - timedelta(seconds=IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS)
+    )
+    if record.expires_at <= now or (abandoned and record.request_hash == request_hash):
+        # Take the row over; the conditional update lets only one worker win
+        taken = IdempotencyKey.objects.filter(id=record.id, created_at=record.created_at).update(
+            request_hash=request_hash,
+            state=IdempotencyKey.IN_PROGRESS,
+            response_status=None,
+            response_body=None,
+            created_at=now,
+            expires_at=now + timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+        )
+        if taken:
+            return None
+        raise IdempotencyInProgress()
+    if record.request_hash != request_hash:
+        raise IdempotencyMismatch()
+    if record.state == IdempotencyKey.COMPLETED:
+        return StoredResponse(record.response_status, record.response_body)
+    raise IdempotencyInProgress()
+
+
+def complete_key(scope: str, key: str, response: StoredResponse):
+    IdempotencyKey.objects.filter(scope=scope, key=key).update(
+        state=IdempotencyKey.COMPLETED,
+        response_status=response.status_code,
+        response_body=response.body,
+        expires_at=timezone.now() + timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+    )
+
+
+def release_key(scope: str, key: str):
+    """The request failed without a response worth replaying; a retry may run it again"""
+    IdempotencyKey.objects.filter(scope=scope, key=key, state=IdempotencyKey.IN_PROGRESS).delete()
+
+
+def sweep_expired_keys(batch_size: int = IDEMPOTENCY_SWEEP_BATCH_SIZE) -> int:
+    """Delete expired keys in primary-key batches"""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        expired_ids = list(
+            IdempotencyKey.objects
+            .filter(expires_at__lte=now)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not expired_ids:
+            break
+        IdempotencyKey.objects.filter(id__in=expired_ids).delete()
+        deleted += len(expired_ids)
+        if len(expired_ids) < batch_size:
+            break
+    return deleted
+
+
+async def run_idempotency_sweeper(interval_seconds: int = IDEMPOTENCY_SWEEP_INTERVAL_SECONDS):
+    """Background loop started with the app; expired keys are also taken over lazily on reuse"""
+    while True:
+        try:
+            deleted = await run_in_threadpool(sweep_expired_keys)
+            if deleted:
+                logger.info(f"Idempotency sweeper removed {deleted} expired keys")
+        except Exception as e:
+            logger.error(f"Idempotency sweeper failed: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from api.practice_service.auth_cache import token_cache
+from api.practice_service.dependencies import resolution_stats
+from api.auth_service.passwords import password_hasher
+from api.patient_service.holds import hold_cache
+from api.notification_service.dispatcher import outbox_dispatcher
+from api.notification_service.reminders import reminder_scheduler
+from api.practice_service.events import event_bus
+from api.idempotency_service.cache import idempotency_cache
+from api.search_service.facet_index import facet_index
+from api.search_service.autocomplete import autocomplete_index
+
+
+router = APIRouter(
+    tags=["Metrics"],
+    prefix="/metrics"
+)
+
+
+@router.get("/")
+async def get_metrics():
+    """In-process counters for this worker"""
+    return {
+        "practice_auth_cache": token_cache.stats(),
+        "practice_context_resolution": resolution_stats.stats(),
+        "password_hasher": password_hasher.stats(),
+        "booking_hold_cache": hold_cache.stats(),
+        "notification_outbox": outbox_dispatcher.stats(),
+        "appointment_reminders": reminder_scheduler.stats(),
+        "practice_events": event_bus.stats(),
+        "idempotency": idempotency_cache.stats(),
+        "practice_facets": facet_index.stats(),
+        "autocomplete": autocomplete_index.stats(),
+    }
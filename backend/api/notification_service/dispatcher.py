@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+from starlette.concurrency import run_in_threadpool
+
+from api.config import (
+    LOGGER_NAME, NOTIFICATION_DISPATCH_INTERVAL_SECONDS, NOTIFICATION_BATCH_SIZE, NOTIFICATION_MAX_ATTEMPTS,
+    NOTIFICATION_BACKOFF_BASE_SECONDS, NOTIFICATION_BACKOFF_MAX_SECONDS
+)
+from notificationapp.models import OutboxMessage
+from .transports import Transport, build_transport
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# A claimed message is invisible to other dispatchers for this long, so a
+# worker that dies mid-send leaves it to be retried rather than stuck
+CLAIM_LEASE_SECONDS = 300
+
+
+def backoff_seconds(attempts: int) -> int:
+    """Exponential backoff after the given number of failed attempts"""
+    return min(NOTIFICATION_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), NOTIFICATION_BACKOFF_MAX_SECONDS)
+
+
+class OutboxDispatcher:
+    """Sends due outbox messages in batches through a pluggable transport"""
+
+    def __init__(self, transport: Transport = None, batch_size: int = NOTIFICATION_BATCH_SIZE):
+        self._transport = transport
+        self.batch_size = batch_size
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def transport(self) -> Transport:
+        if self._transport is None:
+            self._transport = build_transport()
+        return self._transport
+
+    def _claim_batch(self) -> list:
+        """Claim due messages with a conditional update per row so concurrent workers never double-send"""
+        now = timezone.now()
+        due = list(
+            OutboxMessage.objects
+            .filter(state=OutboxMessage.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', 'next_attempt_at')[:self.batch_size]
+        )
+        lease_until = now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+        claimed_ids = [
+            message_id
+            for message_id, next_attempt_at in due
+            if OutboxMessage.objects.filter(
+                id=message_id, state=OutboxMessage.PENDING, next_attempt_at=next_attempt_at
+            ).update(next_attempt_at=lease_until)
+        ]
+        return list(OutboxMessage.objects.filter(id__in=claimed_ids).order_by('id'))
+
+    def dispatch_batch(self) -> int:
+        """Send one batch; returns how many messages were handled"""
+        messages = self._claim_batch()
+        for message in messages:
+            message.attempts += 1
+            try:
+                self.transport.send(message)
+            except Exception as e:
+                message.last_error = str(e)
+                if message.attempts >= NOTIFICATION_MAX_ATTEMPTS:
+                    message.state = OutboxMessage.FAILED
+                    self.failed += 1
+                    logger.error(f"Giving up on outbox message {message.message_uuid}: {e}")
+                else:
+                    message.next_attempt_at = timezone.now() + timedelta(seconds=backoff_seconds(message.attempts))
+                    self.retried += 1
+                message.save(update_fields=['attempts', 'state', 'next_attempt_at', 'last_error'])
+                continue
+            message.state = OutboxMessage.SENT
+            message.sent_at = timezone.now()
+            message.save(update_fields=['attempts', 'state', 'sent_at'])
+            self.sent += 1
+        return len(messages)
+
+    def stats(self) -> dict:
+        return {
+            "transport": self.transport.name,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+outbox_dispatcher = OutboxDispatcher()
+
+
+async def run_notification_dispatcher(interval_seconds: int = NOTIFICATION_DISPATCH_INTERVAL_SECONDS):
+    """Background loop started with the app; drains full batches back to back"""
+    while True:
+        try:
+            while await run_in_threadpool(outbox_dispatcher.dispatch_batch) >= outbox_dispatcher.batch_size:
+                pass
+        except Exception as e:
+            logger.error(f"Notification dispatcher failed: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,220 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from django.utils import timezone
+from starlette.concurrency import run_in_threadpool
+
+from api.config import LOGGER_NAME, REMINDER_OFFSETS_HOURS, REMINDER_LOOKAHEAD_HOURS, REMINDER_TICK_SECONDS
+from platformuser.models import PatientBooking
+from .utils import enqueue_booking_reminder
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class ReminderEntry(NamedTuple):
+    due_at: float
+    booking_id: int
+    hours_before: int
+    starts_at: float
+
+
+def booking_start(booking_date, start_time) -> datetime:
+    return timezone.make_aware(datetime.combine(booking_date, start_time))
+
+
+class ReminderScheduler:
+    """Min-heap of reminders for live bookings starting within the lookahead window.
+
+    PatientBooking stays authoritative. Cancelled or moved bookings are dropped
+    lazily when their entries reach the top of the heap, and every due reminder
+    is re-checked against the table and written to the outbox under a dedupe
+    key, so a restart or a second worker never sends it twice.
+    """
+
+    def __init__(self, offsets_hours=REMINDER_OFFSETS_HOURS, lookahead_hours: int = REMINDER_LOOKAHEAD_HOURS):
+        self.offsets_hours = sorted(offsets_hours)
+        self.lookahead = timedelta(hours=lookahead_hours)
+        self._heap = []
+        # booking id -> start timestamp its current heap entries were pushed for
+        self._starts = {}
+        self._stale = 0
+        self._lock = threading.Lock()
+        # Last booking_date loaded into the heap; later dates are loaded as the window moves
+        self.loaded_through = None
+        self.sent = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def _push(self, booking_id: int, starts_at: datetime, not_before: datetime):
+        """Caller holds the lock. Reminders already due at not_before are left out."""
+        if booking_id in self._starts:
+            self._stale += len(self.offsets_hours)
+        start_ts = starts_at.timestamp()
+        self._starts[booking_id] = start_ts
+        for hours in self.offsets_hours:
+            due_at = start_ts - hours * 3600
+            if due_at > not_before.timestamp():
+                heapq.heappush(self._heap, ReminderEntry(due_at, booking_id, hours, start_ts))
+
+    def _compact(self):
+        """Caller holds the lock. Rebuild the heap once cancelled or moved entries dominate it."""
+        if self._stale * 2 <= len(self._heap):
+            return
+        self._heap = [entry for entry in self._heap if self._starts.get(entry.booking_id) == entry.starts_at]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def schedule(self, bookings: list):
+        """Add the reminders for new bookings, or move those of rescheduled ones (booking_slot loaded)"""
+        now = timezone.now()
+        with self._lock:
+            if self.loaded_through is None:
+                # Not loaded yet; the startup load picks these up
+                return
+            for booking in bookings:
+                if booking.booking_slot is None or booking.booking_date > self.loaded_through:
+                    continue
+                self._push(booking.id, booking_start(booking.booking_date, booking.booking_slot.start_time), now)
+            self._compact()
+
+    def unschedule(self, booking_ids: list):
+        with self._lock:
+            for booking_id in booking_ids:
+                if self._starts.pop(booking_id, None) is not None:
+                    self._stale += len(self.offsets_hours)
+            self._compact()
+
+    def reschedule_slot(self, slot_uuid):
+        """An availability slot's time changed; move the reminders of its upcoming bookings"""
+        if self.loaded_through is None:
+            return
+        bookings = PatientBooking.objects.filter(
+            booking_slot_id=slot_uuid,
+            booking_date__range=[timezone.localdate(), self.loaded_through],
+            is_active=True,
+            is_deleted=False
+        ).select_related('booking_slot')
+        self.schedule(list(bookings))
+
+    def load(self) -> int:
+        """Load live bookings whose date has entered the lookahead window since the last call"""
+        now = timezone.now()
+        through = timezone.localdate(now + self.lookahead)
+        with self._lock:
+            start = timezone.localdate(now) if self.loaded_through is None else self.loaded_through + timedelta(days=1)
+            if start > through:
+                return 0
+            # Set before querying so bookings created meanwhile are pushed by schedule()
+            self.loaded_through = through
+            for booking_id in [booking_id for booking_id, start_ts in self._starts.items() if start_ts <= now.timestamp()]:
+                del self._starts[booking_id]
+        # Served by the patientbooking_live_date partial index
+        rows = list(
+            PatientBooking.objects
+            .filter(is_active=True, is_deleted=False, booking_date__range=[start, through])
+            .exclude(booking_slot=None)
+            .values_list('id', 'booking_date', 'booking_slot__start_time', 'created_at')
+        )
+        with self._lock:
+            for booking_id, booking_date, start_time, created_at in rows:
+                starts_at = booking_start(booking_date, start_time)
+                if self._starts.get(booking_id) != starts_at.timestamp():
+                    # Reminders missed while no worker was running are still sent, late
+                    self._push(booking_id, starts_at, created_at)
+        return len(rows)
+
+    def pop_due(self) -> list:
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0].due_at <= now:
+                entry = heapq.heappop(self._heap)
+                if self._starts.get(entry.booking_id) != entry.starts_at:
+                    self._stale = max(self._stale - 1, 0)
+                    continue
+                due.append(entry)
+        return due
+
+    def fire(self, entries: list) -> int:
+        """Re-check due reminders against the bookings table and write the live ones to the outbox"""
+        bookings = PatientBooking.objects.filter(
+            is_active=True,
+            is_deleted=False
+        ).select_related(
+            'patient', 'practitioner', 'appointment', 'booking_slot', 'family_member'
+        ).in_bulk({entry.booking_id for entry in entries})
+        now = timezone.now()
+        enqueued = 0
+        for entry in entries:
+            booking = bookings.get(entry.booking_id)
+            if booking is None or booking.booking_slot is None:
+                self.skipped += 1
+                continue
+            starts_at = booking_start(booking.booking_date, booking.booking_slot.start_time)
+            superseded = any(
+                hours < entry.hours_before and starts_at - timedelta(hours=hours) <= now
+                for hours in self.offsets_hours
+            )
+            if starts_at.timestamp() != entry.starts_at or starts_at <= now or superseded:
+                # Moved by another worker, already started, or a closer reminder is due instead
+                self.skipped += 1
+                continue
+            lag = now.timestamp() - entry.due_at
+            self.last_lag_seconds = lag
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            if enqueue_booking_reminder(booking, entry.hours_before, starts_at) is None:
+                self.deduplicated += 1
+            else:
+                self.sent += 1
+                enqueued += 1
+        return enqueued
+
+    def tick(self) -> int:
+        self.load()
+        entries = self.pop_due()
+        return self.fire(entries) if entries else 0
+
+    def seconds_until_next(self, cap: float) -> float:
+        with self._lock:
+            if not self._heap:
+                return cap
+            return min(cap, max(self._heap[0].due_at - time.time(), 0))
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            next_due = self._heap[0].due_at if self._heap else None
+            return {
+                "queue_size": len(self._heap),
+                "scheduled_bookings": len(self._starts),
+                "loaded_through": self.loaded_through.isoformat() if self.loaded_through else None,
+                "next_due_in_seconds": round(next_due - now, 1) if next_due is not None else None,
+                "overdue_seconds": round(max(now - next_due, 0), 1) if next_due is not None else 0.0,
+                "last_lag_seconds": round(self.last_lag_seconds, 1),
+                "max_lag_seconds": round(self.max_lag_seconds, 1),
+                "sent": self.sent,
+                "deduplicated": self.deduplicated,
+                "skipped": self.skipped,
+            }
+
+
+reminder_scheduler = ReminderScheduler()
+
+
+async def run_reminder_scheduler(interval_seconds: int = REMINDER_TICK_SECONDS):
+    """Background loop started with the app; sleeps until the next reminder is due"""
+    while True:
+        try:
+            sent = await run_in_threadpool(reminder_scheduler.tick)
+            if sent:
+                logger.info(f"Reminder scheduler queued {sent} reminders")
+        except Exception as e:
+            logger.error(f"Reminder scheduler failed: {e}")
+        await asyncio.sleep(reminder_scheduler.seconds_until_next(interval_seconds))
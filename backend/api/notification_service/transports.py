@@ -0,0 +1,81 @@
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+import sib_api_v3_sdk
+from django.conf import settings
+from django.utils import timezone
+
+from api.config import LOGGER_NAME, NOTIFICATION_SENDER_NAME, NOTIFICATION_SENDER_EMAIL
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class Transport(ABC):
+    """Delivers one OutboxMessage; raising marks the attempt as failed and schedules a retry"""
+    name = "base"
+
+    @abstractmethod
+    def send(self, message):
+        ...
+
+
+class ConsoleTransport(Transport):
+    """Logs messages instead of sending them; the default when no provider key is configured"""
+    name = "console"
+
+    def send(self, message):
+        logger.info(f"[notification] {message.kind} to {message.recipient_email}: {message.subject}")
+
+
+class FileTransport(Transport):
+    """Appends messages as JSON lines to a local file, for tests and local development"""
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        line = json.dumps({
+            "message_uuid": str(message.message_uuid),
+            "kind": message.kind,
+            "to": message.recipient_email,
+            "subject": message.subject,
+            "html_content": message.html_content,
+            "sent_at": timezone.now().isoformat(),
+        })
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+class SendinblueTransport(Transport):
+    """Transactional email through the Sendinblue (Brevo) API"""
+    name = "sendinblue"
+
+    def __init__(self, api_key: str):
+        configuration = sib_api_v3_sdk.Configuration()
+        configuration.api_key['api-key'] = api_key
+        self._api = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+
+    def send(self, message):
+        self._api.send_transac_email(sib_api_v3_sdk.SendSmtpEmail(
+            sender={"name": NOTIFICATION_SENDER_NAME, "email": NOTIFICATION_SENDER_EMAIL},
+            to=[{"name": message.recipient_name, "email": message.recipient_email}],
+            subject=message.subject,
+            html_content=message.html_content,
+            # Lets the provider drop a resend of a message it already accepted
+            headers={"X-Outbox-Message": str(message.message_uuid)},
+        ))
+
+
+def build_transport() -> Transport:
+    """Pick the transport named by settings.NOTIFICATION_TRANSPORT"""
+    if settings.NOTIFICATION_TRANSPORT == "sendinblue":
+        if not settings.SENDINBLUE_API_KEY:
+            raise Exception("NOTIFICATION_TRANSPORT is sendinblue but SENDINBLUE_API_KEY is not set")
+        return SendinblueTransport(settings.SENDINBLUE_API_KEY)
+    if settings.NOTIFICATION_TRANSPORT == "file":
+        return FileTransport(settings.NOTIFICATION_FILE_PATH)
+    return ConsoleTransport()
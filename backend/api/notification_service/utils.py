@@ -0,0 +1,100 @@
+from html import escape
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from notificationapp.models import OutboxMessage
+
+
+def enqueue_email(kind: str, recipient_email: str, recipient_name: str, subject: str, html_content: str,
+                  dedupe_key: str = None) -> OutboxMessage:
+    """Write an email to the outbox. Call inside the transaction of the change it reports,
+    so it is sent if and only if that change commits.
+
+    With a dedupe_key the email is written at most once; a repeat returns None.
+    """
+    fields = dict(
+        kind=kind,
+        recipient_email=recipient_email,
+        recipient_name=recipient_name,
+        subject=subject,
+        html_content=html_content,
+        next_attempt_at=timezone.now()
+    )
+    if dedupe_key is None:
+        return OutboxMessage.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return OutboxMessage.objects.create(dedupe_key=dedupe_key, **fields)
+    except IntegrityError:
+        return None
+
+
+def _booking_email(name: str, intro: str, rows: list) -> str:
+    # Names and appointment types are user input; escape them before they go into the HTML
+    appointments = "\n".join(
+        f"""            <li>Dr. {escape(row['doctor_name'])} on {escape(row['appointment_time'])} ({escape(row['consultation_type'])}){escape(row.get('for', ''))}</li>"""
+        for row in rows
+    )
+    return f"""
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <p>Dear {escape(name)},</p>
+        <p>{intro}</p>
+        <p><strong>Appointment Details:</strong></p>
+        <ul>
+{appointments}
+        </ul>
+        <p>Please arrive 10 minutes before your scheduled appointment time. If you need to cancel or reschedule, please contact us at least 24 hours in advance.</p>
+        <p>Please feel free to contact us if you have any questions or need further assistance.</p>
+        <br>
+        <p>Best regards,</p>
+        <p><strong>MedCN</strong></p>
+        <br>
+    </body>
+    </html>
+    """
+
+
+def _booking_row(booking) -> dict:
+    slot = booking.booking_slot
+    appointment_time = f"{booking.booking_date}" + (f" at {slot.start_time.strftime('%H:%M')}" if slot else "")
+    return {
+        "doctor_name": booking.practitioner.display_name,
+        "appointment_time": appointment_time,
+        "consultation_type": booking.appointment.type_of_consultation,
+        "for": f" for {booking.family_member.first_name}" if booking.family_member_id else "",
+    }
+
+
+def enqueue_booking_confirmation(patient, bookings: list) -> OutboxMessage:
+    """One confirmation email covering a single booking, a series or a family group"""
+    intro = (
+        "Your appointment has been successfully scheduled!"
+        if len(bookings) == 1
+        else f"Your {len(bookings)} appointments have been successfully scheduled!"
+    )
+    return enqueue_email(
+        kind="booking_confirmation",
+        recipient_email=patient.email,
+        recipient_name=patient.first_name,
+        subject="Appointment Confirmation",
+        html_content=_booking_email(patient.first_name, intro, [_booking_row(booking) for booking in bookings]),
+    )
+
+
+def enqueue_booking_reminder(booking, hours_before: int, starts_at) -> OutboxMessage:
+    """Reminder for one booking; keyed on its start time so a rescheduled booking is reminded again"""
+    patient = booking.patient
+    return enqueue_email(
+        kind="booking_reminder",
+        recipient_email=patient.email,
+        recipient_name=patient.first_name,
+        subject="Appointment Reminder",
+        html_content=_booking_email(
+            patient.first_name,
+            f"This is a reminder that your appointment is in {hours_before} hours.",
+            [_booking_row(booking)]
+        ),
+        dedupe_key=f"reminder:{booking.patient_booking_uuid}:{hours_before}h:{starts_at.isoformat()}",
+    )
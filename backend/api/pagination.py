@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import date
+
+
+def encode_cursor(*values) -> str:
+    """Opaque cursor for the sort key of the last row on a page"""
+    payload = [value.isoformat() if isinstance(value, date) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Inverse of encode_cursor; date values come back as ISO strings"""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise Exception("Invalid cursor")
+
+
+def page_size(limit: int, default: int, maximum: int) -> int:
+    if not limit:
+        return default
+    if limit < 1:
+        raise Exception("limit must be positive")
+    return min(limit, maximum)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from typing import NamedTuple, Optional
+
+from django.utils import timezone
+from starlette.concurrency import run_in_threadpool
+
+from api.config import LOGGER_NAME, BOOKING_HOLD_SWEEP_INTERVAL_SECONDS, BOOKING_HOLD_SWEEP_BATCH_SIZE
+from platformuser.models import BookingHold
+from .waitlist import expire_offers, promote_next
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class CachedHold(NamedTuple):
+    hold_uuid: uuid.UUID
+    patient_id: int
+    expires_at: float
+
+
+def hold_key(practitioner_id: int, hold_date, slot_uuid) -> tuple:
+    """Cache key for one slot occurrence; slot UUIDs arrive both as strings and UUID objects"""
+    return (practitioner_id, hold_date, uuid.UUID(str(slot_uuid)))
+
+
+class HoldCache:
+    """Per-process view of live holds keyed by slot occurrence.
+
+    BookingHold is authoritative. A miss always falls through to the table, and
+    a hit is only trusted for the patient's own hold: a hold released, confirmed
+    or cancelled on another worker stays cached here until it would have
+    expired, so a hit that would turn someone away is re-read with confirmed_hold.
+    """
+
+    def __init__(self):
+        self._holds = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[CachedHold]:
+        with self._lock:
+            hold = self._holds.get(key)
+            if hold is not None and hold.expires_at <= time.time():
+                del self._holds[key]
+                hold = None
+            if hold is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return hold
+
+    def set(self, key: tuple, hold: BookingHold):
+        with self._lock:
+            self._holds[key] = CachedHold(hold.hold_uuid, hold.patient_id, hold.expires_at.timestamp())
+
+    def discard(self, key: tuple):
+        with self._lock:
+            self._holds.pop(key, None)
+
+    def prune(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, hold in self._holds.items() if hold.expires_at <= now]
+            for key in expired:
+                del self._holds[key]
+            return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._holds),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+hold_cache = HoldCache()
+
+
+def confirmed_hold(key: tuple, cached: CachedHold) -> Optional[CachedHold]:
+    """cached if its hold is still in the table and unexpired, else None (and it leaves the cache)"""
+    if BookingHold.objects.filter(hold_uuid=cached.hold_uuid, expires_at__gt=timezone.now()).exists():
+        return cached
+    hold_cache.discard(key)
+    return None
+
+
+def held_pairs(practitioner_ids: list, start, end) -> set:
+    """(slot uuid, date) pairs under a live hold, for marking availability"""
+    return set(BookingHold.objects.filter(
+        practitioner_id__in=practitioner_ids,
+        hold_date__range=[start, end],
+        expires_at__gt=timezone.now()
+    ).values_list('hold_slot', 'hold_date'))
+
+
+def sweep_expired_holds(batch_size: int = BOOKING_HOLD_SWEEP_BATCH_SIZE) -> int:
+    """Delete expired holds in primary-key batches, passing lapsed waitlist offers down the queue"""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        expired_ids = list(
+            BookingHold.objects
+            .filter(expires_at__lte=now)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not expired_ids:
+            break
+        reoffer = expire_offers(expired_ids)
+        BookingHold.objects.filter(id__in=expired_ids).delete()
+        deleted += len(expired_ids)
+        # A lapsed waitlist offer moves on to the next patient in the queue
+        for practitioner_id, slot_uuid, slot_date in reoffer:
+            promote_next(practitioner_id, slot_uuid, slot_date)
+        if len(expired_ids) < batch_size:
+            break
+    hold_cache.prune()
+    return deleted
+
+
+async def run_hold_sweeper(interval_seconds: int = BOOKING_HOLD_SWEEP_INTERVAL_SECONDS):
+    """Background loop started with the app; holds are also cleared lazily when a slot is re-held"""
+    while True:
+        try:
+            deleted = await run_in_threadpool(sweep_expired_holds)
+            if deleted:
+                logger.info(f"Hold sweeper removed {deleted} expired holds")
+        except Exception as e:
+            logger.error(f"Hold sweeper failed: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+from django.db.models import Q
+
+from api.config import (
+    PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, NEARBY_MAX_RADIUS_KM, NEARBY_INITIAL_RADIUS_KM, NEARBY_MAX_CELLS
+)
+from api.pagination import page_size
+from practiceapp.geo import GEOHASH_PRECISION, encode_geohash, geohash_cell_size
+from practiceapp.models import PracticeRegistry
+from .utils import PRACTICE_LIST_FIELDS
+
+EARTH_RADIUS_KM = 6371.0088
+
+NEARBY_FIELDS = PRACTICE_LIST_FIELDS + ["latitude", "longitude"]
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distances from one point to arrays of points"""
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    a = (
+        np.sin((latitudes - latitude) / 2) ** 2
+        + math.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """(south, north, west, width) in degrees around the circle; west + width may pass 180"""
+    delta_latitude = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = latitude - delta_latitude, latitude + delta_latitude
+    if south <= -90 or north >= 90:
+        return max(south, -90.0), min(north, 90.0), -180.0, 360.0
+    widest = math.cos(math.radians(max(abs(south), abs(north))))
+    delta_longitude = math.degrees(radius_km / (EARTH_RADIUS_KM * widest))
+    if delta_longitude >= 180:
+        return south, north, -180.0, 360.0
+    return south, north, longitude - delta_longitude, 2 * delta_longitude
+
+
+def covering_cells(south: float, north: float, west: float, width: float) -> set:
+    """Geohash prefixes covering the box, at the finest precision that needs at most NEARBY_MAX_CELLS"""
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_height, cell_width = geohash_cell_size(precision)
+        rows = math.floor(north / cell_height) - math.floor(south / cell_height) + 1
+        columns = math.ceil(width / cell_width) + 1
+        if rows * columns <= NEARBY_MAX_CELLS:
+            break
+    cells = set()
+    for row in range(rows):
+        cell_latitude = min(south + row * cell_height, north)
+        for column in range(columns):
+            cell_longitude = (west + min(column * cell_width, width) + 180) % 360 - 180
+            cells.add(encode_geohash(cell_latitude, cell_longitude, precision))
+    return cells
+
+
+def _candidates(cells: set) -> np.ndarray:
+    """(id, latitude, longitude) rows from the geohash index, one range scan per cell"""
+    ranges = Q()
+    for cell in cells:
+        # "~" sorts after every base32 character, so this is the prefix range
+        ranges |= Q(geohash__gte=cell, geohash__lt=cell + "~")
+    rows = list(PracticeRegistry.objects.filter(ranges).values_list('id', 'latitude', 'longitude'))
+    return np.array(rows, dtype=float).reshape(-1, 3)
+
+
+def nearby_practices(latitude: float, longitude: float, radius_km: float = None, limit: int = None):
+    """
+    Practices closest to a point, nearest first, with their distance in km.
+
+    With radius_km this is a radius query; without it a k-nearest query that
+    widens from NEARBY_INITIAL_RADIUS_KM until limit practices are in range or
+    NEARBY_MAX_RADIUS_KM is reached. Candidates come from geohash prefix
+    ranges over the box around the circle and are refined with haversine.
+
+    Returns:
+        dict: results and the radius_km that was searched
+    """
+    try:
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("lat must be within [-90, 90] and lng within [-180, 180]")
+        if radius_km is not None and not (0 < radius_km <= NEARBY_MAX_RADIUS_KM):
+            raise ValueError(f"radius must be greater than 0 and at most {NEARBY_MAX_RADIUS_KM} km")
+        limit = page_size(limit, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+
+        max_radius = radius_km or NEARBY_MAX_RADIUS_KM
+        search_radius = radius_km or min(NEARBY_INITIAL_RADIUS_KM, max_radius)
+        while True:
+            candidates = _candidates(covering_cells(*bounding_box(latitude, longitude, search_radius)))
+            distances = haversine_km(latitude, longitude, candidates[:, 1], candidates[:, 2])
+            in_range = distances <= search_radius
+            if in_range.sum() >= limit or search_radius >= max_radius:
+                break
+            search_radius = min(search_radius * 4, max_radius)
+
+        ids, distances = candidates[in_range, 0].astype(np.int64), distances[in_range]
+        if len(distances) > limit:
+            nearest = np.argpartition(distances, limit - 1)[:limit]
+            ids, distances = ids[nearest], distances[nearest]
+        order = np.lexsort((ids, distances))
+        ids, distances = ids[order].tolist(), distances[order].tolist()
+
+        practices = {
+            practice["id"]: practice
+            for practice in PracticeRegistry.objects.filter(id__in=ids).values(*NEARBY_FIELDS)
+        } if ids else {}
+        return {
+            "results": [
+                {**practices[practice_id], "distance_km": round(distance, 3)}
+                for practice_id, distance in zip(ids, distances)
+                if practice_id in practices
+            ],
+            "radius_km": search_radius,
+        }
+    except Exception as e:
+        raise Exception(str(e))
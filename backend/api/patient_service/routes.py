@@ -1,9 +1,11 @@
 
 
-from fastapi import APIRouter, HTTPException, status, Query
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query, Header, Request
 from .utils import (
     register_patient,
     login_patient,
+    get_login_patient,
     get_family_members,
     add_family_member,
     edit_family_member,
@@ -12,10 +14,28 @@ from .utils import (
     get_practice_details,
     get_practice_practitioners,
     get_practioner_availability,
+    get_practioner_availability_range,
+    get_practice_availability,
     book_appointment_with_practioner,
-    get_patient_details
+    book_appointment_series,
+    book_family_appointments,
+    place_booking_hold,
+    confirm_booking_hold,
+    release_booking_hold,
+    cancel_booking,
+    get_patient_bookings,
+    join_waitlist,
+    get_waitlist_entries,
+    leave_waitlist,
+    BookingConflict,
+    get_patient_details,
+    refresh_patient_token,
+    logout_patient
 )
+from .nearby import nearby_practices
 from starlette.concurrency import run_in_threadpool
+from api.auth_service.passwords import password_hasher, needs_rehash
+from api.idempotency_service.cache import idempotent
 
 router = APIRouter(
     tags=["Patient"],
@@ -29,23 +49,58 @@ async def get_patient_service():
 
 
 @router.post("/register")
-async def register(details: dict):
-    try:
-        result = await run_in_threadpool(register_patient, details)
-        return {"status": "success", "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+async def register(request: Request, details: dict, idempotency_key: Optional[str] = Header(None)):
+    async def run():
+        try:
+            if details.get("password"):
+                details["password"] = await password_hasher.hash(details["password"])
+            result = await run_in_threadpool(register_patient, details)
+            return {"status": "success", "data": result}
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await idempotent(request, idempotency_key, details, run)
 
 
 @router.post("/login") 
 async def login(details: dict):
     try:
-        result = await run_in_threadpool(login_patient, details)
-        return {"status": "success", "token": result["token"]}
+        patient = await run_in_threadpool(get_login_patient, details)
+        # Verification runs on the password process pool, not the shared threadpool
+        if not await password_hasher.verify(details["password"], patient.password):
+            raise Exception("Invalid email or password")
+        password_hash = None
+        if needs_rehash(patient.password):
+            password_hash = await password_hasher.hash(details["password"])
+        result = await run_in_threadpool(login_patient, patient, password_hash)
+        return {
+            "status": "success",
+            "token": result["token"],
+            "access_token": result["access_token"],
+            "refresh_token": result["refresh_token"],
+            "expires_in": result["expires_in"],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+
+@router.post("/refresh-token")
+async def refresh_token(details: dict):
+    try:
+        result = await run_in_threadpool(refresh_patient_token, details)
+        return {"status": "success", **result}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 
+@router.post("/logout")
+async def logout(patient_token: str = Query(..., description="Access token or refresh token of the session to end")):
+    try:
+        result = await run_in_threadpool(logout_patient, patient_token)
+        return {"status": "success", "data": result}
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get("/current-patient-details")
 async def get_current_patient_details(patient_token: str = Query(..., description="Patient authentication token")):
     """Get current patient details."""
@@ -110,14 +165,32 @@ async def delete_family_member_route(
     
     
 @router.get("/practices")
-async def get_practices():
-    """Get all practices."""
+async def get_practices(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields; defaults to a compact summary")
+):
+    """List practices, one keyset page at a time."""
     try:
-        result = await run_in_threadpool(get_all_practices)
+        result = await run_in_threadpool(get_all_practices, cursor, limit, fields)
         return  result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
+@router.get("/practices/nearby")
+async def get_nearby_practices(
+    lat: float = Query(..., description="Latitude of the patient"),
+    lng: float = Query(..., description="Longitude of the patient"),
+    radius: Optional[float] = Query(None, description="Search radius in km; omit for the nearest practices"),
+    limit: Optional[int] = Query(None, description="Number of practices to return")
+):
+    """List practices nearest to a point, closest first."""
+    try:
+        result = await run_in_threadpool(nearby_practices, lat, lng, radius, limit)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
 @router.get("/practice/{practice_id}")
 async def get_practice(practice_id: int):
     """Get details of a practice."""
@@ -136,20 +209,194 @@ async def get_practitioners(practice_id: int):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
+def _requested_dates(date: Optional[str], date_from: Optional[str], date_to: Optional[str]):
+    """Normalise the date / from+to query parameters to a (from, to) pair"""
+    if date_from or date_to:
+        if not (date_from and date_to):
+            raise Exception("Both 'from' and 'to' are required for a date range")
+        return date_from, date_to
+    if date:
+        return date, date
+    raise Exception("Provide either 'date' or 'from' and 'to'")
+
 @router.get("/practice/doctors/{practioner_id}/availability")
-async def get_practioner_availability_route(practioner_id: int, date: str):
-    """Get all doctors for a practice."""
+async def get_practioner_availability_route(
+    practioner_id: int,
+    date: Optional[str] = Query(None, description="Single date (YYYY-MM-DD)"),
+    date_from: Optional[str] = Query(None, alias="from", description="First date of a range (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="Last date of a range (YYYY-MM-DD)")
+):
+    """Get a practitioner's availability for one date, or every dated slot in a from/to range."""
     try:
-        result = await run_in_threadpool(get_practioner_availability, practioner_id, date)
+        if date_from or date_to:
+            date_from, date_to = _requested_dates(None, date_from, date_to)
+            result = await run_in_threadpool(get_practioner_availability_range, practioner_id, date_from, date_to)
+        elif date:
+            result = await run_in_threadpool(get_practioner_availability, practioner_id, date)
+        else:
+            raise Exception("Provide either 'date' or 'from' and 'to'")
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/practice/{practice_id}/availability")
+async def get_practice_availability_route(
+    practice_id: int,
+    date: Optional[str] = Query(None, description="Single date (YYYY-MM-DD)"),
+    date_from: Optional[str] = Query(None, alias="from", description="First date of a range (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="Last date of a range (YYYY-MM-DD)"),
+    practitioner_ids: Optional[List[int]] = Query(None, description="Restrict to these practitioners")
+):
+    """Get availability for all active practitioners of a practice (or the given ones) in one call."""
+    try:
+        date_from, date_to = _requested_dates(date, date_from, date_to)
+        result = await run_in_threadpool(get_practice_availability, practice_id, date_from, date_to, practitioner_ids)
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
 @router.post("/practice/doctors/{practioner_id}/book-appointment")
-async def book_appointment_route(practioner_id: int, appointment_data: dict, patient_token: str = Query(..., description="Patient authentication token")):
+async def book_appointment_route(
+    request: Request,
+    practioner_id: int,
+    appointment_data: dict,
+    patient_token: str = Query(..., description="Patient authentication token"),
+    idempotency_key: Optional[str] = Header(None)
+):
     """Book an appointment with a practitioner."""
+    async def run():
+        try:
+            result = await run_in_threadpool(book_appointment_with_practioner, patient_token, practioner_id, appointment_data)
+            return result
+        except BookingConflict as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await idempotent(request, idempotency_key, appointment_data, run)
+
+@router.post("/practice/doctors/{practioner_id}/book-series")
+async def book_series_route(
+    request: Request,
+    practioner_id: int,
+    series_data: dict,
+    patient_token: str = Query(..., description="Patient authentication token"),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Book a weekly or fortnightly series of the same slot, all or nothing."""
+    async def run():
+        try:
+            result = await run_in_threadpool(book_appointment_series, patient_token, practioner_id, series_data)
+            return result
+        except BookingConflict as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={"message": str(e), "conflicts": e.conflicts})
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await idempotent(request, idempotency_key, series_data, run)
+
+@router.post("/book-family")
+async def book_family_route(
+    request: Request,
+    group_data: dict,
+    patient_token: str = Query(..., description="Patient authentication token"),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Book slots for the account holder and family members on one date, all or nothing."""
+    async def run():
+        try:
+            result = await run_in_threadpool(book_family_appointments, patient_token, group_data)
+            return result
+        except BookingConflict as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={"message": str(e), "conflicts": e.conflicts})
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await idempotent(request, idempotency_key, group_data, run)
+
+@router.post("/practice/doctors/{practioner_id}/hold")
+async def place_booking_hold_route(practioner_id: int, hold_data: dict, patient_token: str = Query(..., description="Patient authentication token")):
+    """Hold a slot for a few minutes while the patient completes the booking."""
+    try:
+        result = await run_in_threadpool(place_booking_hold, patient_token, practioner_id, hold_data)
+        return result
+    except BookingConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/holds/{hold_uuid}/confirm")
+async def confirm_booking_hold_route(
+    request: Request,
+    hold_uuid: str,
+    appointment_data: dict,
+    patient_token: str = Query(..., description="Patient authentication token"),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Confirm a held slot into a booking."""
+    async def run():
+        try:
+            result = await run_in_threadpool(confirm_booking_hold, patient_token, hold_uuid, appointment_data)
+            return result
+        except BookingConflict as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await idempotent(request, idempotency_key, appointment_data, run)
+
+@router.delete("/holds/{hold_uuid}")
+async def release_booking_hold_route(hold_uuid: str, patient_token: str = Query(..., description="Patient authentication token")):
+    """Release a held slot."""
+    try:
+        result = await run_in_threadpool(release_booking_hold, patient_token, hold_uuid)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/bookings")
+async def get_patient_bookings_route(
+    patient_token: str = Query(..., description="Patient authentication token"),
+    when: str = Query("upcoming", description="'upcoming' or 'past'"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size"),
+    include_cancelled: bool = Query(False, description="Include cancelled bookings")
+):
+    """List the patient's bookings, one keyset page at a time."""
+    try:
+        result = await run_in_threadpool(get_patient_bookings, patient_token, when, cursor, limit, include_cancelled)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/bookings/{booking_uuid}/cancel")
+async def cancel_booking_route(booking_uuid: str, patient_token: str = Query(..., description="Patient authentication token")):
+    """Cancel a booking; the slot is offered to the next waitlisted patient."""
+    try:
+        result = await run_in_threadpool(cancel_booking, patient_token, booking_uuid)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/practice/doctors/{practioner_id}/waitlist")
+async def join_waitlist_route(practioner_id: int, waitlist_data: dict, patient_token: str = Query(..., description="Patient authentication token")):
+    """Join a practitioner's waitlist for a date."""
+    try:
+        result = await run_in_threadpool(join_waitlist, patient_token, practioner_id, waitlist_data)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/waitlist")
+async def get_waitlist_route(patient_token: str = Query(..., description="Patient authentication token")):
+    """Get the patient's waitlist entries, including any slot currently offered."""
+    try:
+        result = await run_in_threadpool(get_waitlist_entries, patient_token)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.delete("/waitlist/{entry_uuid}")
+async def leave_waitlist_route(entry_uuid: str, patient_token: str = Query(..., description="Patient authentication token")):
+    """Leave a waitlist."""
     try:
-        result = await run_in_threadpool(book_appointment_with_practioner, patient_token, practioner_id, appointment_data)
+        result = await run_in_threadpool(leave_waitlist, patient_token, entry_uuid)
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
\ No newline at end of file
@@ -1,12 +1,46 @@
 
 
 
-from platformuser.models import PatientUser, PatientFamilyMember, PatientBooking
-from practiceapp.models import PracticeRegistry, PractionerRegistry, AvailabilitySlot
 import uuid
+from datetime import datetime, timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from platformuser.models import PatientUser, PatientFamilyMember, PatientBooking, BookingHold, WaitlistEntry
+from practiceapp.models import PracticeRegistry, PractionerRegistry, AvailabilitySlot, CalendarSlot, AppointmentType
+from api.config import (
+    ACCESS_TOKEN_TTL_SECONDS, BOOKING_HOLD_TTL_SECONDS, SERIES_MAX_OCCURRENCES,
+    PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+)
+from api.pagination import encode_cursor, decode_cursor, page_size
+from api.auth_service.utils import create_patient_session, get_patient_session, end_patient_session
+from api.auth_service.tokens import PATIENT, issue_access_token, verify_access_token, session_id
+from api.notification_service.utils import enqueue_booking_confirmation
+from api.notification_service.reminders import reminder_scheduler
+from api.practice_service.events import publish_bookings
+from .holds import hold_cache, hold_key, held_pairs, confirmed_hold
+from .waitlist import promote_next, expire_offers, clear_expired_hold, mark_offer_booked
+from api.practice_service.calendar import (
+    WEEKDAYS, dated_availability, parse_date_range, set_slot_state, set_slot_states, set_day_states
+)
+
+# Days between occurrences of a recurring series
+SERIES_INTERVALS = {"WEEKLY": 7, "FORTNIGHTLY": 14}
+
+# The practice directory lists these by default; the rest are requested with fields=.
+# practice_associated_with is left out of both: it holds the owner's legacy login token
+PRACTICE_LIST_FIELDS = [
+    "id", "practice_uuid", "practice_name",
+    "phone_number", "practice_website", "wheel_chair_access",
+]
+PRACTICE_DETAIL_FIELDS = [
+    "practice_accrediation", "social_media_links", "about_practice",
+    "facilities", "opening_hours", "practice_location",
+]
 
 
 def register_patient(fields):
+    """Create a patient; fields["password"] is already hashed by the route via password_hasher"""
     try:
         # Fields that should not be set during registration
         REMOVE_FIELDS = ["is_active", "is_verified", "is_deleted"]
@@ -40,7 +74,8 @@ def register_patient(fields):
     except Exception as e:
         raise Exception("Failed to register patient: " + str(e))
 
-def login_patient(fields):
+def get_login_patient(fields):
+    """Fetch the patient whose password the login route verifies off the threadpool"""
     try:
         # Validate required fields
         required_fields = ["email", "password"]
@@ -48,23 +83,33 @@ def login_patient(fields):
             if field not in fields:
                 raise ValueError(f"Missing required field: {field}")
 
-        # Get patient with matching email and password
-        try:
-            patient = PatientUser.objects.get(
-                email=fields["email"], 
-                password=fields["password"],
-                is_active=True,
-                is_deleted=False
-            )
-        except PatientUser.DoesNotExist:
+        patient = PatientUser.objects.filter(
+            email=fields["email"],
+            is_active=True,
+            is_deleted=False
+        ).first()
+        if not patient:
             raise ValueError("Invalid email or password")
+        return patient
 
-        # Generate and save authentication token
-        patient.token = str(uuid.uuid4())
-        patient.save()
+    except ValueError as e:
+        raise Exception(str(e))
+    except Exception as e:
+        raise Exception("Login failed: " + str(e))
+
+
+def login_patient(patient, password_hash=None):
+    """Open a session for a verified patient, upgrading a legacy password hash if one is passed"""
+    try:
+        if password_hash:
+            patient.password = password_hash
+            patient.save(update_fields=["password"])
+
+        # Every login gets its own session so other devices stay signed in
+        token, session = create_patient_session(patient)
 
         return {
-            "token": patient.token,
+            **_issue_tokens(patient, token, session),
             "patient_uuid": str(patient.patient_uuid),
             "email": patient.email,
             "first_name": patient.first_name
@@ -77,10 +122,48 @@ def login_patient(fields):
 
 
 
+def _issue_tokens(patient, refresh_token: str, session):
+    return {
+        "token": refresh_token,
+        "access_token": issue_access_token(PATIENT, str(patient.patient_uuid), session_id(PATIENT, session)),
+        "refresh_token": refresh_token,
+        "expires_in": ACCESS_TOKEN_TTL_SECONDS,
+    }
+
+
+def refresh_patient_token(fields):
+    """Mint a new access token from a live session; the only token path that reads the database"""
+    try:
+        session = get_patient_session(fields.get("refresh_token"))
+        if not session or not session.patient.is_active or session.patient.is_deleted:
+            raise ValueError("Invalid refresh token")
+        return _issue_tokens(session.patient, fields["refresh_token"], session)
+    except ValueError as e:
+        raise Exception(str(e))
+    except Exception as e:
+        raise Exception("Token refresh failed: " + str(e))
+
+
+def logout_patient(patient_token: str):
+    try:
+        end_patient_session(patient_token)
+        return {"message": "Logged out successfully"}
+    except Exception as e:
+        raise Exception(str(e))
+
+
 def get_patient_details(patient_token: str):
     """Get patient details."""
     try:
-        patient = PatientUser.objects.filter(token=patient_token, is_active=True, is_deleted=False).first()
+        claims = verify_access_token(patient_token, PATIENT)
+        if claims is not None:
+            # The signature already authenticated the caller; this only loads the row
+            patient = PatientUser.objects.filter(patient_uuid=claims["sub"], is_active=True, is_deleted=False).first()
+        else:
+            session = get_patient_session(patient_token)
+            patient = session.patient if session else None
+            if patient and (not patient.is_active or patient.is_deleted):
+                patient = None
         if not patient:
             raise Exception("Invalid patient token")
         return patient
@@ -92,9 +175,7 @@ def get_patient_details(patient_token: str):
 def get_family_members(patient_token: str):
     """Retrieve all family members associated with a patient via the patient's auth token."""
     try:
-        patient = PatientUser.objects.filter(token=patient_token, is_active=True, is_deleted=False).first()
-        if not patient:
-            raise Exception("Invalid patient token")
+        patient = get_patient_details(patient_token)
 
         family_members = patient.patient_family_members.all()
         result = []
@@ -114,9 +195,7 @@ def get_family_members(patient_token: str):
 def add_family_member(patient_token: str, member_data: dict):
     """Add a new family member to the given patient (identified by token)."""
     try:
-        patient = PatientUser.objects.filter(token=patient_token, is_active=True, is_deleted=False).first()
-        if not patient:
-            raise Exception("Invalid patient token")
+        patient = get_patient_details(patient_token)
 
         # Disallow editing of protected fields
         protected_fields = ["patient_family_member_uuid", "id"]
@@ -149,9 +228,7 @@ def add_family_member(patient_token: str, member_data: dict):
 def edit_family_member(patient_token: str, family_member_uuid: str, member_data: dict):
     """Edit an existing family member for a patient."""
     try:
-        patient = PatientUser.objects.filter(token=patient_token, is_active=True, is_deleted=False).first()
-        if not patient:
-            raise Exception("Invalid patient token")
+        patient = get_patient_details(patient_token)
 
         family_member = patient.patient_family_members.filter(patient_family_member_uuid=family_member_uuid).first()
         if not family_member:
@@ -172,9 +249,7 @@ def edit_family_member(patient_token: str, family_member_uuid: str, member_data:
 def delete_family_member(user_token: str, family_member_uuid: str):
     """Delete (hard delete) a family member of the patient identified by user_token."""
     try:
-        patient = PatientUser.objects.filter(token=user_token, is_active=True, is_deleted=False).first()
-        if not patient:
-            raise Exception("Invalid user token")
+        patient = get_patient_details(user_token)
 
         family_member = patient.patient_family_members.filter(patient_family_member_uuid=family_member_uuid).first()
         if not family_member:
@@ -190,19 +265,49 @@ def delete_family_member(user_token: str, family_member_uuid: str):
         raise Exception(str(e))
     
     
-def get_all_practices():
-    """Get all practices for a patient."""
+def get_all_practices(cursor: str = None, limit: int = None, fields: str = None):
+    """
+    Page through the practice directory with a keyset cursor on id.
+    
+    Rows are read with .values() over only the requested columns, so the large
+    JSON fields are not loaded unless asked for.
+    
+    Returns:
+        dict: results and next_cursor (None on the last page)
+    """
     try:
-      
-        practices = PracticeRegistry.objects.all()
-        return list(practices)
+        limit = page_size(limit, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+        
+        columns = PRACTICE_LIST_FIELDS
+        if fields:
+            columns = [field.strip() for field in fields.split(",") if field.strip()]
+            unknown = set(columns) - set(PRACTICE_LIST_FIELDS + PRACTICE_DETAIL_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            # id is the cursor key
+            if "id" not in columns:
+                columns = ["id"] + columns
+        
+        practices = PracticeRegistry.objects.order_by('id')
+        if cursor:
+            (last_id,) = decode_cursor(cursor)
+            practices = practices.filter(id__gt=last_id)
+        
+        page = list(practices.values(*columns)[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        
+        return {
+            "results": page,
+            "next_cursor": encode_cursor(page[-1]["id"]) if has_more else None,
+        }
     except Exception as e:
         raise Exception(str(e))
     
 def get_practice_details(practice_id: int):
     """Get details of a practice."""
     try:
-        practice = PracticeRegistry.objects.get(id=practice_id)
+        practice = PracticeRegistry.objects.values(*PRACTICE_LIST_FIELDS, *PRACTICE_DETAIL_FIELDS).get(id=practice_id)
         return practice
     except Exception as e:
         raise Exception(str(e))
@@ -218,80 +323,192 @@ def get_practice_practitioners(practice_id: int):
     
 def get_practioner_availability(practioner_id: int, date: str):
     """
-    Get all availability slots for a practioner on a specific date.
+    Get the availability slots a practioner offers on a specific date.
     
     Args:
         practioner_id (int): The ID of the practitioner
         date (str): Date in YYYY-MM-DD format (e.g., "2024-01-15")
     
     Returns:
-        list: Available slots for the specified date
+        list: Slots for the specified date; booked or held ones have is_available False
     """
     try:
-        practioner = PractionerRegistry.objects.filter(id=practioner_id).first()
-        if not practioner:
+        # The one-day case of the range lookup, so holds and the calendar apply here too
+        return get_practioner_availability_range(practioner_id, date, date)
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def _dated_availability(practitioner_ids: list, start, end):
+    """
+    dated_availability() with slots under a live hold reported as unavailable,
+    so patients are not offered a slot someone else is checking out.
+    """
+    dated_slots = dated_availability(practitioner_ids, start, end)
+    held = {(slot_uuid, day.isoformat()) for slot_uuid, day in held_pairs(practitioner_ids, start, end)}
+    if held:
+        for slots in dated_slots.values():
+            for slot in slots:
+                if slot['is_available'] and (slot['availability_uuid'], slot['date']) in held:
+                    slot['is_available'] = False
+    return dated_slots
+
+
+def get_practioner_availability_range(practioner_id: int, date_from: str, date_to: str):
+    """
+    Get every dated availability slot for a practitioner between two dates (inclusive).
+
+    Args:
+        practioner_id (int): The ID of the practitioner
+        date_from (str): First date in YYYY-MM-DD format
+        date_to (str): Last date in YYYY-MM-DD format
+
+    Returns:
+        list: Dated slots with is_available, ordered by date and start time
+    """
+    try:
+        start, end = parse_date_range(date_from, date_to)
+        dated_slots = _dated_availability([practioner_id], start, end)[practioner_id]
+
+        # Only an empty result needs the extra lookup to tell "no slots" from "no practitioner"
+        if not dated_slots and not PractionerRegistry.objects.filter(id=practioner_id).exists():
             raise Exception("Practitioner not found")
-        
-        # Parse the date
-        from datetime import datetime, timedelta
-        target_date = datetime.strptime(date, '%Y-%m-%d').date()
-        
-        # Calculate the start and end of the week for the target date
-        days_since_monday = target_date.weekday()
-        week_start = target_date - timedelta(days=days_since_monday)
-        week_end = week_start + timedelta(days=6)
-        
-        # Get all availability slots for the practitioner
-        availability_slots = AvailabilitySlot.objects.filter(
-            practitioner=practioner, 
-            is_active=True
-        ).values(
-            'availability_uuid',
-            'day_of_week', 
-            'start_time',
-            'end_time'
-        )
-        
-        # Check which slots are already booked on this specific date
-        booked_slots_on_date = PatientBooking.objects.filter(
-            practitioner=practioner,
-            booking_date=target_date,
-            is_active=True,
-            is_deleted=False
-        ).values_list('booking_slot', flat=True)
-        
-        print(booked_slots_on_date)
-        
-        # Check which availability UUIDs are booked for the entire week
-        booked_availability_uuids_in_week = PatientBooking.objects.filter(
-            practitioner=practioner,
-            booking_date__range=[week_start, week_end],
-            is_active=True,
-            is_deleted=False
-        ).values_list('booking_slot', flat=True)
-        
-        # Mark slots as available or booked
-        available_slots = []
-        for slot in availability_slots:
-            slot_info = dict(slot)
-            # Check if slot is booked on specific date OR if the availability UUID is used anywhere in the week
-            is_booked = (slot['availability_uuid'] in booked_slots_on_date or 
-                        slot['availability_uuid'] in booked_availability_uuids_in_week)
-            slot_info['is_available'] = not is_booked
-            slot_info['date'] = date
-            available_slots.append(slot_info)
-        
-        return available_slots
+        return dated_slots
     except Exception as e:
         raise Exception(str(e))
+
     
+def get_practice_availability(practice_id: int, date_from: str, date_to: str, practitioner_ids: list = None):
+    """
+    Get dated availability for every active practitioner of a practice, or only
+    the given practitioner ids, in three queries however many practitioners there are.
+
+    Args:
+        practice_id (int): The ID of the practice
+        date_from (str): First date in YYYY-MM-DD format
+        date_to (str): Last date in YYYY-MM-DD format (same as date_from for a single day)
+        practitioner_ids (list): Optional practitioner IDs to restrict the result to
+
+    Returns:
+        list: One entry per practitioner with their dated slots
+    """
+    try:
+        start, end = parse_date_range(date_from, date_to)
+
+        practitioners = PractionerRegistry.objects.filter(practioner_belong_to=practice_id, is_active=True)
+        if practitioner_ids:
+            practitioners = practitioners.filter(id__in=practitioner_ids)
+        practitioners = list(practitioners.order_by('display_name').values('id', 'practitioner_uuid', 'display_name'))
+        if not practitioners:
+            return []
+
+        dated_slots = _dated_availability([p['id'] for p in practitioners], start, end)
+        return [
+            {
+                'practitioner_id': practitioner['id'],
+                'practitioner_uuid': practitioner['practitioner_uuid'],
+                'display_name': practitioner['display_name'],
+                'slots': dated_slots[practitioner['id']],
+            }
+            for practitioner in practitioners
+        ]
+    except Exception as e:
+        raise Exception(str(e))
+
+    
+class BookingConflict(Exception):
+    """The requested slot was booked or is held by someone else"""
+
+    def __init__(self, message: str, conflicts: list = None):
+        super().__init__(message)
+        # Per-occurrence details for multi-slot requests
+        self.conflicts = conflicts or []
+
+
+def _slot_taken(practitioner_id: int, booking_date, availability_uuid) -> bool:
+    return PatientBooking.objects.filter(
+        practitioner_id=practitioner_id,
+        booking_date=booking_date,
+        booking_slot_id=availability_uuid,
+        is_active=True,
+        is_deleted=False
+    ).exists()
+
+
+def _bookable_slot(practitioner, slot_uuid, date_value):
+    """Return (slot, date) when the practitioner offers slot_uuid on that date"""
+    booking_date = datetime.strptime(str(date_value), '%Y-%m-%d').date()
+    slot = AvailabilitySlot.objects.filter(
+        availability_uuid=slot_uuid,
+        practitioner=practitioner,
+        is_active=True
+    ).first()
+    if not slot:
+        raise Exception("Availability slot not found")
+    if slot.day_of_week != WEEKDAYS[booking_date.weekday()]:
+        raise Exception("Availability slot is not offered on this date")
+    return slot, booking_date
+
+
+def _live_hold(practitioner_id: int, booking_date, slot_uuid, patient_id: int):
+    """The unexpired hold on a slot occurrence as a CachedHold, or None"""
+    key = hold_key(practitioner_id, booking_date, slot_uuid)
+    cached = hold_cache.get(key)
+    if cached is not None and (cached.patient_id == patient_id or confirmed_hold(key, cached)):
+        return cached
+    hold = BookingHold.objects.filter(
+        practitioner_id=practitioner_id,
+        hold_date=booking_date,
+        hold_slot_id=slot_uuid,
+        expires_at__gt=timezone.now()
+    ).first()
+    if hold is None:
+        return None
+    hold_cache.set(key, hold)
+    return hold_cache.get(key)
+
+
+def _insert_booking(patient, practitioner, slot, booking_date, appointment_data: dict, hold=None):
+    """Create the booking (consuming the patient's hold, if any) in one transaction"""
+    # Optimistic insert: the partial unique constraint arbitrates concurrent
+    # requests for the same slot, so no lock is taken before writing
+    try:
+        with transaction.atomic():
+            booking = PatientBooking.objects.create(
+                patient=patient,
+                practitioner=practitioner,
+                appointment_id=appointment_data["appointment_type"],
+                booking_date=booking_date,
+                booking_slot=slot,
+                booking_notes=appointment_data.get("booking_notes", "")
+            )
+            if hold is not None:
+                mark_offer_booked(hold.hold_uuid)
+                BookingHold.objects.filter(hold_uuid=hold.hold_uuid).delete()
+            set_slot_state(slot.availability_uuid, booking_date, CalendarSlot.BOOKED)
+            enqueue_booking_confirmation(patient, [booking])
+            transaction.on_commit(lambda: reminder_scheduler.schedule([booking]))
+            publish_bookings("booking.created", [booking])
+    except IntegrityError:
+        if _slot_taken(practitioner.id, booking_date, slot.availability_uuid):
+            raise BookingConflict("This slot has already been booked")
+        raise
+    hold_cache.discard(hold_key(practitioner.id, booking_date, slot.availability_uuid))
+
+    return {
+        "booking_uuid": str(booking.patient_booking_uuid),
+        "patient": patient.first_name,
+        "practitioner": practitioner.display_name,
+        "booking_date": booking.booking_date,
+        "message": "Appointment booked successfully"
+    }
+
+
 def book_appointment_with_practioner(patient_token: str, practioner_id: int, appointment_data: dict):
     """Book an appointment with a practitioner."""
     try:
         # Validate patient token
-        patient = PatientUser.objects.filter(token=patient_token).first()
-        if not patient:
-            raise Exception("Invalid patient token")
+        patient = get_patient_details(patient_token)
         
         # Validate practitioner
         practitioner = PractionerRegistry.objects.filter(id=practioner_id).first()
@@ -304,25 +521,559 @@ def book_appointment_with_practioner(patient_token: str, practioner_id: int, app
             if field not in appointment_data:
                 raise ValueError(f"Missing required field: {field}")
         
-        # Create booking
-        booking = PatientBooking.objects.create(
+        slot, booking_date = _bookable_slot(practitioner, appointment_data["booking_slot"], appointment_data["booking_date"])
+        
+        hold = _live_hold(practitioner.id, booking_date, slot.availability_uuid, patient.id)
+        if hold is not None and hold.patient_id != patient.id:
+            raise BookingConflict("This slot is currently held by another patient")
+        
+        return _insert_booking(patient, practitioner, slot, booking_date, appointment_data, hold)
+        
+    except BookingConflict:
+        raise
+    except ValueError as e:
+        raise Exception(str(e))
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def _series_dates(series_data: dict) -> list:
+    """Occurrence dates for a weekly/fortnightly rule bounded by count or until"""
+    start = datetime.strptime(str(series_data["start_date"]), '%Y-%m-%d').date()
+    frequency = str(series_data.get("frequency", "WEEKLY")).upper()
+    if frequency not in SERIES_INTERVALS:
+        raise ValueError(f"frequency must be one of {', '.join(SERIES_INTERVALS)}")
+    step = timedelta(days=SERIES_INTERVALS[frequency])
+    
+    if series_data.get("count"):
+        count = int(series_data["count"])
+    elif series_data.get("until"):
+        until = datetime.strptime(str(series_data["until"]), '%Y-%m-%d').date()
+        if until < start:
+            raise ValueError("until must not be before start_date")
+        count = (until - start) // step + 1
+    else:
+        raise ValueError("Provide either count or until")
+    if count < 1 or count > SERIES_MAX_OCCURRENCES:
+        raise ValueError(f"A series must have between 1 and {SERIES_MAX_OCCURRENCES} occurrences")
+    return [start + step * i for i in range(count)]
+
+
+def book_appointment_series(patient_token: str, practioner_id: int, series_data: dict):
+    """
+    Book a recurring series of one slot in a single transaction.
+    
+    series_data: appointment_type, booking_slot, start_date, frequency (WEEKLY or
+    FORTNIGHTLY), count or until, optional booking_notes. Either every occurrence
+    is booked or none is, with the conflicting dates reported.
+    """
+    try:
+        patient = get_patient_details(patient_token)
+        
+        practitioner = PractionerRegistry.objects.filter(id=practioner_id).first()
+        if not practitioner:
+            raise Exception("Practitioner not found")
+        
+        required_fields = ["appointment_type", "booking_slot", "start_date"]
+        for field in required_fields:
+            if field not in series_data:
+                raise ValueError(f"Missing required field: {field}")
+        
+        dates = _series_dates(series_data)
+        # Every occurrence shares the start date's weekday, so validating it covers the series
+        slot, _start = _bookable_slot(practitioner, series_data["booking_slot"], dates[0])
+        
+        def find_conflicts():
+            # One query per table over the whole series instead of one per occurrence
+            booked = set(PatientBooking.objects.filter(
+                booking_slot=slot,
+                booking_date__in=dates,
+                is_active=True,
+                is_deleted=False
+            ).values_list('booking_date', flat=True))
+            held = set(BookingHold.objects.filter(
+                hold_slot=slot,
+                hold_date__in=dates,
+                expires_at__gt=timezone.now()
+            ).exclude(patient=patient).values_list('hold_date', flat=True))
+            return [
+                {"booking_date": day.isoformat(), "reason": "booked" if day in booked else "held"}
+                for day in dates
+                if day in booked or day in held
+            ]
+        
+        conflicts = find_conflicts()
+        if conflicts:
+            raise BookingConflict("Some occurrences of this series are not available", conflicts)
+        
+        appointment = AppointmentType.objects.filter(id=series_data["appointment_type"]).first()
+        if not appointment:
+            raise Exception("Appointment type not found")
+        
+        series_uuid = uuid.uuid4()
+        bookings = [
+            PatientBooking(
+                patient=patient,
+                practitioner=practitioner,
+                appointment=appointment,
+                booking_date=day,
+                booking_slot=slot,
+                booking_notes=series_data.get("booking_notes", ""),
+                series_uuid=series_uuid
+            )
+            for day in dates
+        ]
+        try:
+            with transaction.atomic():
+                PatientBooking.objects.bulk_create(bookings)
+                # The patient's own holds on these occurrences are now spent
+                BookingHold.objects.filter(hold_slot=slot, hold_date__in=dates, patient=patient).delete()
+                set_slot_states(slot.availability_uuid, dates, CalendarSlot.BOOKED)
+                enqueue_booking_confirmation(patient, bookings)
+                transaction.on_commit(lambda: reminder_scheduler.schedule(bookings))
+                publish_bookings("booking.created", bookings)
+        except IntegrityError:
+            conflicts = find_conflicts()
+            if conflicts:
+                raise BookingConflict("Some occurrences of this series are not available", conflicts)
+            raise
+        for day in dates:
+            hold_cache.discard(hold_key(practitioner.id, day, slot.availability_uuid))
+        
+        return {
+            "series_uuid": str(series_uuid),
+            "practitioner": practitioner.display_name,
+            "bookings": [
+                {"booking_uuid": str(booking.patient_booking_uuid), "booking_date": booking.booking_date}
+                for booking in bookings
+            ],
+            "message": f"{len(bookings)} appointments booked successfully"
+        }
+    except BookingConflict:
+        raise
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def book_family_appointments(patient_token: str, group_data: dict):
+    """
+    Book several slots on one date for the account holder and their family
+    members, back-to-back with one practitioner or in parallel with several.
+    
+    group_data: booking_date, appointment_type, and bookings: a list of
+    {booking_slot, practitioner_id, family_member (uuid, omitted for the
+    account holder), optional appointment_type and booking_notes}. Either every
+    slot is booked or none is.
+    """
+    try:
+        patient = get_patient_details(patient_token)
+        
+        required_fields = ["booking_date", "bookings"]
+        for field in required_fields:
+            if field not in group_data:
+                raise ValueError(f"Missing required field: {field}")
+        requested = group_data["bookings"]
+        if not requested:
+            raise ValueError("bookings must not be empty")
+        booking_date = datetime.strptime(str(group_data["booking_date"]), '%Y-%m-%d').date()
+        
+        slot_uuids = [str(item.get("booking_slot")) for item in requested]
+        if len(set(slot_uuids)) != len(slot_uuids):
+            raise ValueError("Each slot can only be booked once per group")
+        
+        member_uuids = {str(item["family_member"]) for item in requested if item.get("family_member")}
+        members = {
+            str(member.patient_family_member_uuid): member
+            for member in patient.patient_family_members.filter(patient_family_member_uuid__in=member_uuids)
+        }
+        if len(members) != len(member_uuids):
+            raise Exception("Family member not found")
+        
+        slots = {
+            str(slot.availability_uuid): slot
+            for slot in AvailabilitySlot.objects.select_related('practitioner').filter(
+                availability_uuid__in=slot_uuids,
+                is_active=True
+            )
+        }
+        weekday = WEEKDAYS[booking_date.weekday()]
+        for item, slot_uuid in zip(requested, slot_uuids):
+            slot = slots.get(slot_uuid)
+            if not slot or slot.practitioner_id != int(item.get("practitioner_id", slot.practitioner_id)):
+                raise Exception(f"Availability slot not found: {slot_uuid}")
+            if slot.day_of_week != weekday:
+                raise Exception(f"Availability slot {slot_uuid} is not offered on this date")
+        
+        def find_conflicts():
+            # Every slot is on the same date, so one query per table covers the group
+            booked = set(PatientBooking.objects.filter(
+                booking_slot__in=slot_uuids,
+                booking_date=booking_date,
+                is_active=True,
+                is_deleted=False
+            ).values_list('booking_slot', flat=True))
+            held = set(BookingHold.objects.filter(
+                hold_slot__in=slot_uuids,
+                hold_date=booking_date,
+                expires_at__gt=timezone.now()
+            ).exclude(patient=patient).values_list('hold_slot', flat=True))
+            return [
+                {"booking_slot": slot_uuid, "reason": "booked" if uuid.UUID(slot_uuid) in booked else "held"}
+                for slot_uuid in slot_uuids
+                if uuid.UUID(slot_uuid) in booked or uuid.UUID(slot_uuid) in held
+            ]
+        
+        conflicts = find_conflicts()
+        if conflicts:
+            raise BookingConflict("Some slots in this group are not available", conflicts)
+        
+        appointment_ids = [item.get("appointment_type", group_data.get("appointment_type")) for item in requested]
+        if None in appointment_ids:
+            raise ValueError("Missing required field: appointment_type")
+        appointments = AppointmentType.objects.in_bulk(set(appointment_ids))
+        
+        bookings = []
+        for item, slot_uuid, appointment_id in zip(requested, slot_uuids, appointment_ids):
+            if int(appointment_id) not in appointments:
+                raise Exception("Appointment type not found")
+            bookings.append(PatientBooking(
+                patient=patient,
+                practitioner=slots[slot_uuid].practitioner,
+                family_member=members.get(str(item["family_member"])) if item.get("family_member") else None,
+                appointment=appointments[int(appointment_id)],
+                booking_date=booking_date,
+                booking_slot=slots[slot_uuid],
+                booking_notes=item.get("booking_notes", "")
+            ))
+        try:
+            with transaction.atomic():
+                PatientBooking.objects.bulk_create(bookings)
+                BookingHold.objects.filter(hold_slot__in=slot_uuids, hold_date=booking_date, patient=patient).delete()
+                set_day_states(slot_uuids, booking_date, CalendarSlot.BOOKED)
+                enqueue_booking_confirmation(patient, bookings)
+                transaction.on_commit(lambda: reminder_scheduler.schedule(bookings))
+                publish_bookings("booking.created", bookings)
+        except IntegrityError:
+            conflicts = find_conflicts()
+            if conflicts:
+                raise BookingConflict("Some slots in this group are not available", conflicts)
+            raise
+        for slot_uuid in slot_uuids:
+            hold_cache.discard(hold_key(slots[slot_uuid].practitioner_id, booking_date, slot_uuid))
+        
+        return {
+            "booking_date": booking_date,
+            "bookings": [
+                {
+                    "booking_uuid": str(booking.patient_booking_uuid),
+                    "practitioner": booking.practitioner.display_name,
+                    "booking_slot": str(booking.booking_slot_id),
+                    "family_member": str(booking.family_member.patient_family_member_uuid) if booking.family_member else None,
+                }
+                for booking in bookings
+            ],
+            "message": f"{len(bookings)} appointments booked successfully"
+        }
+    except BookingConflict:
+        raise
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def place_booking_hold(patient_token: str, practioner_id: int, hold_data: dict):
+    """Hold a slot occurrence for BOOKING_HOLD_TTL_SECONDS while the patient completes the booking."""
+    try:
+        patient = get_patient_details(patient_token)
+        
+        practitioner = PractionerRegistry.objects.filter(id=practioner_id).first()
+        if not practitioner:
+            raise Exception("Practitioner not found")
+        
+        required_fields = ["booking_date", "booking_slot"]
+        for field in required_fields:
+            if field not in hold_data:
+                raise ValueError(f"Missing required field: {field}")
+        
+        slot, hold_date = _bookable_slot(practitioner, hold_data["booking_slot"], hold_data["booking_date"])
+        key = hold_key(practitioner.id, hold_date, slot.availability_uuid)
+        
+        # Fail early on a known hold before trying the insert
+        cached = hold_cache.get(key)
+        if cached is not None and cached.patient_id != patient.id and confirmed_hold(key, cached):
+            raise BookingConflict("This slot is currently held by another patient")
+        if _slot_taken(practitioner.id, hold_date, slot.availability_uuid):
+            raise BookingConflict("This slot has already been booked")
+        
+        try:
+            with transaction.atomic():
+                # Lazily clear an expired hold on this occurrence so the unique constraint admits ours
+                clear_expired_hold(practitioner.id, slot.availability_uuid, hold_date)
+                hold = BookingHold.objects.create(
+                    patient=patient,
+                    practitioner=practitioner,
+                    hold_slot=slot,
+                    hold_date=hold_date,
+                    expires_at=timezone.now() + timedelta(seconds=BOOKING_HOLD_TTL_SECONDS)
+                )
+        except IntegrityError:
+            hold = BookingHold.objects.filter(practitioner=practitioner, hold_date=hold_date, hold_slot=slot).first()
+            if hold is None or hold.patient_id != patient.id:
+                if hold is not None:
+                    hold_cache.set(key, hold)
+                raise BookingConflict("This slot is currently held by another patient")
+        hold_cache.set(key, hold)
+        
+        return {
+            "hold_uuid": str(hold.hold_uuid),
+            "practitioner": practitioner.display_name,
+            "booking_date": hold.hold_date,
+            "booking_slot": str(slot.availability_uuid),
+            "expires_at": hold.expires_at,
+            "message": "Slot held successfully"
+        }
+    except BookingConflict:
+        raise
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def _patient_hold(patient, hold_uuid: str):
+    hold = BookingHold.objects.select_related('practitioner', 'hold_slot').filter(
+        hold_uuid=hold_uuid,
+        patient=patient
+    ).first()
+    if not hold:
+        raise Exception("Hold not found")
+    return hold
+
+
+def _drop_hold(hold):
+    """Delete a hold; if it was a waitlist offer, offer the slot to the next patient"""
+    reoffer = expire_offers([hold.id])
+    hold.delete()
+    hold_cache.discard(hold_key(hold.practitioner_id, hold.hold_date, hold.hold_slot_id))
+    for practitioner_id, slot_uuid, slot_date in reoffer:
+        promote_next(practitioner_id, slot_uuid, slot_date)
+
+
+def confirm_booking_hold(patient_token: str, hold_uuid: str, appointment_data: dict):
+    """Turn a live hold into a booking."""
+    try:
+        patient = get_patient_details(patient_token)
+        hold = _patient_hold(patient, hold_uuid)
+        if hold.expires_at <= timezone.now():
+            _drop_hold(hold)
+            raise Exception("Hold has expired")
+        
+        if "appointment_type" not in appointment_data:
+            raise ValueError("Missing required field: appointment_type")
+        
+        return _insert_booking(patient, hold.practitioner, hold.hold_slot, hold.hold_date, appointment_data, hold)
+    except BookingConflict:
+        raise
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def release_booking_hold(patient_token: str, hold_uuid: str):
+    """Give a held slot back before the hold expires."""
+    try:
+        patient = get_patient_details(patient_token)
+        hold = _patient_hold(patient, hold_uuid)
+        _drop_hold(hold)
+        return {"message": "Hold released successfully"}
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def get_patient_bookings(patient_token: str, when: str = "upcoming", cursor: str = None, limit: int = None, include_cancelled: bool = False):
+    """
+    Page through the patient's bookings with a keyset cursor on (booking_date, id).
+    
+    Upcoming bookings come soonest first, past bookings most recent first. Each
+    page is an index range scan from the cursor, so deep pages cost the same as
+    the first.
+    
+    Returns:
+        dict: results and next_cursor (None on the last page)
+    """
+    try:
+        patient = get_patient_details(patient_token)
+        limit = page_size(limit, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+        today = timezone.localdate()
+        
+        bookings = PatientBooking.objects.select_related(
+            'practitioner', 'appointment', 'booking_slot', 'family_member'
+        ).filter(patient=patient)
+        if not include_cancelled:
+            bookings = bookings.filter(is_deleted=False)
+        
+        if when == "upcoming":
+            bookings = bookings.filter(booking_date__gte=today).order_by('booking_date', 'id')
+        elif when == "past":
+            bookings = bookings.filter(booking_date__lt=today).order_by('-booking_date', '-id')
+        else:
+            raise ValueError("when must be 'upcoming' or 'past'")
+        
+        if cursor:
+            cursor_date, cursor_id = decode_cursor(cursor)
+            if when == "upcoming":
+                bookings = bookings.filter(
+                    Q(booking_date__gt=cursor_date) | Q(booking_date=cursor_date, id__gt=cursor_id)
+                )
+            else:
+                bookings = bookings.filter(
+                    Q(booking_date__lt=cursor_date) | Q(booking_date=cursor_date, id__lt=cursor_id)
+                )
+        
+        page = list(bookings[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        
+        results = []
+        for booking in page:
+            slot = booking.booking_slot
+            member = booking.family_member
+            results.append({
+                "booking_uuid": str(booking.patient_booking_uuid),
+                "booking_date": booking.booking_date,
+                "start_time": slot.start_time if slot else None,
+                "end_time": slot.end_time if slot else None,
+                "practitioner_uuid": str(booking.practitioner.practitioner_uuid),
+                "practitioner": booking.practitioner.display_name,
+                "appointment_type": booking.appointment.type_of_consultation,
+                "family_member": member.first_name if member else None,
+                "booking_notes": booking.booking_notes,
+                "series_uuid": str(booking.series_uuid) if booking.series_uuid else None,
+                "is_cancelled": booking.is_deleted,
+            })
+        
+        return {
+            "results": results,
+            "next_cursor": encode_cursor(page[-1].booking_date, page[-1].id) if has_more else None,
+        }
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def cancel_booking(patient_token: str, booking_uuid: str):
+    """Cancel a booking (soft delete) and offer the freed slot to the waitlist."""
+    try:
+        patient = get_patient_details(patient_token)
+        # Rows deactivated as duplicates are not live bookings; cancelling one would reopen a taken slot
+        booking = PatientBooking.objects.select_related('practitioner').filter(
+            patient_booking_uuid=booking_uuid,
             patient=patient,
-            practitioner=practitioner,
-            appointment_id=appointment_data["appointment_type"],
-            booking_date=appointment_data["booking_date"],
-            booking_slot=appointment_data["booking_slot"],
-            booking_notes=appointment_data.get("booking_notes", "")
-        )
+            is_active=True,
+            is_deleted=False
+        ).first()
+        if not booking:
+            raise Exception("Booking not found")
+        
+        with transaction.atomic():
+            # Conditional so that of two concurrent cancels only one runs the side effects
+            cancelled = PatientBooking.objects.filter(
+                id=booking.id,
+                is_active=True,
+                is_deleted=False
+            ).update(is_active=False, is_deleted=True, updated_at=timezone.now())
+            if not cancelled:
+                raise Exception("Booking not found")
+            booking.is_active, booking.is_deleted = False, True
+            if booking.booking_slot_id:
+                set_slot_state(booking.booking_slot_id, booking.booking_date, CalendarSlot.OPEN)
+            publish_bookings("booking.cancelled", [booking])
+        reminder_scheduler.unschedule([booking.id])
+        
+        offered = None
+        if booking.booking_slot_id and booking.booking_date:
+            offered = promote_next(booking.practitioner_id, booking.booking_slot_id, booking.booking_date)
         
         return {
             "booking_uuid": str(booking.patient_booking_uuid),
-            "patient": patient.first_name,
+            "offered_to_waitlist": offered is not None,
+            "message": "Booking cancelled successfully"
+        }
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def join_waitlist(patient_token: str, practioner_id: int, waitlist_data: dict):
+    """Queue the patient for the next slot that frees up with a practitioner on a date."""
+    try:
+        patient = get_patient_details(patient_token)
+        
+        practitioner = PractionerRegistry.objects.filter(id=practioner_id).first()
+        if not practitioner:
+            raise Exception("Practitioner not found")
+        
+        if "booking_date" not in waitlist_data:
+            raise ValueError("Missing required field: booking_date")
+        waitlist_date = datetime.strptime(str(waitlist_data["booking_date"]), '%Y-%m-%d').date()
+        if waitlist_date < timezone.localdate():
+            raise Exception("Cannot join the waitlist for a past date")
+        
+        try:
+            entry = WaitlistEntry.objects.create(
+                patient=patient,
+                practitioner=practitioner,
+                waitlist_date=waitlist_date
+            )
+        except IntegrityError:
+            raise Exception("Already on the waitlist for this date")
+        
+        return {
+            "entry_uuid": str(entry.entry_uuid),
             "practitioner": practitioner.display_name,
-            "booking_date": booking.booking_date,
-            "message": "Appointment booked successfully"
+            "booking_date": entry.waitlist_date,
+            "message": "Added to waitlist successfully"
         }
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def get_waitlist_entries(patient_token: str):
+    """Get the patient's waiting and offered waitlist entries."""
+    try:
+        patient = get_patient_details(patient_token)
+        entries = WaitlistEntry.objects.select_related('practitioner', 'offered_hold').filter(
+            patient=patient,
+            state__in=[WaitlistEntry.WAITING, WaitlistEntry.OFFERED]
+        ).order_by('waitlist_date', 'created_at')
         
-    except ValueError as e:
+        entries_list = []
+        for entry in entries:
+            hold = entry.offered_hold
+            entries_list.append({
+                "entry_uuid": str(entry.entry_uuid),
+                "practitioner": entry.practitioner.display_name,
+                "booking_date": entry.waitlist_date,
+                "state": entry.state,
+                "offered_hold_uuid": str(hold.hold_uuid) if hold else None,
+                "offered_slot": str(hold.hold_slot_id) if hold else None,
+                "offer_expires_at": hold.expires_at if hold else None,
+            })
+        return entries_list
+    except Exception as e:
         raise Exception(str(e))
+
+
+def leave_waitlist(patient_token: str, entry_uuid: str):
+    """Leave a waitlist; an outstanding offer is passed on to the next patient."""
+    try:
+        patient = get_patient_details(patient_token)
+        entry = WaitlistEntry.objects.select_related('offered_hold').filter(
+            entry_uuid=entry_uuid,
+            patient=patient,
+            state__in=[WaitlistEntry.WAITING, WaitlistEntry.OFFERED]
+        ).first()
+        if not entry:
+            raise Exception("Waitlist entry not found")
+        
+        hold = entry.offered_hold
+        if hold is not None:
+            _drop_hold(hold)
+        WaitlistEntry.objects.filter(id=entry.id).update(state=WaitlistEntry.LEFT, updated_at=timezone.now())
+        return {"message": "Removed from waitlist successfully"}
     except Exception as e:
-        raise Exception(str(e))
\ No newline at end of file
+        raise Exception(str(e))
@@ -0,0 +1,120 @@
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from api.config import LOGGER_NAME, WAITLIST_OFFER_TTL_SECONDS
+from platformuser.models import BookingHold, PatientBooking, WaitlistEntry
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def _queue_head(practitioner_id: int, slot_date) -> Optional[WaitlistEntry]:
+    """Oldest waiting entry; a seek on the waitlist_queue index rather than a scan"""
+    return WaitlistEntry.objects.filter(
+        practitioner_id=practitioner_id,
+        waitlist_date=slot_date,
+        state=WaitlistEntry.WAITING
+    ).order_by('created_at', 'id').first()
+
+
+def _occurrence_free(practitioner_id: int, slot_uuid, slot_date) -> bool:
+    now = timezone.now()
+    booked = PatientBooking.objects.filter(
+        practitioner_id=practitioner_id,
+        booking_date=slot_date,
+        booking_slot_id=slot_uuid,
+        is_active=True,
+        is_deleted=False
+    ).exists()
+    held = BookingHold.objects.filter(
+        practitioner_id=practitioner_id,
+        hold_date=slot_date,
+        hold_slot_id=slot_uuid,
+        expires_at__gt=now
+    ).exists()
+    return not booked and not held
+
+
+def promote_next(practitioner_id: int, slot_uuid, slot_date) -> Optional[WaitlistEntry]:
+    """Offer a freed slot occurrence to the longest-waiting patient as a hold.
+
+    Entries are claimed with a conditional update, so concurrent promotions for
+    the same date never offer two slots to one entry. Returns the promoted entry.
+    """
+    if slot_date < timezone.localdate() or not _occurrence_free(practitioner_id, slot_uuid, slot_date):
+        return None
+
+    while True:
+        entry = _queue_head(practitioner_id, slot_date)
+        if entry is None:
+            return None
+        try:
+            with transaction.atomic():
+                claimed = WaitlistEntry.objects.filter(id=entry.id, state=WaitlistEntry.WAITING).update(
+                    state=WaitlistEntry.OFFERED,
+                    updated_at=timezone.now()
+                )
+                if not claimed:
+                    # Another worker promoted this entry first; try the next one
+                    continue
+                clear_expired_hold(practitioner_id, slot_uuid, slot_date)
+                hold = BookingHold.objects.create(
+                    patient_id=entry.patient_id,
+                    practitioner_id=practitioner_id,
+                    hold_slot_id=slot_uuid,
+                    hold_date=slot_date,
+                    expires_at=timezone.now() + timedelta(seconds=WAITLIST_OFFER_TTL_SECONDS)
+                )
+                WaitlistEntry.objects.filter(id=entry.id).update(offered_hold=hold)
+        except IntegrityError:
+            # Someone held the slot in the meantime; the entry stays WAITING
+            return None
+        entry.state = WaitlistEntry.OFFERED
+        entry.offered_hold = hold
+        logger.info(f"Offered {slot_uuid} on {slot_date} to waitlist entry {entry.entry_uuid}")
+        return entry
+
+
+def expire_offers(hold_ids: list) -> list:
+    """Mark the waitlist offers behind these holds as expired.
+
+    Returns the (practitioner_id, slot_uuid, date) occurrences to promote again
+    once the holds themselves are deleted.
+    """
+    offers = list(
+        WaitlistEntry.objects
+        .filter(offered_hold_id__in=hold_ids, state=WaitlistEntry.OFFERED)
+        .values_list('id', 'offered_hold__practitioner_id', 'offered_hold__hold_slot', 'offered_hold__hold_date')
+    )
+    if not offers:
+        return []
+    WaitlistEntry.objects.filter(id__in=[offer[0] for offer in offers]).update(
+        state=WaitlistEntry.EXPIRED,
+        updated_at=timezone.now()
+    )
+    return [tuple(offer[1:]) for offer in offers]
+
+
+def clear_expired_hold(practitioner_id: int, slot_uuid, slot_date):
+    """Lazily delete an expired hold on one occurrence so a new hold can take its place"""
+    expired_ids = list(BookingHold.objects.filter(
+        practitioner_id=practitioner_id,
+        hold_date=slot_date,
+        hold_slot_id=slot_uuid,
+        expires_at__lte=timezone.now()
+    ).values_list('id', flat=True))
+    if expired_ids:
+        # The occurrence is being re-held right away, so lapsed offers are not passed on
+        expire_offers(expired_ids)
+        BookingHold.objects.filter(id__in=expired_ids).delete()
+
+
+def mark_offer_booked(hold_uuid):
+    """The waitlisted patient confirmed their offered hold"""
+    WaitlistEntry.objects.filter(offered_hold__hold_uuid=hold_uuid, state=WaitlistEntry.OFFERED).update(
+        state=WaitlistEntry.BOOKED,
+        updated_at=timezone.now()
+    )
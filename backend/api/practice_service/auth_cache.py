@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from api.config import AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS
+
+
+class ResolvedCaller(NamedTuple):
+    """Who a practice auth token belongs to and which practice it resolves to"""
+    user_id: int
+    practice_id: Optional[int]
+    role: Optional[str]
+
+
+class TokenCache:
+    """Bounded LRU cache with a per-entry TTL mapping auth tokens to resolved callers.
+
+    The cache is per-process, so invalidation only reaches the current worker;
+    the TTL bounds how long another worker can serve a stale resolution.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # token -> (ResolvedCaller, expires_at)
+        self._tokens_by_user = {}
+        self._tokens_by_practice = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[ResolvedCaller]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            caller, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return caller
+
+    def set(self, token: str, caller: ResolvedCaller, max_age_seconds: Optional[float] = None):
+        """Cache a resolution; max_age_seconds caps the TTL, e.g. at the session's expiry"""
+        ttl_seconds = self.ttl_seconds
+        if max_age_seconds is not None:
+            ttl_seconds = min(ttl_seconds, max_age_seconds)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (caller, time.monotonic() + ttl_seconds)
+            self._tokens_by_user.setdefault(caller.user_id, set()).add(token)
+            if caller.practice_id is not None:
+                self._tokens_by_practice.setdefault(caller.practice_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest_token = next(iter(self._entries))
+                self._remove(oldest_token)
+                self.evictions += 1
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def invalidate_practice(self, practice_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_practice.get(practice_id, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self._tokens_by_practice.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, token: str):
+        caller, _expires_at = self._entries.pop(token)
+        self._discard(self._tokens_by_user, caller.user_id, token)
+        if caller.practice_id is not None:
+            self._discard(self._tokens_by_practice, caller.practice_id, token)
+
+    @staticmethod
+    def _discard(index: dict, key: int, token: str):
+        tokens = index.get(key)
+        if tokens is None:
+            return
+        tokens.discard(token)
+        if not tokens:
+            del index[key]
+
+
+token_cache = TokenCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
@@ -0,0 +1,223 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.config import AVAILABILITY_MAX_RANGE_DAYS, CALENDAR_HORIZON_WEEKS, CALENDAR_TRUSTED_WEEKS
+from practiceapp.models import AvailabilitySlot, CalendarSlot
+from platformuser.models import PatientBooking
+
+# AvailabilitySlot.day_of_week values indexed by date.weekday()
+WEEKDAYS = [day for day, _label in AvailabilitySlot.DAYS_OF_WEEK]
+
+
+def parse_date_range(date_from: str, date_to: str):
+    """Parse an inclusive YYYY-MM-DD range, capped at AVAILABILITY_MAX_RANGE_DAYS"""
+    start = datetime.strptime(date_from, '%Y-%m-%d').date()
+    end = datetime.strptime(date_to, '%Y-%m-%d').date()
+    if end < start:
+        raise ValueError("'to' date must not be before 'from' date")
+    if (end - start).days + 1 > AVAILABILITY_MAX_RANGE_DAYS:
+        raise ValueError(f"Date range cannot exceed {AVAILABILITY_MAX_RANGE_DAYS} days")
+    return start, end
+
+
+def horizon_end(today: Optional[date] = None) -> date:
+    """Last date roll_calendar materializes"""
+    today = today or timezone.localdate()
+    return today + timedelta(weeks=CALENDAR_HORIZON_WEEKS) - timedelta(days=1)
+
+
+def trusted_window(today: Optional[date] = None):
+    """Dates that availability reads may serve from CalendarSlot alone"""
+    today = today or timezone.localdate()
+    return today, today + timedelta(weeks=CALENDAR_TRUSTED_WEEKS) - timedelta(days=1)
+
+
+def _occurrences(slot, start: date, end: date):
+    """Dates in [start, end] that fall on the template's weekday"""
+    offset = (WEEKDAYS.index(slot.day_of_week) - start.weekday()) % 7
+    day = start + timedelta(days=offset)
+    while day <= end:
+        yield day
+        day += timedelta(weeks=1)
+
+
+def _booked_pairs(slots, start: date, end: date) -> set:
+    return set(PatientBooking.objects.filter(
+        booking_slot__in=[slot.availability_uuid for slot in slots],
+        booking_date__range=[start, end],
+        is_active=True,
+        is_deleted=False
+    ).values_list('booking_slot', 'booking_date'))
+
+
+def _build_rows(slots, start: date, end: date) -> list:
+    booked = _booked_pairs(slots, start, end)
+    return [
+        CalendarSlot(
+            practitioner_id=slot.practitioner_id,
+            availability=slot,
+            slot_date=day,
+            start_time=slot.start_time,
+            end_time=slot.end_time,
+            state=CalendarSlot.BOOKED if (slot.availability_uuid, day) in booked else CalendarSlot.OPEN,
+        )
+        for slot in slots
+        for day in _occurrences(slot, start, end)
+    ]
+
+
+def rematerialize_slot(slot: AvailabilitySlot):
+    """Rebuild the future occurrences of one template after it was added, edited or deactivated"""
+    today = timezone.localdate()
+    with transaction.atomic():
+        CalendarSlot.objects.filter(availability=slot, slot_date__gte=today).delete()
+        if slot.is_active:
+            CalendarSlot.objects.bulk_create(_build_rows([slot], today, horizon_end(today)))
+
+
+def set_slot_state(availability_uuid, slot_date, state: str) -> int:
+    """Flip one occurrence between OPEN and BOOKED when a booking is made or released"""
+    return CalendarSlot.objects.filter(
+        availability__availability_uuid=availability_uuid,
+        slot_date=slot_date
+    ).update(state=state, updated_at=timezone.now())
+
+
+def set_slot_states(availability_uuid, slot_dates: list, state: str) -> int:
+    """set_slot_state for many dates of one template in a single UPDATE"""
+    return CalendarSlot.objects.filter(
+        availability__availability_uuid=availability_uuid,
+        slot_date__in=slot_dates
+    ).update(state=state, updated_at=timezone.now())
+
+
+def set_day_states(availability_uuids: list, slot_date, state: str) -> int:
+    """set_slot_state for several templates on one date in a single UPDATE"""
+    return CalendarSlot.objects.filter(
+        availability__availability_uuid__in=availability_uuids,
+        slot_date=slot_date
+    ).update(state=state, updated_at=timezone.now())
+
+
+def roll_calendar(batch_size: int = 1000) -> dict:
+    """Drop past occurrences and materialize every active template up to the horizon.
+
+    Existing rows are left alone (ignore_conflicts on the unique occurrence), so
+    running this nightly only inserts the newly uncovered days.
+    """
+    today = timezone.localdate()
+    end = horizon_end(today)
+    pruned, _ = CalendarSlot.objects.filter(slot_date__lt=today).delete()
+    slots = list(AvailabilitySlot.objects.filter(is_active=True))
+    rows = _build_rows(slots, today, end)
+    CalendarSlot.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+    return {"pruned": pruned, "templates": len(slots), "through": end.isoformat()}
+
+
+def calendar_availability(practitioner_ids: list, start: date, end: date) -> dict:
+    """
+    Dated slots for the given practitioners in [start, end] from one indexed range scan.
+    The caller must keep [start, end] inside trusted_window().
+
+    Returns:
+        dict: practitioner id -> list of dated slots ordered by date and start time
+    """
+    dated_slots = {practitioner_id: [] for practitioner_id in practitioner_ids}
+    for row in CalendarSlot.objects.filter(
+        practitioner_id__in=practitioner_ids,
+        slot_date__range=[start, end],
+        availability__is_active=True
+    ).order_by('slot_date', 'start_time').values(
+        'practitioner_id',
+        'availability__availability_uuid',
+        'availability__day_of_week',
+        'slot_date',
+        'start_time',
+        'end_time',
+        'state'
+    ):
+        dated_slots[row['practitioner_id']].append({
+            'availability_uuid': row['availability__availability_uuid'],
+            'day_of_week': row['availability__day_of_week'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time'],
+            'date': row['slot_date'].isoformat(),
+            'is_available': row['state'] == CalendarSlot.OPEN,
+        })
+    return dated_slots
+
+
+def template_availability(practitioner_ids: list, start: date, end: date) -> dict:
+    """
+    Expand the weekly AvailabilitySlot templates of the given practitioners into
+    dated slots over [start, end], in two queries regardless of range length or
+    practitioner count.
+
+    Returns:
+        dict: practitioner id -> list of dated slots ordered by date and start time
+    """
+    templates = defaultdict(lambda: defaultdict(list))
+    for slot in AvailabilitySlot.objects.filter(
+        practitioner_id__in=practitioner_ids,
+        is_active=True
+    ).order_by('start_time').values(
+        'practitioner_id',
+        'availability_uuid',
+        'day_of_week',
+        'start_time',
+        'end_time'
+    ):
+        templates[slot.pop('practitioner_id')][slot['day_of_week']].append(slot)
+
+    # One range query; membership tests then hit a set of (slot, date) pairs
+    booked = set(PatientBooking.objects.filter(
+        practitioner_id__in=practitioner_ids,
+        booking_date__range=[start, end],
+        is_active=True,
+        is_deleted=False
+    ).values_list('booking_slot', 'booking_date'))
+
+    dated_slots = {practitioner_id: [] for practitioner_id in practitioner_ids}
+    day = start
+    while day <= end:
+        weekday = WEEKDAYS[day.weekday()]
+        for practitioner_id, slots_by_day in templates.items():
+            for slot in slots_by_day.get(weekday, ()):
+                dated_slots[practitioner_id].append({
+                    **slot,
+                    'date': day.isoformat(),
+                    'is_available': (slot['availability_uuid'], day) not in booked,
+                })
+        day += timedelta(days=1)
+    return dated_slots
+
+
+def dated_availability(practitioner_ids: list, start: date, end: date) -> dict:
+    """
+    Dated slots for the given practitioners over [start, end]. Days inside the
+    trusted window come from a single CalendarSlot range scan; days before or
+    beyond it are expanded from the weekly templates.
+
+    Returns:
+        dict: practitioner id -> list of dated slots ordered by date and start time
+    """
+    window_start, window_end = trusted_window()
+    if start >= window_start and end <= window_end:
+        return calendar_availability(practitioner_ids, start, end)
+
+    dated_slots = {practitioner_id: [] for practitioner_id in practitioner_ids}
+    parts = []
+    if start < window_start:
+        parts.append(template_availability(practitioner_ids, start, min(end, window_start - timedelta(days=1))))
+    if start <= window_end and end >= window_start:
+        parts.append(calendar_availability(practitioner_ids, max(start, window_start), min(end, window_end)))
+    if end > window_end:
+        parts.append(template_availability(practitioner_ids, max(start, window_end + timedelta(days=1)), end))
+    for part in parts:
+        for practitioner_id, slots in part.items():
+            dated_slots[practitioner_id].extend(slots)
+    return dated_slots
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from practiceapp.models import PracticeRegistry
+
+
+@dataclass
+class PracticeContext:
+    """The authenticated practice user for one request, resolved once by the route dependency"""
+    token: str
+    user_id: int
+    practice_id: Optional[int]
+    role: Optional[str]
+    practice: Optional[PracticeRegistry] = None
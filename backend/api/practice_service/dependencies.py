@@ -0,0 +1,60 @@
+import time
+
+from fastapi import Depends, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from .context import PracticeContext
+from .utils import resolve_practice_context, load_context_practice
+
+
+class ResolutionStats:
+    """Counters for per-request caller resolution, reported on /api/v1/metrics/"""
+
+    def __init__(self):
+        self.resolved = 0
+        self.failed = 0
+        self.total_ms = 0.0
+
+    def record(self, started: float, ok: bool):
+        self.total_ms += (time.perf_counter() - started) * 1000
+        if ok:
+            self.resolved += 1
+        else:
+            self.failed += 1
+
+    def stats(self) -> dict:
+        count = self.resolved + self.failed
+        return {
+            "resolved": self.resolved,
+            "failed": self.failed,
+            "avg_ms": round(self.total_ms / count, 3) if count else 0.0,
+        }
+
+
+resolution_stats = ResolutionStats()
+
+
+async def get_caller_context(
+    user_token: str = Query(..., description="User authentication token")
+) -> PracticeContext:
+    """Resolve the caller once per request; the practice may be missing (e.g. before setup)"""
+    started = time.perf_counter()
+    try:
+        ctx = await run_in_threadpool(resolve_practice_context, user_token)
+    except Exception as e:
+        resolution_stats.record(started, False)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    resolution_stats.record(started, True)
+    return ctx
+
+
+async def get_practice_context(
+    ctx: PracticeContext = Depends(get_caller_context)
+) -> PracticeContext:
+    """Caller context with its practice loaded; rejects users without a practice"""
+    if ctx.practice is None:
+        try:
+            await run_in_threadpool(load_context_practice, ctx)
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ctx
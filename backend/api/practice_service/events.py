@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import Optional
+from uuid import uuid4
+
+from django.db import transaction
+
+from api.config import LOGGER_NAME, PRACTICE_EVENTS_BUFFER_SIZE, PRACTICE_EVENTS_QUEUE_SIZE
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class Subscription:
+    """One connected client: an asyncio queue on the event loop that serves it"""
+
+    def __init__(self, practice_id: int, loop: asyncio.AbstractEventLoop, backlog: list, reset: bool, start_seq: int):
+        self.practice_id = practice_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=PRACTICE_EVENTS_QUEUE_SIZE)
+        self.backlog = backlog
+        # The resume cursor is older than the buffer or from another process; the client must refetch its state
+        self.reset = reset
+        # Sequence number current when the client subscribed, its cursor until an event arrives
+        self.start_seq = start_seq
+        self.dropped = False
+
+    async def next_event(self, timeout: float) -> Optional[tuple]:
+        """The next (seq, kind, data) event, or None on timeout; raises once the subscriber is dropped"""
+        if self.backlog:
+            return self.backlog.pop(0)
+        if self.dropped and self.queue.empty():
+            raise ConnectionAbortedError("Subscriber fell behind and was dropped")
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """In-process pub/sub of per-practice change events.
+
+    Each practice keeps a bounded buffer of recent events so a reconnecting
+    client can resume from the last sequence number it saw. Publishers run on
+    threadpool threads; delivery hops onto each subscriber's event loop. A
+    subscriber whose queue fills up is dropped rather than slowing the others.
+    Events are per worker process: clients see changes made through the worker
+    they are connected to. Event ids carry a per-process epoch, so a cursor
+    from before a restart or from another worker is recognised as such.
+    """
+
+    def __init__(self, buffer_size: int = PRACTICE_EVENTS_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.epoch = uuid4().hex[:12]
+        self._seq = 0
+        self._buffers = {}
+        # practice id -> seq of the newest event pushed out of its buffer
+        self._evicted = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def publish(self, practice_id: int, kind: str, data: dict) -> int:
+        with self._lock:
+            self._seq += 1
+            event = (self._seq, kind, data)
+            buffer = self._buffers.get(practice_id)
+            if buffer is None:
+                buffer = self._buffers[practice_id] = deque(maxlen=self.buffer_size)
+            if len(buffer) == self.buffer_size:
+                self._evicted[practice_id] = buffer[0][0]
+            buffer.append(event)
+            subscribers = list(self._subscribers.get(practice_id, ()))
+            self.published += 1
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(self._deliver, subscription, event)
+        return event[0]
+
+    def _deliver(self, subscription: Subscription, event: tuple):
+        """Runs on the subscriber's event loop"""
+        if subscription.dropped:
+            return
+        try:
+            subscription.queue.put_nowait(event)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            subscription.dropped = True
+            self.dropped += 1
+            self.unsubscribe(subscription)
+            logger.info(f"Dropped a slow event subscriber for practice {subscription.practice_id}")
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def _resume_seq(self, event_id: str) -> Optional[int]:
+        """Sequence number of an id issued by this process, else None"""
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def subscribe(self, practice_id: int, after_id: Optional[str] = None) -> Subscription:
+        """Call from the event loop. Buffered events after the event with after_id are replayed first."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            buffer = self._buffers.get(practice_id, ())
+            backlog, reset = [], False
+            if after_id is not None:
+                after_seq = self._resume_seq(after_id)
+                # A sequence number from another epoch (a restart, another worker) says nothing about what was missed here
+                reset = (
+                    after_seq is None
+                    or after_seq > self._seq
+                    or after_seq < self._evicted.get(practice_id, 0)
+                )
+                if not reset:
+                    backlog = [event for event in buffer if event[0] > after_seq]
+            subscription = Subscription(practice_id, loop, backlog, reset, self._seq)
+            self._subscribers.setdefault(practice_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.practice_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.practice_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "practices_buffered": len(self._buffers),
+                "epoch": self.epoch,
+                "last_seq": self._seq,
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped_subscribers": self.dropped,
+            }
+
+
+event_bus = EventBus()
+
+
+def publish_on_commit(practice_id: int, kind: str, data: dict):
+    """Publish once the surrounding transaction commits; immediately in autocommit"""
+    transaction.on_commit(lambda: event_bus.publish(practice_id, kind, data))
+
+
+def publish_bookings(kind: str, bookings: list):
+    """One event per booking, to the practice of its practitioner (which must be loaded)"""
+    for booking in bookings:
+        publish_on_commit(booking.practitioner.practioner_belong_to_id, kind, {
+            "booking_uuid": str(booking.patient_booking_uuid),
+            "practitioner_uuid": str(booking.practitioner.practitioner_uuid),
+            "availability_uuid": str(booking.booking_slot_id),
+            "date": str(booking.booking_date),
+        })
+
+
+def publish_slot(kind: str, slot, practitioner):
+    publish_on_commit(practitioner.practioner_belong_to_id, kind, {
+        "availability_uuid": str(slot.availability_uuid),
+        "practitioner_uuid": str(practitioner.practitioner_uuid),
+        "day_of_week": slot.day_of_week,
+        "start_time": slot.start_time.strftime('%H:%M'),
+        "end_time": slot.end_time.strftime('%H:%M'),
+        "is_active": slot.is_active,
+    })
+
+
+def format_sse(event: tuple) -> str:
+    seq, kind, data = event
+    return f"id: {event_bus.event_id(seq)}\nevent: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -1,18 +1,27 @@
 
 
 from typing import List
-from fastapi import APIRouter, status, HTTPException, Query
+from uuid import uuid4
+from fastapi import APIRouter, status, HTTPException, Query, Depends, Header, Request
+from fastapi.responses import StreamingResponse
 from starlette.concurrency import run_in_threadpool
 from practiceapp.models import PractionerUser
+from .context import PracticeContext
+from .dependencies import get_caller_context, get_practice_context
 from .utils import (
     register_user, login_user, get_practice_details, edit_practice_details,
     add_practitioner, edit_practitioner, delete_practitioner, get_all_practitioners,
     edit_practitioner_appointments, get_all_appointments, create_appointment_type,
     get_practitioner_availability_slots, add_availability_slot, edit_availability_slot,
-    delete_availability_slot, get_all_practitioners_with_availability,
+    delete_availability_slot, get_all_practitioners_with_availability, get_practice_schedule,
     add_practice_details,
-    add_member, edit_member, get_all_members
+    add_member, edit_member, get_all_members,
+    refresh_access_token, logout_user, get_login_user, user_exists
 )
+from .events import event_bus, format_sse
+from api.auth_service.passwords import password_hasher, needs_rehash
+from api.idempotency_service.cache import idempotent
+from api.config import PRACTICE_EVENTS_HEARTBEAT_SECONDS
 
 
 router = APIRouter(
@@ -33,6 +42,9 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class PractitionerRequest(BaseModel):
     display_name: str
     profession: str
@@ -88,19 +100,51 @@ class MemberEditRequest(BaseModel):
     is_active: Optional[bool] = None
 
 @router.post("/register")
-async def practice_register(request: RegisterRequest):
+async def practice_register(
+    http_request: Request,
+    request: RegisterRequest,
+    idempotency_key: Optional[str] = Header(None)
+):
+    async def run():
+        try:
+            password_hash = await password_hasher.hash(request.password)
+            practice_user = await run_in_threadpool(register_user, request.name, request.email, password_hash)
+            return practice_user
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await idempotent(http_request, idempotency_key, request, run)
+
+
+@router.post("/login") 
+async def practice_login(request: LoginRequest):
     try:
-        practice_user = await run_in_threadpool(register_user, request.name, request.email, request.password)
-        return practice_user
+        practice_user = await run_in_threadpool(get_login_user, request.email)
+        # Verification runs on the password process pool, not the shared threadpool
+        if not practice_user or not await password_hasher.verify(request.password, practice_user.password):
+            raise Exception("Invalid email or password")
+        password_hash = None
+        if needs_rehash(practice_user.password):
+            password_hash = await password_hasher.hash(request.password)
+        tokens = await run_in_threadpool(login_user, practice_user, password_hash)
+        return tokens
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.post("/login") 
-async def practice_login(request: LoginRequest):
+@router.post("/refresh-token")
+async def practice_refresh_token(request: RefreshTokenRequest):
     try:
-        practice_user = await run_in_threadpool(login_user, request.email, request.password)
-        return practice_user
+        tokens = await run_in_threadpool(refresh_access_token, request.refresh_token)
+        return tokens
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+
+@router.post("/logout")
+async def practice_logout(user_token: str = Query(..., description="Access token or refresh token of the session to end")):
+    try:
+        result = await run_in_threadpool(logout_user, user_token)
+        return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -110,10 +154,17 @@ async def practice_login(request: LoginRequest):
 @router.post("/members")
 async def add_member_route(
     request: MemberAddRequest,
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     try:
-        result = await run_in_threadpool(add_member, user_token, request.email, request.role, request.name)
+        # Only a member who has to be auto-provisioned costs a hash on the password pool
+        temp_password = temp_password_hash = None
+        if not await run_in_threadpool(user_exists, request.email):
+            temp_password = str(uuid4())[:12]
+            temp_password_hash = await password_hasher.hash(temp_password)
+        result = await run_in_threadpool(
+            add_member, ctx, request.email, request.role, request.name, temp_password, temp_password_hash
+        )
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -123,11 +174,11 @@ async def add_member_route(
 async def edit_member_route(
     request: MemberEditRequest,
     member_email: str = Query(..., description="Email of the member to edit"),
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     try:
         updates = request.model_dump(exclude_unset=True)
-        result = await run_in_threadpool(edit_member, user_token, member_email, updates)
+        result = await run_in_threadpool(edit_member, ctx, member_email, updates)
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -135,36 +186,36 @@ async def edit_member_route(
 
 @router.get("/members")
 async def get_members_route(
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     try:
-        members = await run_in_threadpool(get_all_members, user_token)
+        members = await run_in_threadpool(get_all_members, ctx)
         return {"members": members}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/current-practice-details")
-async def practice_details(user_token: str = Query(..., description="User authentication token")):
+async def practice_details(ctx: PracticeContext = Depends(get_caller_context)):
     try:
-        practice_user = await run_in_threadpool(get_practice_details, user_token)
+        practice_user = await run_in_threadpool(get_practice_details, ctx)
         return practice_user
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Current practice not found")
     
 
 @router.post("/add-practice-setup")
-async def add_practice_details_route(user_token: str = Query(..., description="User authentication token"), practice_details: dict = ...):
+async def add_practice_details_route(ctx: PracticeContext = Depends(get_caller_context), practice_details: dict = ...):
     try:
-        practice_user = await run_in_threadpool(add_practice_details, user_token, practice_details)
+        practice_user = await run_in_threadpool(add_practice_details, ctx, practice_details)
         return practice_user
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.put("/edit-practice-details")
-async def edit_practice_details_route(user_token: str = Query(..., description="User authentication token"), practice_details: dict = ...):
+async def edit_practice_details_route(ctx: PracticeContext = Depends(get_practice_context), practice_details: dict = ...):
     try:
-        practice_user = await run_in_threadpool(edit_practice_details, user_token, practice_details)
+        practice_user = await run_in_threadpool(edit_practice_details, ctx, practice_details)
         return practice_user
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -175,12 +226,12 @@ async def edit_practice_details_route(user_token: str = Query(..., description="
 @router.post("/add-practitioner")
 async def add_practitioner_route(
     request: PractitionerRequest,
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Add a new practitioner (doctor, nurse, etc.) to the practice"""
     try:
         practitioner_data = request.model_dump(exclude_unset=True)
-        result = await run_in_threadpool(add_practitioner, user_token, practitioner_data)
+        result = await run_in_threadpool(add_practitioner, ctx, practitioner_data)
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -190,12 +241,12 @@ async def add_practitioner_route(
 async def edit_practitioner_route(
     request: PractitionerUpdateRequest,
     practitioner_uuid: str = Query(..., description="UUID of the practitioner to edit"),
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Edit practitioner details"""
     try:
         practitioner_data = request.model_dump(exclude_unset=True)
-        result = await run_in_threadpool(edit_practitioner, user_token, practitioner_uuid, practitioner_data)
+        result = await run_in_threadpool(edit_practitioner, ctx, practitioner_uuid, practitioner_data)
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -204,11 +255,11 @@ async def edit_practitioner_route(
 @router.delete("/delete-practitioner")
 async def delete_practitioner_route(
     practitioner_uuid: str = Query(..., description="UUID of the practitioner to delete"),
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Delete a practitioner (soft delete)"""
     try:
-        result = await run_in_threadpool(delete_practitioner, user_token, practitioner_uuid)
+        result = await run_in_threadpool(delete_practitioner, ctx, practitioner_uuid)
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -216,11 +267,11 @@ async def delete_practitioner_route(
 
 @router.get("/practitioners")
 async def get_practitioners_route(
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Get all practitioners for the practice"""
     try:
-        practitioners = await run_in_threadpool(get_all_practitioners, user_token)
+        practitioners = await run_in_threadpool(get_all_practitioners, ctx)
         return {"practitioners": practitioners}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -230,13 +281,13 @@ async def get_practitioners_route(
 async def edit_practitioner_appointments_route(
     request: AppointmentAssignmentRequest,
     practitioner_uuid: str = Query(..., description="UUID of the practitioner"),
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Assign appointments to a practitioner"""
     try:
         result = await run_in_threadpool(
             edit_practitioner_appointments, 
-            user_token, 
+            ctx, 
             practitioner_uuid, 
             request.appointment_uuids
         )
@@ -247,11 +298,11 @@ async def edit_practitioner_appointments_route(
 
 @router.get("/appointment-types")
 async def get_appointments_route(
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_caller_context)
 ):
     """Get all available appointment types"""
     try:
-        appointments = await run_in_threadpool(get_all_appointments, user_token)
+        appointments = await run_in_threadpool(get_all_appointments, ctx)
         return {"appointments": appointments}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -260,12 +311,12 @@ async def get_appointments_route(
 @router.post("/create-appointment-type")
 async def create_appointment_type_route(
     request: AppointmentTypeRequest,
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_caller_context)
 ):
     """Create a new appointment type"""
     try:
         appointment_data = request.model_dump(exclude_unset=True)
-        result = await run_in_threadpool(create_appointment_type, user_token, appointment_data)
+        result = await run_in_threadpool(create_appointment_type, ctx, appointment_data)
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -276,13 +327,13 @@ async def create_appointment_type_route(
 @router.get("/practitioners/{practitioner_uuid}/availability")
 async def get_practitioner_availability_route(
     practitioner_uuid: str,
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Get all availability slots for a specific practitioner"""
     try:
         availability_data = await run_in_threadpool(
             get_practitioner_availability_slots, 
-            user_token, 
+            ctx, 
             practitioner_uuid
         )
         return availability_data
@@ -294,14 +345,14 @@ async def get_practitioner_availability_route(
 async def add_availability_slot_route(
     practitioner_uuid: str,
     request: AvailabilitySlotRequest,
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Add a new availability slot for a practitioner"""
     try:
         slot_data = request.model_dump()
         result = await run_in_threadpool(
             add_availability_slot, 
-            user_token, 
+            ctx, 
             practitioner_uuid, 
             slot_data
         )
@@ -314,14 +365,14 @@ async def add_availability_slot_route(
 async def edit_availability_slot_route(
     availability_uuid: str,
     request: AvailabilitySlotUpdateRequest,
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Edit an existing availability slot"""
     try:
         slot_data = request.model_dump(exclude_unset=True)
         result = await run_in_threadpool(
             edit_availability_slot, 
-            user_token, 
+            ctx, 
             availability_uuid, 
             slot_data
         )
@@ -333,13 +384,13 @@ async def edit_availability_slot_route(
 @router.delete("/availability/{availability_uuid}")
 async def delete_availability_slot_route(
     availability_uuid: str,
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Delete an availability slot (soft delete)"""
     try:
         result = await run_in_threadpool(
             delete_availability_slot, 
-            user_token, 
+            ctx, 
             availability_uuid
         )
         return result
@@ -349,15 +400,68 @@ async def delete_availability_slot_route(
 
 @router.get("/practitioners-availability")
 async def get_practitioners_with_availability_route(
-    user_token: str = Query(..., description="User authentication token")
+    ctx: PracticeContext = Depends(get_practice_context)
 ):
     """Get all practitioners with their availability slots"""
     try:
         practitioners_data = await run_in_threadpool(
             get_all_practitioners_with_availability, 
-            user_token
+            ctx
         )
         return {"practitioners": practitioners_data}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    
+
+
+@router.get("/schedule")
+async def get_practice_schedule_route(
+    date_from: str = Query(..., alias="from", description="First date (YYYY-MM-DD)"),
+    date_to: str = Query(..., alias="to", description="Last date (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Practitioners per page"),
+    ctx: PracticeContext = Depends(get_practice_context)
+):
+    """Get every practitioner's slots and bookings for a date range"""
+    try:
+        schedule = await run_in_threadpool(
+            get_practice_schedule,
+            ctx,
+            date_from,
+            date_to,
+            cursor,
+            limit
+        )
+        return schedule
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/events")
+async def practice_events_route(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="id of the last event received; later events are replayed"),
+    last_event_id: Optional[str] = Header(None, description="Sent by EventSource when it reconnects"),
+    ctx: PracticeContext = Depends(get_practice_context)
+):
+    """Stream the practice's booking and availability changes as Server-Sent Events"""
+    after_id = cursor if cursor is not None else last_event_id
+    subscription = event_bus.subscribe(ctx.practice.id, after_id)
+
+    async def stream():
+        try:
+            if subscription.reset:
+                # Missed events are no longer buffered; the client should refetch its state.
+                # The id moves the client's cursor on so its next reconnect does not reset again
+                yield format_sse((subscription.start_seq, "reset", {}))
+            if after_id is None:
+                yield format_sse((subscription.start_seq, "ready", {}))
+            while not await request.is_disconnected():
+                event = await subscription.next_event(PRACTICE_EVENTS_HEARTBEAT_SECONDS)
+                yield format_sse(event) if event else ": keep-alive\n\n"
+        except ConnectionAbortedError:
+            # Too slow to keep up; the client reconnects with its cursor
+            pass
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
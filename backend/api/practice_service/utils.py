@@ -3,9 +3,22 @@ from django.core.exceptions import ObjectDoesNotExist
 from uuid import uuid4
 from datetime import time
 from django.db import models
+from django.utils import timezone
 import uuid
 
+from api.config import ACCESS_TOKEN_TTL_SECONDS, PRACTICE_LEGACY_TOKEN_ASSOCIATION, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+from api.pagination import encode_cursor, decode_cursor, page_size
+from platformuser.models import PatientBooking
+from api.auth_service.utils import create_practitioner_session, get_practitioner_session, end_practitioner_session
+from api.auth_service.tokens import PRACTITIONER, issue_access_token, verify_access_token, session_id
+from .auth_cache import token_cache, ResolvedCaller
+from .context import PracticeContext
+from .calendar import rematerialize_slot, dated_availability, parse_date_range
+from api.notification_service.reminders import reminder_scheduler
+from .events import publish_slot
+
 def register_user(name, email, password):
+    """Create a practice user; password is already hashed by the route via password_hasher"""
     try:
         # Check if email already exists
         if PractionerUser.objects.filter(email=email).exists():
@@ -17,55 +30,94 @@ def register_user(name, email, password):
             password=password
         )
         practice_user.save()
-        return practice_user
+        # Never the instance: the idempotency layer stores this body, and it must not hold the hash
+        return {
+            "practioner_uuid": str(practice_user.practioner_uuid),
+            "name": practice_user.name,
+            "email": practice_user.email
+        }
     except:
         return {"message": "Something went wrong"}
     
-def login_user(email, password):
+def _issue_tokens(practice_user, refresh_token: str, session):
+    practice, role = _effective_practice(practice_user, refresh_token)
+    access_token = issue_access_token(
+        PRACTITIONER,
+        practice_user.id,
+        session_id(PRACTITIONER, session),
+        practice_id=practice.id if practice else None,
+        role=role,
+    )
+    return {
+        "token": refresh_token,
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "expires_in": ACCESS_TOKEN_TTL_SECONDS,
+    }
+
+
+def get_login_user(email):
+    """Fetch the user whose password the login route verifies off the threadpool"""
+    return PractionerUser.objects.filter(email=email).first()
+
+
+def user_exists(email) -> bool:
+    """Lets add-member skip hashing a temporary password for users who already have one"""
+    return PractionerUser.objects.filter(email=email).exists()
+
+
+def login_user(practice_user, password_hash=None):
+    """Open a session for a verified user, upgrading a legacy password hash if one is passed"""
     try:
-        token = str(uuid4())
-        practice_user = PractionerUser.objects.get(email=email, password=password)
-        practice_user.token = token
-        practice_user.save()
-        return {"token": token}
+        if password_hash:
+            practice_user.password = password_hash
+            practice_user.save(update_fields=['password'])
+        # Every login gets its own session so other devices stay signed in
+        token, session = create_practitioner_session(practice_user)
+        return _issue_tokens(practice_user, token, session)
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def refresh_access_token(refresh_token: str):
+    """Mint a new access token from a live session; the only token path that reads the database"""
+    try:
+        session = get_practitioner_session(refresh_token)
+        if not session:
+            raise Exception("Invalid refresh token")
+        return _issue_tokens(session.user, refresh_token, session)
     except Exception as e:
-        return str(e)
+        raise Exception(str(e))
+
+
+def logout_user(user_token: str):
+    try:
+        caller = resolve_caller(user_token)
+        end_practitioner_session(user_token)
+        # The ended session's refresh token may still be cached under any of the user's entries
+        token_cache.invalidate_user(caller.user_id)
+        return {"message": "Logged out successfully"}
+    except Exception as e:
+        raise Exception(str(e))
     
     
 def get_user_details(token):
     try:
-        practice_user = PractionerUser.objects.filter(token=token).first()
+        claims = verify_access_token(token, PRACTITIONER)
+        if claims is not None:
+            practice_user = PractionerUser.objects.filter(id=claims["sub"]).first()
+        else:
+            session = get_practitioner_session(token)
+            practice_user = session.user if session else None
         if not practice_user:
             raise Exception("User not found")
         return practice_user
     except Exception as e:
         raise Exception(str(e))
     
-def get_practice_details(user_token: str):
+def get_practice_details(ctx: PracticeContext):
     try:
-        # First get the user from token
-        practice_user = PractionerUser.objects.filter(token=user_token).first()
-        if not practice_user:
-            raise Exception("User not found")
-
-        # Prefer resolving via explicit owner first (backward compatibility)
-        practice = PracticeRegistry.objects.filter(practice_owner=practice_user).first()
-        if not practice:
-            # Fallback to membership relation if the user is a staff/admin
-            membership = (
-                PracticeMembers.objects
-                .filter(user=practice_user, is_active=True)
-                .select_related('practice')
-                .first()
-            )
-            if membership:
-                practice = membership.practice
-
-        if not practice:
-            # Final fallback to legacy token association method
-            practice = PracticeRegistry.objects.filter(practice_associated_with=user_token).first()
-            if not practice:
-                raise Exception("Practice not found")
+        practice = load_context_practice(ctx)
 
         return {
             "practice_uuid": str(practice.practice_uuid),
@@ -83,14 +135,10 @@ def get_practice_details(user_token: str):
     except Exception as e:
         raise Exception(str(e))
     
-def add_practice_details(user_token: str, practice_details: dict):
+def add_practice_details(ctx: PracticeContext, practice_details: dict):
     try:
-        practice_user = PractionerUser.objects.filter(token=user_token).first()
-        if not practice_user:
-            raise Exception("User not found")
-        
         # Create practice with all fields from practice_details
-        create_fields = {"practice_owner": practice_user}
+        create_fields = {"practice_owner_id": ctx.user_id}
         for field, value in practice_details.items():
             if hasattr(PracticeRegistry, field):
                 create_fields[field] = value
@@ -98,7 +146,8 @@ def add_practice_details(user_token: str, practice_details: dict):
         practice = PracticeRegistry.objects.create(**create_fields)
 
         # Also create membership for this user as the OWNER of the practice
-        PracticeMembers.objects.create(practice=practice, user=practice_user, role='OWNER')
+        PracticeMembers.objects.create(practice=practice, user_id=ctx.user_id, role='OWNER')
+        token_cache.invalidate_user(ctx.user_id)
         
         return {
             "message": "Practice created successfully",
@@ -107,10 +156,10 @@ def add_practice_details(user_token: str, practice_details: dict):
     except Exception as e:
         raise Exception(str(e))
 
-def edit_practice_details(user_token: str, practice_details: dict):
+def edit_practice_details(ctx: PracticeContext, practice_details: dict):
     try:
-        # Fetch the practice linked to this user (owner or member)
-        practice = get_user_practice(user_token)
+        # Practice linked to this user (owner or member), resolved by the route dependency
+        practice = ctx.practice
         
         # Update fields dynamically
         for field, value in practice_details.items():
@@ -118,46 +167,96 @@ def edit_practice_details(user_token: str, practice_details: dict):
                 setattr(practice, field, value)
         
         practice.save()
+
+        token_cache.invalidate_practice(practice.id)
+        if "practice_associated_with" in practice_details:
+            token_cache.invalidate_token(practice_details["practice_associated_with"])
         return {"message": "Practice updated successfully"}
     except Exception as e:
         raise Exception(str(e))
 
 
-def get_user_practice(user_token: str):
-    """Helper function to get practice for a user"""
-    try:
-        practice_user = PractionerUser.objects.filter(token=user_token).first()
-        if not practice_user:
-            raise Exception("User not found")
+def _effective_practice(practice_user, user_token: str | None = None):
+    """Resolve a user's practice and role from PracticeMembers in one indexed query.
 
-        # Prefer owner mapping first
+    Every owner holds an OWNER membership (backfilled by practiceapp 0013), so the
+    owner mapping and membership fallback collapse into a single ordered lookup.
+    """
+    membership = (
+        PracticeMembers.objects
+        .filter(user=practice_user, is_active=True)
+        .select_related('practice')
+        .order_by(models.Case(models.When(role='OWNER', then=0), default=1), 'created_at', 'id')
+        .first()
+    )
+    if membership:
+        return membership.practice, membership.role
+
+    if PRACTICE_LEGACY_TOKEN_ASSOCIATION:
+        # Rows not yet covered by the backfill: owner column, then old token-based association
         practice = PracticeRegistry.objects.filter(practice_owner=practice_user).first()
-        if not practice:
-            # Fallback to membership relation
-            membership = (
-                PracticeMembers.objects
-                .filter(user=practice_user, is_active=True)
-                .select_related('practice')
-                .first()
-            )
-            if membership:
-                return membership.practice
-            # Final fallback to old token-based association
+        if not practice and user_token:
             practice = PracticeRegistry.objects.filter(practice_associated_with=user_token).first()
-            if not practice:
-                raise Exception("Practice not found")
-        
-        return practice
-    except Exception as e:
-        raise Exception(str(e))
+        if practice:
+            return practice, 'OWNER'
+    return None, None
+
+
+def _resolve_caller(user_token: str):
+    """Resolve a token to (ResolvedCaller, practice); practice is None when it was not loaded"""
+    claims = verify_access_token(user_token, PRACTITIONER)
+    if claims is not None:
+        if claims["pid"] is not None:
+            # Signed claims are trusted as-is: no database access
+            return ResolvedCaller(claims["sub"], claims["pid"], claims["role"]), None
+        # Token issued before the user had a practice; look it up until the next refresh
+        practice, role = _effective_practice(PractionerUser(id=claims["sub"]))
+        return ResolvedCaller(claims["sub"], practice.id if practice else None, role), practice
+
+    caller = token_cache.get(user_token)
+    if caller is not None:
+        return caller, None
+
+    session = get_practitioner_session(user_token)
+    if not session:
+        raise Exception("User not found")
+    practice, role = _effective_practice(session.user, user_token)
+
+    caller = ResolvedCaller(session.user.id, practice.id if practice else None, role)
+    # Never serve a resolution past the session's own expiry
+    token_cache.set(user_token, caller, (session.expires_at - timezone.now()).total_seconds())
+    return caller, practice
+
+
+def resolve_caller(user_token: str) -> ResolvedCaller:
+    """Resolve a token to its user id, effective practice id and role"""
+    caller, _practice = _resolve_caller(user_token)
+    return caller
+
+
+def resolve_practice_context(user_token: str) -> PracticeContext:
+    """Resolve the caller of one request; the practice is attached only if resolution loaded it"""
+    caller, practice = _resolve_caller(user_token)
+    return PracticeContext(user_token, caller.user_id, caller.practice_id, caller.role, practice)
+
+
+def load_context_practice(ctx: PracticeContext):
+    """Attach the caller's practice to the context, raising when the caller has none"""
+    if ctx.practice is None and ctx.practice_id is not None:
+        ctx.practice = PracticeRegistry.objects.filter(id=ctx.practice_id).first()
+        if ctx.practice is None:
+            token_cache.invalidate_token(ctx.token)
+    if ctx.practice is None:
+        raise Exception("Practice not found")
+    return ctx.practice
 
 
 # Practitioner Management Functions
 
-def add_practitioner(user_token: str, practitioner_data: dict):
+def add_practitioner(ctx: PracticeContext, practitioner_data: dict):
     """Add a new practitioner to the practice"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         # Create practitioner with dynamic fields
         practitioner = PractionerRegistry(practioner_belong_to=practice)
@@ -179,10 +278,10 @@ def add_practitioner(user_token: str, practitioner_data: dict):
         raise Exception(str(e))
 
 
-def edit_practitioner(user_token: str, practitioner_uuid: str, practitioner_data: dict):
+def edit_practitioner(ctx: PracticeContext, practitioner_uuid: str, practitioner_data: dict):
     """Edit practitioner details"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         practitioner = PractionerRegistry.objects.filter(
             practitioner_uuid=practitioner_uuid,
@@ -204,10 +303,10 @@ def edit_practitioner(user_token: str, practitioner_uuid: str, practitioner_data
         raise Exception(str(e))
 
 
-def delete_practitioner(user_token: str, practitioner_uuid: str):
+def delete_practitioner(ctx: PracticeContext, practitioner_uuid: str):
     """Delete a practitioner (soft delete by setting is_active to False)"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         practitioner = PractionerRegistry.objects.filter(
             practitioner_uuid=practitioner_uuid,
@@ -225,10 +324,10 @@ def delete_practitioner(user_token: str, practitioner_uuid: str):
         raise Exception(str(e))
 
 
-def get_all_practitioners(user_token: str):
+def get_all_practitioners(ctx: PracticeContext):
     """Get all practitioners for a practice"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         practitioners = PractionerRegistry.objects.filter(
             practioner_belong_to=practice,
@@ -257,10 +356,10 @@ def get_all_practitioners(user_token: str):
         raise Exception(str(e))
 
 
-def edit_practitioner_appointments(user_token: str, practitioner_uuid: str, appointment_uuids: list):
+def edit_practitioner_appointments(ctx: PracticeContext, practitioner_uuid: str, appointment_uuids: list):
     """Edit appointments assigned to a practitioner"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         practitioner = PractionerRegistry.objects.filter(
             practitioner_uuid=practitioner_uuid,
@@ -285,14 +384,9 @@ def edit_practitioner_appointments(user_token: str, practitioner_uuid: str, appo
         raise Exception(str(e))
 
 
-def get_all_appointments(user_token: str):
+def get_all_appointments(ctx: PracticeContext):
     """Get all available appointments"""
     try:
-        # Verify user exists
-        practice_user = PractionerUser.objects.filter(token=user_token).first()
-        if not practice_user:
-            raise Exception("User not found")
-        
         appointments = AppointmentType.objects.filter(is_appointment_enabled=True)
         
         appointments_list = []
@@ -316,14 +410,9 @@ def get_all_appointments(user_token: str):
         raise Exception(str(e))
 
 
-def create_appointment_type(user_token: str, appointment_data: dict):
+def create_appointment_type(ctx: PracticeContext, appointment_data: dict):
     """Create a new AppointmentType type"""
     try:
-        # Verify user exists
-        practice_user = PractionerUser.objects.filter(token=user_token).first()
-        if not practice_user:
-            raise Exception("User not found")
-        
         appointment_type = AppointmentType()
         
         # Set fields dynamically
@@ -345,10 +434,10 @@ def create_appointment_type(user_token: str, appointment_data: dict):
 
 # Availability Slot Management Functions
 
-def get_practitioner_availability_slots(user_token: str, practitioner_uuid: str):
+def get_practitioner_availability_slots(ctx: PracticeContext, practitioner_uuid: str):
     """Get all availability slots for a specific practitioner"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         practitioner = PractionerRegistry.objects.filter(
             practitioner_uuid=practitioner_uuid,
@@ -387,27 +476,32 @@ def get_practitioner_availability_slots(user_token: str, practitioner_uuid: str)
 
 # Practice Members Management Functions
 
-def add_member(user_token: str, member_email: str, role: str = 'STAFF', member_name: str | None = None):
+def add_member(ctx: PracticeContext, member_email: str, role: str = 'STAFF', member_name: str | None = None,
+               temp_password: str | None = None, temp_password_hash: str | None = None):
     """Add a user as a member of the current practice with a role.
 
     Constraints:
     - Owner remains the same: cannot assign OWNER role to a user who is not the current practice owner.
     - Upserts an existing membership for this user/practice (updates role and activates).
+
+    temp_password/temp_password_hash are prepared by the route only when the
+    user does not exist yet, and used to auto-provision them.
     """
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
 
         # Resolve user by email
         target_user = PractionerUser.objects.filter(email=member_email).first()
         created_user = False
-        temp_password = None
         if not target_user:
+            if not temp_password_hash:
+                # The user was removed after the route checked for them
+                raise Exception("Member could not be provisioned, please retry")
             # Auto-provision a basic user who can log in
-            temp_password = str(uuid4())[:12]
             target_user = PractionerUser.objects.create(
                 name=member_name or member_email.split('@')[0],
                 email=member_email,
-                password=temp_password,
+                password=temp_password_hash,
                 is_active=True,
                 is_verified=True,
                 is_deleted=False,
@@ -415,7 +509,7 @@ def add_member(user_token: str, member_email: str, role: str = 'STAFF', member_n
             created_user = True
 
         # Enforce owner invariants
-        if role == 'OWNER' and target_user != practice.practice_owner:
+        if role == 'OWNER' and target_user.id != practice.practice_owner_id:
             raise Exception("Cannot assign OWNER role to a non-owner user")
 
         membership, _created = PracticeMembers.objects.get_or_create(
@@ -433,6 +527,8 @@ def add_member(user_token: str, member_email: str, role: str = 'STAFF', member_n
             membership.is_active = True
             membership.save()
 
+        token_cache.invalidate_user(target_user.id)
+
         response = {
             "message": "Member added successfully",
             "member": {
@@ -450,7 +546,7 @@ def add_member(user_token: str, member_email: str, role: str = 'STAFF', member_n
         raise Exception(str(e))
 
 
-def edit_member(user_token: str, member_email: str, updates: dict):
+def edit_member(ctx: PracticeContext, member_email: str, updates: dict):
     """Edit an existing member's role or active status.
 
     Constraints:
@@ -458,7 +554,7 @@ def edit_member(user_token: str, member_email: str, updates: dict):
     - Cannot assign OWNER to a non-owner.
     """
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
 
         target_user = PractionerUser.objects.filter(email=member_email).first()
         if not target_user:
@@ -473,7 +569,7 @@ def edit_member(user_token: str, member_email: str, updates: dict):
         if new_role:
             if membership.role == 'OWNER' and new_role != 'OWNER':
                 raise Exception("Cannot change role of the OWNER membership")
-            if new_role == 'OWNER' and target_user != practice.practice_owner:
+            if new_role == 'OWNER' and target_user.id != practice.practice_owner_id:
                 raise Exception("Cannot assign OWNER role to a non-owner user")
             membership.role = new_role
 
@@ -484,13 +580,14 @@ def edit_member(user_token: str, member_email: str, updates: dict):
             membership.is_active = bool(updates["is_active"])
 
         membership.save()
+        token_cache.invalidate_user(target_user.id)
 
         return {"message": "Member updated successfully"}
     except Exception as e:
         raise Exception(str(e))
 
 
-def get_all_members(user_token: str):
+def get_all_members(ctx: PracticeContext):
     """Return all members for the practice, including the owner.
 
     The owner is returned from the PracticeRegistry.owner field to keep it canonical,
@@ -498,7 +595,7 @@ def get_all_members(user_token: str):
     (if present) is not duplicated.
     """
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
 
         members_list = []
         # Include owner first
@@ -528,10 +625,10 @@ def get_all_members(user_token: str):
         raise Exception(str(e))
 
 
-def add_availability_slot(user_token: str, practitioner_uuid: str, slot_data: dict):
+def add_availability_slot(ctx: PracticeContext, practitioner_uuid: str, slot_data: dict):
     """Add a new availability slot for a practitioner"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         practitioner = PractionerRegistry.objects.filter(
             practitioner_uuid=practitioner_uuid,
@@ -567,6 +664,8 @@ def add_availability_slot(user_token: str, practitioner_uuid: str, slot_data: di
             start_time=start_time,
             end_time=end_time
         )
+        rematerialize_slot(availability_slot)
+        publish_slot("availability.created", availability_slot, practitioner)
         
         return {
             "availability_uuid": str(availability_slot.availability_uuid),
@@ -580,12 +679,12 @@ def add_availability_slot(user_token: str, practitioner_uuid: str, slot_data: di
         raise Exception(str(e))
 
 
-def edit_availability_slot(user_token: str, availability_uuid: str, slot_data: dict):
+def edit_availability_slot(ctx: PracticeContext, availability_uuid: str, slot_data: dict):
     """Edit an existing availability slot"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
-        availability_slot = AvailabilitySlot.objects.filter(
+        availability_slot = AvailabilitySlot.objects.select_related('practitioner').filter(
             availability_uuid=availability_uuid,
             practitioner__practioner_belong_to=practice
         ).first()
@@ -626,6 +725,11 @@ def edit_availability_slot(user_token: str, availability_uuid: str, slot_data: d
             raise Exception("This time slot overlaps with an existing availability slot")
         
         availability_slot.save()
+        rematerialize_slot(availability_slot)
+        if 'start_time' in slot_data:
+            # Bookings on this slot now start at a different time
+            reminder_scheduler.reschedule_slot(availability_slot.availability_uuid)
+        publish_slot("availability.updated", availability_slot, availability_slot.practitioner)
         
         return {
             "availability_uuid": str(availability_slot.availability_uuid),
@@ -640,12 +744,12 @@ def edit_availability_slot(user_token: str, availability_uuid: str, slot_data: d
         raise Exception(str(e))
 
 
-def delete_availability_slot(user_token: str, availability_uuid: str):
+def delete_availability_slot(ctx: PracticeContext, availability_uuid: str):
     """Delete an availability slot (soft delete by setting is_active to False)"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
-        availability_slot = AvailabilitySlot.objects.filter(
+        availability_slot = AvailabilitySlot.objects.select_related('practitioner').filter(
             availability_uuid=availability_uuid,
             practitioner__practioner_belong_to=practice
         ).first()
@@ -655,16 +759,18 @@ def delete_availability_slot(user_token: str, availability_uuid: str):
         
         availability_slot.is_active = False
         availability_slot.save()
+        rematerialize_slot(availability_slot)
+        publish_slot("availability.deleted", availability_slot, availability_slot.practitioner)
         
         return {"message": "Availability slot deleted successfully"}
     except Exception as e:
         raise Exception(str(e))
 
 
-def get_all_practitioners_with_availability(user_token: str):
+def get_all_practitioners_with_availability(ctx: PracticeContext):
     """Get all practitioners with their availability slots for the practice"""
     try:
-        practice = get_user_practice(user_token)
+        practice = ctx.practice
         
         practitioners = PractionerRegistry.objects.filter(
             practioner_belong_to=practice,
@@ -692,4 +798,71 @@ def get_all_practitioners_with_availability(user_token: str):
         
         return practitioners_list
     except Exception as e:
-        raise Exception(str(e))
\ No newline at end of file
+        raise Exception(str(e))
+
+
+def get_practice_schedule(ctx: PracticeContext, date_from: str, date_to: str, cursor: str = None, limit: int = None):
+    """
+    Every practitioner's dated slots and bookings over a date range, paginated by
+    practitioner. Three queries per page: practitioners, slots, bookings.
+    """
+    try:
+        practice = ctx.practice
+        start, end = parse_date_range(date_from, date_to)
+        limit = page_size(limit, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+        
+        practitioners = PractionerRegistry.objects.filter(
+            practioner_belong_to=practice,
+            is_active=True
+        ).order_by('id')
+        if cursor:
+            (last_id,) = decode_cursor(cursor)
+            practitioners = practitioners.filter(id__gt=last_id)
+        page = list(practitioners.values('id', 'practitioner_uuid', 'display_name', 'profession')[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        practitioner_ids = [p['id'] for p in page]
+        
+        dated_slots = dated_availability(practitioner_ids, start, end) if page else {}
+        
+        bookings = PatientBooking.objects.select_related('patient', 'appointment', 'family_member').filter(
+            practitioner_id__in=practitioner_ids,
+            booking_date__range=[start, end],
+            is_active=True,
+            is_deleted=False
+        )
+        bookings_by_slot = {}
+        for booking in bookings:
+            bookings_by_slot[(booking.booking_slot_id, booking.booking_date.isoformat())] = {
+                "booking_uuid": str(booking.patient_booking_uuid),
+                "patient_uuid": str(booking.patient.patient_uuid),
+                "patient_name": booking.patient.first_name,
+                "family_member": booking.family_member.first_name if booking.family_member else None,
+                "appointment_type": booking.appointment.type_of_consultation,
+                "booking_notes": booking.booking_notes,
+            }
+        
+        schedule = []
+        for practitioner in page:
+            slots = []
+            for slot in dated_slots.get(practitioner['id'], []):
+                slots.append({
+                    "availability_uuid": str(slot['availability_uuid']),
+                    "date": slot['date'],
+                    "start_time": slot['start_time'].strftime('%H:%M'),
+                    "end_time": slot['end_time'].strftime('%H:%M'),
+                    "booking": bookings_by_slot.get((slot['availability_uuid'], slot['date'])),
+                })
+            schedule.append({
+                "practitioner_uuid": str(practitioner['practitioner_uuid']),
+                "display_name": practitioner['display_name'],
+                "profession": practitioner['profession'],
+                "slots": slots,
+            })
+        
+        return {
+            "practitioners": schedule,
+            "next_cursor": encode_cursor(page[-1]['id']) if has_more else None,
+        }
+    except Exception as e:
+        raise Exception(str(e))
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from starlette.concurrency import run_in_threadpool
+
+from api.config import (
+    LOGGER_NAME, AUTOCOMPLETE_LIMIT_DEFAULT, AUTOCOMPLETE_LIMIT_MAX, AUTOCOMPLETE_RELOAD_INTERVAL_SECONDS
+)
+from api.pagination import page_size
+from practiceapp.models import PracticeRegistry, PractionerRegistry
+
+logger = logging.getLogger(LOGGER_NAME)
+
+PRACTICE = "practice"
+PRACTITIONER = "practitioner"
+PROFESSION = "profession"
+
+WORD = re.compile(r"\w+")
+LATIN_DIACRITICS = re.compile("[\u0300-\u036f]")
+
+
+def fold(text: str) -> str:
+    """Lower-case words without accents or punctuation, so "Dr. Zoë" and "dr zoe" share keys"""
+    text = (text or "").lower()
+    if text.isascii():
+        return " ".join(WORD.findall(text))
+    # Only Latin accents go; vowel signs of other scripts are combining marks that belong to the word
+    text = unicodedata.normalize("NFC", LATIN_DIACRITICS.sub("", unicodedata.normalize("NFKD", text)))
+    return " ".join("".join(
+        char if char.isalnum() or unicodedata.category(char).startswith("M") else " " for char in text
+    ).split())
+
+
+def _keys(label: str) -> tuple:
+    """(whole-label key, keys starting at each later word) of a label"""
+    words = fold(label).split()
+    return " ".join(words), [" ".join(words[i:]) for i in range(1, len(words))]
+
+
+class AutocompleteIndex:
+    """Per-process prefix index over practice names, practitioner names and professions.
+
+    Two sorted lists of (key, kind, ref) are searched with bisect: one keyed
+    on whole labels, which rank first, and one on every later word of a label
+    so "rao" finds "Dr Meera Rao". A lookup is a binary search plus a scan of
+    the matching run, so it costs the same however large the directory is.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._starts = []
+        self._words = []
+        # (kind, ref) -> label and uuid; ref is the id, or the folded profession
+        self._entries = {}
+        self._practitioner_professions = {}
+        self._profession_counts = {}
+        self.loaded = False
+
+    def load(self) -> int:
+        """Rebuild the whole index from the registries"""
+        entries = {}
+        practitioner_professions = {}
+        profession_counts = {}
+        folded = {}
+        for practice_id, practice_uuid, name in PracticeRegistry.objects.values_list(
+            'id', 'practice_uuid', 'practice_name'
+        ):
+            entries[(PRACTICE, practice_id)] = (name, str(practice_uuid))
+        for practitioner_id, practitioner_uuid, name, profession in PractionerRegistry.objects.filter(
+            is_active=True
+        ).values_list('id', 'practitioner_uuid', 'display_name', 'profession'):
+            entries[(PRACTITIONER, practitioner_id)] = (name, str(practitioner_uuid))
+            # A few professions are shared by every practitioner; fold each once
+            ref = folded.get(profession)
+            if ref is None:
+                ref = folded[profession] = fold(profession)
+            if ref:
+                practitioner_professions[practitioner_id] = ref
+                profession_counts[ref] = profession_counts.get(ref, 0) + 1
+                entries.setdefault((PROFESSION, ref), (profession, None))
+
+        starts, words = [], []
+        for (kind, ref), (label, _) in entries.items():
+            start, later = _keys(label)
+            if start:
+                starts.append((start, kind, ref))
+                words.extend((key, kind, ref) for key in later)
+        starts.sort()
+        words.sort()
+        with self._lock:
+            self._starts, self._words = starts, words
+            self._entries = entries
+            self._practitioner_professions = practitioner_professions
+            self._profession_counts = profession_counts
+            self.loaded = True
+        return len(entries)
+
+    def _add(self, kind: str, ref, label: str, uuid):
+        start, later = _keys(label)
+        if not start:
+            return
+        self._entries[(kind, ref)] = (label, uuid)
+        insort(self._starts, (start, kind, ref))
+        for key in later:
+            insort(self._words, (key, kind, ref))
+
+    def _remove(self, kind: str, ref):
+        entry = self._entries.pop((kind, ref), None)
+        if entry is None:
+            return
+        start, later = _keys(entry[0])
+        for keys, key in [(self._starts, start)] + [(self._words, key) for key in later]:
+            position = bisect_left(keys, (key, kind, ref))
+            if position < len(keys) and keys[position] == (key, kind, ref):
+                del keys[position]
+
+    def _drop_profession(self, practitioner_id: int):
+        ref = self._practitioner_professions.pop(practitioner_id, None)
+        if ref is None:
+            return
+        self._profession_counts[ref] -= 1
+        if not self._profession_counts[ref]:
+            del self._profession_counts[ref]
+            self._remove(PROFESSION, ref)
+
+    def set_practice(self, practice_id: int, name: str, practice_uuid):
+        with self._lock:
+            self._remove(PRACTICE, practice_id)
+            self._add(PRACTICE, practice_id, name, str(practice_uuid))
+
+    def remove_practice(self, practice_id: int):
+        with self._lock:
+            self._remove(PRACTICE, practice_id)
+
+    def set_practitioner(self, practitioner_id: int, name: str, practitioner_uuid, profession: str):
+        with self._lock:
+            self._remove(PRACTITIONER, practitioner_id)
+            self._drop_profession(practitioner_id)
+            self._add(PRACTITIONER, practitioner_id, name, str(practitioner_uuid))
+            ref = fold(profession)
+            if ref:
+                self._practitioner_professions[practitioner_id] = ref
+                self._profession_counts[ref] = self._profession_counts.get(ref, 0) + 1
+                if (PROFESSION, ref) not in self._entries:
+                    self._add(PROFESSION, ref, profession, None)
+
+    def remove_practitioner(self, practitioner_id: int):
+        with self._lock:
+            self._remove(PRACTITIONER, practitioner_id)
+            self._drop_profession(practitioner_id)
+
+    def suggest(self, query: str, limit: int = None) -> dict:
+        """Up to limit labels with a word starting with query; whole-label matches first, then alphabetical"""
+        limit = page_size(limit, AUTOCOMPLETE_LIMIT_DEFAULT, AUTOCOMPLETE_LIMIT_MAX)
+        prefix = fold(query)
+        if not prefix:
+            return {"results": []}
+        results, seen = [], set()
+        with self._lock:
+            for keys in (self._starts, self._words):
+                position = bisect_left(keys, (prefix,))
+                while position < len(keys) and len(results) < limit:
+                    key, kind, ref = keys[position]
+                    if not key.startswith(prefix):
+                        break
+                    position += 1
+                    if (kind, ref) in seen:
+                        continue
+                    seen.add((kind, ref))
+                    label, uuid = self._entries[(kind, ref)]
+                    if kind == PROFESSION:
+                        results.append({"type": kind, "label": label, "count": self._profession_counts[ref]})
+                    else:
+                        results.append({"type": kind, "id": ref, "uuid": uuid, "label": label})
+        return {"results": results}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "keys": len(self._starts) + len(self._words),
+                "loaded": self.loaded,
+            }
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+async def run_autocomplete_refresher(interval_seconds: int = AUTOCOMPLETE_RELOAD_INTERVAL_SECONDS):
+    """Background loop that builds the index at startup and picks up writes made on other workers"""
+    while True:
+        try:
+            await run_in_threadpool(autocomplete_index.load)
+        except Exception as e:
+            logger.error(f"Autocomplete index reload failed: {e}")
+        await asyncio.sleep(interval_seconds)
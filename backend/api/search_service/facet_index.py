@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+
+from starlette.concurrency import run_in_threadpool
+
+from api.config import LOGGER_NAME, FACET_INDEX_RELOAD_INTERVAL_SECONDS
+from practiceapp.models import PracticeRegistry
+from searchapp.models import PracticeFacet
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def _bitmap(ids) -> int:
+    """Integer with bit i set for every id i"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for practice_id in ids:
+        bits[practice_id >> 3] |= 1 << (practice_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+class FacetIndex:
+    """Per-process bitmaps over practice ids, one per facet value, loaded from PracticeFacet.
+
+    Bit i of a bitmap is set when practice i has the value, so a combined
+    filter is an AND of integers and a facet count is a popcount. Changes
+    committed in this process are applied straight away; the reload loop picks
+    up writes made by other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (name, value) -> bitmap; replaced wholesale on reload
+        self._bitmaps = {}
+        self._practices = 0
+        self._practice_facets = {}
+        self.loaded = False
+
+    def load(self) -> int:
+        """Rebuild every bitmap from the facet table"""
+        practice_ids = list(PracticeRegistry.objects.values_list('id', flat=True))
+        rows = list(PracticeFacet.objects.values_list('practice_id', 'name', 'value'))
+        ids_by_facet = defaultdict(list)
+        practice_facets = defaultdict(set)
+        for practice_id, name, value in rows:
+            ids_by_facet[(name, value)].append(practice_id)
+            practice_facets[practice_id].add((name, value))
+        bitmaps = {facet: _bitmap(ids) for facet, ids in ids_by_facet.items()}
+        practices = _bitmap(practice_ids)
+        with self._lock:
+            self._bitmaps = bitmaps
+            self._practices = practices
+            self._practice_facets = dict(practice_facets)
+            self.loaded = True
+        return len(rows)
+
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    def set_practice(self, practice_id: int, facets: set):
+        """Replace one practice's facet values"""
+        bit = 1 << practice_id
+        with self._lock:
+            bitmaps = dict(self._bitmaps)
+            current = self._practice_facets.get(practice_id, set())
+            for facet in current - facets:
+                remaining = bitmaps[facet] & ~bit
+                if remaining:
+                    bitmaps[facet] = remaining
+                else:
+                    del bitmaps[facet]
+            for facet in facets - current:
+                bitmaps[facet] = bitmaps.get(facet, 0) | bit
+            self._bitmaps = bitmaps
+            self._practices |= bit
+            self._practice_facets[practice_id] = set(facets)
+
+    def remove_practice(self, practice_id: int):
+        self.set_practice(practice_id, set())
+        with self._lock:
+            self._practices &= ~(1 << practice_id)
+            self._practice_facets.pop(practice_id, None)
+
+    def match(self, filters: set) -> int:
+        """Bitmap of the practices having every (name, value) in filters"""
+        with self._lock:
+            bitmaps, matched = self._bitmaps, self._practices
+        for facet in filters:
+            matched &= bitmaps.get(facet, 0)
+            if not matched:
+                break
+        return matched
+
+    def counts(self, matched: int, max_values: int) -> dict:
+        """{name: {value: count}} over the matched practices, most common first"""
+        with self._lock:
+            bitmaps = self._bitmaps
+        counts = defaultdict(list)
+        for (name, value), bitmap in bitmaps.items():
+            count = (bitmap & matched).bit_count()
+            if count:
+                counts[name].append((-count, value))
+        return {
+            name: {value: -count for count, value in sorted(values)[:max_values]}
+            for name, values in counts.items()
+        }
+
+    @staticmethod
+    def ids(matched: int, after: int, limit: int) -> list:
+        """Up to limit practice ids from matched, ascending, greater than after"""
+        remaining = matched >> (after + 1)
+        offset = after + 1
+        ids = []
+        while remaining and len(ids) < limit:
+            # Skip straight to the lowest set bit
+            skip = (remaining & -remaining).bit_length() - 1
+            offset += skip
+            ids.append(offset)
+            remaining >>= skip + 1
+            offset += 1
+        return ids
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "values": len(self._bitmaps),
+                "practices": self._practices.bit_count(),
+                "loaded": self.loaded,
+            }
+
+
+facet_index = FacetIndex()
+
+
+async def run_facet_index_refresher(interval_seconds: int = FACET_INDEX_RELOAD_INTERVAL_SECONDS):
+    """Background loop that loads the index at startup and picks up writes made on other workers"""
+    while True:
+        try:
+            await run_in_threadpool(facet_index.load)
+        except Exception as e:
+            logger.error(f"Facet index reload failed: {e}")
+        await asyncio.sleep(interval_seconds)
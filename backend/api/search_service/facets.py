@@ -0,0 +1,118 @@
+import re
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from practiceapp.models import PracticeRegistry, PractionerRegistry
+from searchapp.models import PracticeFacet
+from .facet_index import facet_index
+
+WHEELCHAIR = PracticeFacet.WHEELCHAIR
+FACILITY = PracticeFacet.FACILITY
+LANGUAGE = PracticeFacet.LANGUAGE
+MAX_VALUE_LENGTH = 100
+
+# languages_spoken is free text: "English, Hindi and Tamil", "English/Urdu"
+LANGUAGE_SEPARATORS = re.compile(r"[,;/|&+]|\band\b", re.IGNORECASE)
+
+
+def facet_value(text) -> str:
+    """Case- and whitespace-insensitive form used for both stored values and filters"""
+    return " ".join(str(text).split()).lower()[:MAX_VALUE_LENGTH]
+
+
+def facility_values(facilities) -> set:
+    """Facilities as stored: a list of names, a comma list, or a dict of name to a truthy flag or details"""
+    if isinstance(facilities, str):
+        names = facilities.split(",")
+    elif isinstance(facilities, dict):
+        names = [key for key, item in facilities.items() if item]
+    elif isinstance(facilities, list):
+        names = [item for item in facilities if isinstance(item, str)]
+    else:
+        names = []
+    return {facet_value(name) for name in names if name.strip()}
+
+
+def language_values(languages_spoken) -> set:
+    return {
+        facet_value(language)
+        for language in LANGUAGE_SEPARATORS.split(languages_spoken or "")
+        if language.strip()
+    }
+
+
+def practice_facets(practice, languages_spoken) -> set:
+    """(name, value) pairs of a practice, given its active practitioners' languages_spoken"""
+    facets = {(FACILITY, value) for value in facility_values(practice.facilities)}
+    if practice.wheel_chair_access is not None:
+        facets.add((WHEELCHAIR, "true" if practice.wheel_chair_access else "false"))
+    for spoken in languages_spoken:
+        facets |= {(LANGUAGE, value) for value in language_values(spoken)}
+    return facets
+
+
+def _active_languages(practice_id: int) -> list:
+    return list(
+        PractionerRegistry.objects
+        .filter(practioner_belong_to_id=practice_id, is_active=True)
+        .values_list('languages_spoken', flat=True)
+    )
+
+
+def sync_practice_facets(practice_id: int, practice=None):
+    """Bring one practice's facet rows in line with the practice and its active practitioners"""
+    if practice is None:
+        practice = PracticeRegistry.objects.filter(id=practice_id).only('id', 'facilities', 'wheel_chair_access').first()
+        if practice is None:
+            return
+    wanted = practice_facets(practice, _active_languages(practice_id))
+    current = set(PracticeFacet.objects.filter(practice_id=practice_id).values_list('name', 'value'))
+    stale = current - wanted
+    if stale:
+        PracticeFacet.objects.filter(practice_id=practice_id).filter(
+            reduce(or_, (Q(name=name, value=value) for name, value in stale))
+        ).delete()
+    missing = wanted - current
+    if missing:
+        PracticeFacet.objects.bulk_create(
+            [PracticeFacet(practice_id=practice_id, name=name, value=value) for name, value in missing],
+            ignore_conflicts=True
+        )
+    transaction.on_commit(lambda: facet_index.set_practice(practice_id, wanted))
+
+
+def unindex_practice_facets(practice_id: int):
+    """The rows go with the practice through the foreign key cascade; only the bitmaps need updating"""
+    transaction.on_commit(lambda: facet_index.remove_practice(practice_id))
+
+
+def rebuild_facets(batch_size: int = 500) -> int:
+    """Recompute every facet row, e.g. after bulk writes that bypass the save signals"""
+    created, last_id = 0, 0
+    practices = PracticeRegistry.objects.only('id', 'facilities', 'wheel_chair_access').order_by('id')
+    while True:
+        batch = list(practices.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        ids = [practice.id for practice in batch]
+        languages = defaultdict(list)
+        for practice_id, spoken in PractionerRegistry.objects.filter(
+            practioner_belong_to_id__in=ids, is_active=True
+        ).values_list('practioner_belong_to_id', 'languages_spoken'):
+            languages[practice_id].append(spoken)
+        facets = [
+            PracticeFacet(practice_id=practice.id, name=name, value=value)
+            for practice in batch
+            for name, value in practice_facets(practice, languages[practice.id])
+        ]
+        # Swapped per batch, so a reader never sees a practice with half its facets
+        with transaction.atomic():
+            PracticeFacet.objects.filter(practice_id__in=ids).delete()
+            PracticeFacet.objects.bulk_create(facets)
+        created += len(facets)
+    return created
@@ -0,0 +1,114 @@
+from django.db import connection, transaction
+
+from practiceapp.models import PracticeRegistry, PractionerRegistry
+
+# FTS5 table created by searchapp 0001; one row per practice and per active practitioner
+TABLE = "search_document"
+PRACTICE = "practice"
+PRACTITIONER = "practitioner"
+
+# Column order of the table, for bm25() weights: kind, object_id and practice_id are UNINDEXED
+COLUMNS = ("kind", "object_id", "practice_id", "title", "body", "tags")
+BM25_WEIGHTS = (0.0, 0.0, 0.0, 10.0, 1.0, 4.0)
+
+
+def search_enabled() -> bool:
+    """The index relies on SQLite FTS5; other databases have no search_document table"""
+    return connection.vendor == "sqlite"
+
+
+def flatten(value) -> str:
+    """Searchable text from the JSON fields: strings, lists, and dict keys set to a truthy value"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(
+            key if isinstance(item, (bool, int, float)) else f"{key} {flatten(item)}"
+            for key, item in value.items()
+            if item
+        )
+    return " ".join(flatten(item) for item in value)
+
+
+def document_rowid(kind: str, object_id: int) -> int:
+    """Stable rowid per object, so an update replaces the row in place"""
+    return object_id * 2 + (1 if kind == PRACTITIONER else 0)
+
+
+def practice_document(practice) -> tuple:
+    return (
+        document_rowid(PRACTICE, practice.id), PRACTICE, practice.id, practice.id,
+        practice.practice_name, practice.about_practice or "", flatten(practice.facilities),
+    )
+
+
+def practitioner_document(practitioner) -> tuple:
+    return (
+        document_rowid(PRACTITIONER, practitioner.id), PRACTITIONER, practitioner.id,
+        practitioner.practioner_belong_to_id, practitioner.display_name,
+        flatten(practitioner.professional_areas_of_interest), practitioner.profession,
+    )
+
+
+def write_documents(documents: list):
+    if not documents or not search_enabled():
+        return
+    # One commit for the batch; under autocommit SQLite would commit every row
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(document[0],) for document in documents])
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            documents
+        )
+
+
+def delete_document(kind: str, object_id: int):
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [document_rowid(kind, object_id)])
+
+
+def index_practice(practice):
+    write_documents([practice_document(practice)])
+
+
+def index_practitioner(practitioner):
+    if practitioner.is_active:
+        write_documents([practitioner_document(practitioner)])
+    else:
+        delete_document(PRACTITIONER, practitioner.id)
+
+
+def rebuild_index(batch_size: int = 1000) -> int:
+    """Re-index everything, e.g. after bulk writes that bypass the save signals"""
+    if not search_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+    indexed = 0
+    sources = (
+        (PracticeRegistry.objects.only('id', 'practice_name', 'about_practice', 'facilities'), practice_document),
+        (
+            PractionerRegistry.objects.filter(is_active=True).only(
+                'id', 'practioner_belong_to_id', 'display_name', 'profession', 'professional_areas_of_interest'
+            ),
+            practitioner_document,
+        ),
+    )
+    for queryset, build in sources:
+        # Keyset batches read in full before writing: on SQLite an open read cursor
+        # plus another writer (e.g. the running server) deadlocks the write
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            write_documents([build(obj) for obj in batch])
+            indexed += len(batch)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return indexed
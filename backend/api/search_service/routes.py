@@ -0,0 +1,57 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query
+from starlette.concurrency import run_in_threadpool
+from .utils import search, filter_practices
+from .autocomplete import autocomplete_index
+
+
+router = APIRouter(
+    tags=["Search"],
+    prefix="/search"
+)
+
+
+@router.get("/")
+async def search_route(
+    q: str = Query(..., description="Words to search for; each is matched as a prefix"),
+    type: Optional[str] = Query(None, description="'practice' or 'practitioner'"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size")
+):
+    """Search practices and practitioners, best matches first."""
+    try:
+        result = await run_in_threadpool(search, q, type, cursor, limit)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/practices")
+async def filter_practices_route(
+    wheelchair: Optional[bool] = Query(None, description="Wheelchair access"),
+    facility: Optional[List[str]] = Query(None, description="Facility the practice offers; repeat to require several"),
+    language: Optional[List[str]] = Query(None, description="Language a practitioner speaks; repeat to require several"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, description="Page size")
+):
+    """Filter practices by facets, with counts of the facet values among the matches."""
+    try:
+        result = await run_in_threadpool(filter_practices, wheelchair, facility, language, cursor, limit)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/autocomplete")
+async def autocomplete_route(
+    q: str = Query(..., description="What has been typed so far"),
+    limit: Optional[int] = Query(None, description="Number of suggestions")
+):
+    """Type-ahead suggestions: practice names, practitioner names and professions."""
+    try:
+        if not autocomplete_index.loaded:
+            await run_in_threadpool(autocomplete_index.load)
+        # Served from memory in microseconds, so it stays on the event loop
+        return autocomplete_index.suggest(q, limit)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
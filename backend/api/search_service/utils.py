@@ -0,0 +1,215 @@
+import re
+import unicodedata
+
+from django.db import connection
+
+from api.config import (
+    PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, SEARCH_MAX_TERMS, SEARCH_RANK_CANDIDATES, FACET_MAX_VALUES
+)
+from api.pagination import encode_cursor, decode_cursor, page_size
+from api.patient_service.utils import PRACTICE_LIST_FIELDS
+from practiceapp.models import PracticeRegistry, PractionerRegistry
+from .index import TABLE, PRACTICE, PRACTITIONER, BM25_WEIGHTS, search_enabled
+from .facets import WHEELCHAIR, FACILITY, LANGUAGE, facet_value
+from .facet_index import facet_index
+
+
+SNIPPET_WORDS = 12
+
+
+def query_terms(query: str) -> list:
+    terms = re.findall(r"\w+", query.lower())[:SEARCH_MAX_TERMS]
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    return terms
+
+
+def match_expression(terms: list) -> str:
+    """Every word must match, each as a prefix; user input never reaches FTS5 query syntax unquoted"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _fold(text: str) -> str:
+    """Lower-case without diacritics, as the unicode61 tokenizer sees it"""
+    return "".join(
+        char for char in unicodedata.normalize("NFKD", text.lower()) if not unicodedata.combining(char)
+    )
+
+
+def snippet(columns: tuple, terms: list) -> str:
+    """
+    First column with a word starting with a query term, cut to SNIPPET_WORDS
+    words around it, matches in [brackets].
+
+    Built from the page's text rather than FTS5 snippet(): that needs the
+    MATCH re-evaluated, and FTS5 does so for every row of a rowid IN list.
+    """
+    prefixes = tuple(_fold(term) for term in terms)
+    for text in columns:
+        words = (text or "").split()
+        hits = [
+            any(_fold(token).startswith(prefixes) for token in re.findall(r"\w+", word))
+            for word in words
+        ]
+        if not any(hits):
+            continue
+        start = max(0, min(hits.index(True) - SNIPPET_WORDS // 4, len(words) - SNIPPET_WORDS))
+        end = start + SNIPPET_WORDS
+        window = " ".join(f"[{word}]" if hit else word for word, hit in zip(words[start:end], hits[start:end]))
+        return ("..." if start else "") + window + ("..." if end < len(words) else "")
+    return ""
+
+
+def _capped_count(db, match: str, kind_filter: str, kind_params: list, cap: int) -> int:
+    """Matches up to cap + 1; reading rowids is cheap next to scoring them"""
+    db.execute(
+        f"SELECT count(*) FROM (SELECT 1 FROM {TABLE} WHERE {TABLE} MATCH %s {kind_filter} LIMIT %s)",
+        [match] + kind_params + [cap + 1]
+    )
+    return db.fetchone()[0]
+
+
+def search(query: str, kind: str = None, cursor: str = None, limit: int = None):
+    """
+    Ranked full-text search over practices and practitioners.
+
+    Results are ordered by bm25 (title matches weigh most), with a keyset cursor
+    on (score, rowid). Scoring costs time per matching document, so a query
+    matching more than SEARCH_RANK_CANDIDATES documents is narrowed to title
+    matches, and if that is still too broad they are returned unranked; such
+    responses are flagged approximate. Snippets are cut only for the page.
+
+    Returns:
+        dict: results, next_cursor (None on the last page) and approximate
+    """
+    try:
+        if not search_enabled():
+            raise Exception("Search is not available on this database")
+        if kind not in (None, PRACTICE, PRACTITIONER):
+            raise ValueError(f"type must be '{PRACTICE}' or '{PRACTITIONER}'")
+        limit = page_size(limit, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+        terms = query_terms(query)
+        match = match_expression(terms)
+        kind_filter, kind_params = ("AND kind = %s", [kind]) if kind else ("", [])
+
+        with connection.cursor() as db:
+            ranked, approximate = True, False
+            if _capped_count(db, match, kind_filter, kind_params, SEARCH_RANK_CANDIDATES) > SEARCH_RANK_CANDIDATES:
+                match, approximate = f"{{title}} : ({match})", True
+                ranked = _capped_count(db, match, kind_filter, kind_params, SEARCH_RANK_CANDIDATES) <= SEARCH_RANK_CANDIDATES
+
+            weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+            score = f"bm25({TABLE}, {weights})" if ranked else "0"
+            keyset, keyset_params = "", []
+            if cursor:
+                last_score, last_rowid = decode_cursor(cursor)
+                keyset = "WHERE score > %s OR (score = %s AND rowid > %s)"
+                keyset_params = [last_score, last_score, last_rowid]
+            db.execute(
+                f"""
+                SELECT rowid, kind, object_id, score FROM (
+                    SELECT rowid, kind, object_id, {score} AS score
+                    FROM {TABLE} WHERE {TABLE} MATCH %s {kind_filter}
+                )
+                {keyset}
+                ORDER BY score, rowid
+                LIMIT %s
+                """,
+                [match] + kind_params + keyset_params + [limit + 1]
+            )
+            page = db.fetchall()
+            has_more = len(page) > limit
+            page = page[:limit]
+            texts = {}
+            if page:
+                placeholders = ", ".join(["%s"] * len(page))
+                # A plain rowid lookup; adding MATCH here would re-run the query per row
+                db.execute(
+                    f"SELECT rowid, title, body, tags FROM {TABLE} WHERE rowid IN ({placeholders})",
+                    [row[0] for row in page]
+                )
+                texts = {row[0]: row[1:] for row in db.fetchall()}
+
+        practice_ids = [row[2] for row in page if row[1] == PRACTICE]
+        practitioner_ids = [row[2] for row in page if row[1] == PRACTITIONER]
+        practices = {
+            practice['id']: practice
+            for practice in PracticeRegistry.objects.filter(id__in=practice_ids).values(
+                'id', 'practice_uuid', 'practice_name'
+            )
+        } if practice_ids else {}
+        practitioners = {
+            practitioner['id']: practitioner
+            for practitioner in PractionerRegistry.objects.filter(id__in=practitioner_ids).values(
+                'id', 'practitioner_uuid', 'display_name', 'profession', 'practioner_belong_to_id'
+            )
+        } if practitioner_ids else {}
+
+        results = []
+        for rowid, row_kind, object_id, score in page:
+            source = practices if row_kind == PRACTICE else practitioners
+            if object_id not in source:
+                continue
+            results.append({
+                "type": row_kind,
+                "score": round(-score, 4),
+                "snippet": snippet(texts.get(rowid, ()), terms),
+                **source[object_id],
+            })
+
+        return {
+            "results": results,
+            "next_cursor": encode_cursor(page[-1][3], page[-1][0]) if has_more else None,
+            "approximate": approximate,
+        }
+    except Exception as e:
+        raise Exception(str(e))
+
+
+def filter_practices(
+    wheelchair: bool = None, facilities: list = None, languages: list = None,
+    cursor: str = None, limit: int = None
+):
+    """
+    Practices having every requested facet, with facet counts over that set.
+
+    Matching runs on the in-memory facet bitmaps; only the page is read from
+    the database. Counts (top FACET_MAX_VALUES per facet) are only computed
+    for the first page.
+
+    Returns:
+        dict: results, total, next_cursor (None on the last page) and facets
+    """
+    try:
+        limit = page_size(limit, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+        filters = set()
+        if wheelchair is not None:
+            filters.add((WHEELCHAIR, "true" if wheelchair else "false"))
+        filters |= {(FACILITY, facet_value(value)) for value in facilities or [] if value.strip()}
+        filters |= {(LANGUAGE, facet_value(value)) for value in languages or [] if value.strip()}
+        last_id = decode_cursor(cursor)[0] if cursor else 0
+
+        facet_index.ensure_loaded()
+        matched = facet_index.match(filters)
+        ids = facet_index.ids(matched, last_id, limit + 1)
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+
+        # An id deleted on another worker since the last reload simply drops out
+        rows = {
+            practice["id"]: practice
+            for practice in PracticeRegistry.objects.filter(id__in=ids).values(*PRACTICE_LIST_FIELDS)
+        } if ids else {}
+        facets = None
+        if not cursor:
+            facets = {WHEELCHAIR: {}, FACILITY: {}, LANGUAGE: {}}
+            facets.update(facet_index.counts(matched, FACET_MAX_VALUES))
+
+        return {
+            "results": [rows[practice_id] for practice_id in ids if practice_id in rows],
+            "total": matched.bit_count(),
+            "next_cursor": encode_cursor(ids[-1]) if has_more else None,
+            "facets": facets,
+        }
+    except Exception as e:
+        raise Exception(str(e))
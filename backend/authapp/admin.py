@@ -0,0 +1,8 @@
+from django.contrib import admin
+
+# Register your models here.
+from .models import PractionerSession, PatientSession, RevokedSession
+
+admin.site.register(PractionerSession)
+admin.site.register(PatientSession)
+admin.site.register(RevokedSession)
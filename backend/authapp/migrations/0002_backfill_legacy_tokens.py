@@ -0,0 +1,47 @@
+import hashlib
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+LEGACY_SESSION_TTL = timedelta(days=30)
+
+
+def backfill_sessions(apps, schema_editor):
+    """Keep currently logged-in clients working by turning their single token column into a session"""
+    PractionerUser = apps.get_model('practiceapp', 'PractionerUser')
+    PatientUser = apps.get_model('platformuser', 'PatientUser')
+    PractionerSession = apps.get_model('authapp', 'PractionerSession')
+    PatientSession = apps.get_model('authapp', 'PatientSession')
+
+    expires_at = timezone.now() + LEGACY_SESSION_TTL
+
+    PractionerSession.objects.bulk_create([
+        PractionerSession(
+            user_id=user_id,
+            token_hash=hashlib.sha256(token.encode()).hexdigest(),
+            expires_at=expires_at,
+        )
+        for user_id, token in PractionerUser.objects.exclude(token__isnull=True).exclude(token='').values_list('id', 'token')
+    ], ignore_conflicts=True)
+
+    PatientSession.objects.bulk_create([
+        PatientSession(
+            patient_id=patient_id,
+            token_hash=hashlib.sha256(token.encode()).hexdigest(),
+            expires_at=expires_at,
+        )
+        for patient_id, token in PatientUser.objects.exclude(token__isnull=True).exclude(token='').values_list('id', 'token')
+    ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+from django.db import models
+
+from practiceapp.models import PractionerUser
+from platformuser.models import PatientUser
+
+
+class AuthSession(models.Model):
+    """One row per login. Only a hash of the bearer token is stored."""
+    token_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        abstract = True
+
+
+class PractionerSession(AuthSession):
+    user = models.ForeignKey(PractionerUser, on_delete=models.CASCADE, related_name='sessions')
+
+    def __str__(self):
+        return f"{self.user.email} (expires {self.expires_at})"
+
+
+class PatientSession(AuthSession):
+    patient = models.ForeignKey(PatientUser, on_delete=models.CASCADE, related_name='sessions')
+
+    def __str__(self):
+        return f"{self.patient.email} (expires {self.expires_at})"
+
+
+class RevokedSession(models.Model):
+    """Logged-out sessions whose short-lived access tokens may still be in circulation"""
+    sid = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.sid
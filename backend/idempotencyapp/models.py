@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """The stored outcome of a POST sent with an Idempotency-Key header, replayed on retries"""
+    IN_PROGRESS = 'IN_PROGRESS'
+    COMPLETED = 'COMPLETED'
+    STATES = [
+        (IN_PROGRESS, 'In progress'),
+        (COMPLETED, 'Completed'),
+    ]
+
+    # Route plus a hash of the caller's credential, so keys from different callers never collide
+    scope = models.CharField(max_length=150)
+    key = models.CharField(max_length=255)
+    # Hash of the path parameters and body; a reused key with a different request is rejected
+    request_hash = models.CharField(max_length=64)
+    state = models.CharField(max_length=12, choices=STATES, default=IN_PROGRESS)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotencykey_unique_scope_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key} ({self.state})"
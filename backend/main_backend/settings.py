@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,6 +26,15 @@ SECRET_KEY = 'django-insecure-$^jgjf#w-anl_in=l)o*cly(+a3x7&de9y!xrm#cuc*k@c7!=q
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# HMAC key for stateless API access tokens (api/auth_service/tokens.py)
+ACCESS_TOKEN_SIGNING_KEY = os.environ.get('ACCESS_TOKEN_SIGNING_KEY', SECRET_KEY)
+
+# Outbound email (api/notification_service/transports.py). With no Sendinblue key
+# messages go to the console transport; "file" appends them to NOTIFICATION_FILE_PATH.
+SENDINBLUE_API_KEY = os.environ.get('SENDINBLUE_API_KEY')
+NOTIFICATION_TRANSPORT = os.environ.get('NOTIFICATION_TRANSPORT', 'sendinblue' if SENDINBLUE_API_KEY else 'console')
+NOTIFICATION_FILE_PATH = os.environ.get('NOTIFICATION_FILE_PATH', 'notifications.log')
+
 ALLOWED_HOSTS = ["*"]
 
 
@@ -34,6 +44,10 @@ INSTALLED_APPS = [
     'example_app.apps.ExampleAppConfig',
     'practiceapp.apps.PracticeappConfig',
     'platformuser.apps.PlatformuserConfig',
+    'authapp.apps.AuthappConfig',
+    'notificationapp.apps.NotificationappConfig',
+    'idempotencyapp.apps.IdempotencyappConfig',
+    'searchapp.apps.SearchappConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
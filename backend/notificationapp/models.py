@@ -0,0 +1,39 @@
+import uuid
+
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    """An email written in the same transaction as the change it reports, sent later by the dispatcher"""
+    PENDING = 'PENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+    STATES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    message_uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    kind = models.CharField(max_length=50)
+    recipient_email = models.EmailField(max_length=255)
+    recipient_name = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField()
+    state = models.CharField(max_length=10, choices=STATES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(null=True, blank=True)
+    # Set for messages that must be sent at most once, e.g. a given reminder for a booking
+    dedupe_key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The dispatcher polls for due PENDING rows
+            models.Index(fields=['state', 'next_attempt_at'], name='outbox_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.recipient_email} ({self.state})"
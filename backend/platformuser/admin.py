@@ -1,11 +1,13 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import PatientUser, PatientFamilyMember, PatientBooking
+from .models import PatientUser, PatientFamilyMember, PatientBooking, BookingHold, WaitlistEntry
 
 admin.site.register(PatientUser)
 admin.site.register(PatientFamilyMember)
 admin.site.register(PatientBooking)
+admin.site.register(BookingHold)
+admin.site.register(WaitlistEntry)
 
 # admin.site.register(Doctor)
 # admin.site.register(AvailabilitySlot)
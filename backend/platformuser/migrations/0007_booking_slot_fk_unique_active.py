@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def clean_booking_slots(apps, schema_editor):
+    """Make existing rows satisfy the new FK and unique constraint.
+
+    Slot UUIDs that match no AvailabilitySlot are nulled, and where several live
+    bookings share a practitioner/date/slot only the earliest stays active.
+    """
+    PatientBooking = apps.get_model('platformuser', 'PatientBooking')
+    AvailabilitySlot = apps.get_model('practiceapp', 'AvailabilitySlot')
+
+    known_slots = set(AvailabilitySlot.objects.values_list('availability_uuid', flat=True))
+    orphan_ids = [
+        booking_id
+        for booking_id, slot in PatientBooking.objects.exclude(booking_slot=None).values_list('id', 'booking_slot')
+        if slot not in known_slots
+    ]
+    PatientBooking.objects.filter(id__in=orphan_ids).update(booking_slot=None)
+
+    seen = set()
+    duplicate_ids = []
+    live_bookings = (
+        PatientBooking.objects
+        .filter(is_active=True, is_deleted=False)
+        .exclude(booking_slot=None)
+        .order_by('created_at', 'id')
+        .values_list('id', 'practitioner_id', 'booking_date', 'booking_slot')
+    )
+    for booking_id, *key in live_bookings:
+        key = tuple(key)
+        if key in seen:
+            duplicate_ids.append(booking_id)
+        else:
+            seen.add(key)
+    PatientBooking.objects.filter(id__in=duplicate_ids).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platformuser', '0006_remove_patientbooking_booking_status_and_more'),
+        ('practiceapp', '0015_backfill_calendar_slots'),
+    ]
+
+    operations = [
+        migrations.RunPython(clean_booking_slots, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='patientbooking',
+            name='booking_slot',
+            field=models.ForeignKey(blank=True, db_column='booking_slot', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='practiceapp.availabilityslot', to_field='availability_uuid'),
+        ),
+        migrations.AddConstraint(
+            model_name='patientbooking',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True), ('is_deleted', False)), fields=('practitioner', 'booking_date', 'booking_slot'), name='patientbooking_unique_active_slot'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:31
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platformuser', '0007_booking_slot_fk_unique_active'),
+        ('practiceapp', '0015_backfill_calendar_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hold_uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('hold_date', models.DateField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('hold_slot', models.ForeignKey(db_column='hold_slot', on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='practiceapp.availabilityslot', to_field='availability_uuid')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_holds', to='platformuser.patientuser')),
+                ('practitioner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_holds', to='practiceapp.practionerregistry')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('practitioner', 'hold_date', 'hold_slot'), name='bookinghold_unique_occurrence')],
+            },
+        ),
+    ]
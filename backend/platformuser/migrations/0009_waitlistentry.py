@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:33
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platformuser', '0008_bookinghold'),
+        ('practiceapp', '0015_backfill_calendar_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('waitlist_date', models.DateField()),
+                ('state', models.CharField(choices=[('WAITING', 'Waiting'), ('OFFERED', 'Offered'), ('BOOKED', 'Booked'), ('EXPIRED', 'Expired'), ('LEFT', 'Left')], default='WAITING', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('offered_hold', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='platformuser.bookinghold')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='platformuser.patientuser')),
+                ('practitioner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='practiceapp.practionerregistry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['practitioner', 'waitlist_date', 'state', 'created_at'], name='waitlist_queue')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('state', 'WAITING')), fields=('patient', 'practitioner', 'waitlist_date'), name='waitlist_unique_waiting')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platformuser', '0009_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientbooking',
+            name='series_uuid',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
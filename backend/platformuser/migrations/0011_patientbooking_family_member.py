@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platformuser', '0010_patientbooking_series_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientbooking',
+            name='family_member',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='platformuser.patientfamilymember'),
+        ),
+    ]
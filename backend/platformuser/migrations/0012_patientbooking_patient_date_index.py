@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platformuser', '0011_patientbooking_family_member'),
+        ('practiceapp', '0015_backfill_calendar_slots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientbooking',
+            index=models.Index(fields=['patient', 'booking_date', 'id'], name='patientbooking_patient_date'),
+        ),
+    ]
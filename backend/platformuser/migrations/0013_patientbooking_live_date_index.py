@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platformuser', '0012_patientbooking_patient_date_index'),
+        ('practiceapp', '0015_backfill_calendar_slots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientbooking',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_deleted', False)), fields=['booking_date'], name='patientbooking_live_date'),
+        ),
+    ]
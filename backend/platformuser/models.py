@@ -3,7 +3,7 @@ from django.utils.translation import gettext_lazy as _
 
 import uuid
 
-from practiceapp.models import PractionerRegistry, AppointmentType
+from practiceapp.models import PractionerRegistry, AppointmentType, AvailabilitySlot
 
 
 
@@ -55,17 +55,130 @@ class PatientBooking(models.Model):
     practitioner = models.ForeignKey(PractionerRegistry, on_delete=models.CASCADE)
     appointment = models.ForeignKey(AppointmentType, on_delete=models.CASCADE)
     booking_date = models.DateField(null=True, blank=True)
-    booking_slot = models.UUIDField(null=True, blank=True)
+    booking_slot = models.ForeignKey(
+        AvailabilitySlot,
+        to_field='availability_uuid',
+        db_column='booking_slot',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='bookings'
+    )
+    # Set when the account holder booked on behalf of one of their family members
+    family_member = models.ForeignKey(
+        PatientFamilyMember,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bookings'
+    )
     booking_notes = models.TextField(null=True, blank=True)
+    # Shared by every booking created from one recurring series request
+    series_uuid = models.UUIDField(null=True, blank=True, db_index=True)
     is_active = models.BooleanField(default=True)
     is_deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        constraints = [
+            # One live booking per practitioner slot occurrence; cancelled rows don't count
+            models.UniqueConstraint(
+                fields=['practitioner', 'booking_date', 'booking_slot'],
+                condition=models.Q(is_active=True, is_deleted=False),
+                name='patientbooking_unique_active_slot'
+            ),
+        ]
+        indexes = [
+            # Keyset pagination of a patient's history on (booking_date, id)
+            models.Index(fields=['patient', 'booking_date', 'id'], name='patientbooking_patient_date'),
+            # The reminder scheduler loads live bookings by date window at startup
+            models.Index(
+                fields=['booking_date'],
+                condition=models.Q(is_active=True, is_deleted=False),
+                name='patientbooking_live_date'
+            ),
+        ]
+    
     def __str__(self):
         return f"{self.patient.first_name} → {self.practitioner.display_name} on {self.booking_date}"
 
 
+
+class BookingHold(models.Model):
+    """A patient's short-lived claim on one slot occurrence while they finish checkout"""
+    hold_uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    patient = models.ForeignKey(PatientUser, on_delete=models.CASCADE, related_name='booking_holds')
+    practitioner = models.ForeignKey(PractionerRegistry, on_delete=models.CASCADE, related_name='booking_holds')
+    hold_slot = models.ForeignKey(
+        AvailabilitySlot,
+        to_field='availability_uuid',
+        db_column='hold_slot',
+        on_delete=models.CASCADE,
+        related_name='holds'
+    )
+    hold_date = models.DateField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # At most one hold row per occurrence; an expired row is deleted before a new hold
+            models.UniqueConstraint(fields=['practitioner', 'hold_date', 'hold_slot'], name='bookinghold_unique_occurrence'),
+        ]
+
+    def __str__(self):
+        return f"{self.patient.first_name} holds {self.practitioner.display_name} on {self.hold_date} until {self.expires_at}"
+
+
+
+class WaitlistEntry(models.Model):
+    """A patient queued for any slot of a practitioner on one date"""
+    WAITING = 'WAITING'
+    OFFERED = 'OFFERED'
+    BOOKED = 'BOOKED'
+    EXPIRED = 'EXPIRED'
+    LEFT = 'LEFT'
+    STATES = [
+        (WAITING, 'Waiting'),
+        (OFFERED, 'Offered'),
+        (BOOKED, 'Booked'),
+        (EXPIRED, 'Expired'),
+        (LEFT, 'Left'),
+    ]
+
+    entry_uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    patient = models.ForeignKey(PatientUser, on_delete=models.CASCADE, related_name='waitlist_entries')
+    practitioner = models.ForeignKey(PractionerRegistry, on_delete=models.CASCADE, related_name='waitlist_entries')
+    waitlist_date = models.DateField()
+    state = models.CharField(max_length=10, choices=STATES, default=WAITING)
+    offered_hold = models.OneToOneField(
+        BookingHold,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='waitlist_entry'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['patient', 'practitioner', 'waitlist_date'],
+                condition=models.Q(state='WAITING'),
+                name='waitlist_unique_waiting'
+            ),
+        ]
+        indexes = [
+            # Queue head lookup: practitioner + date + WAITING, oldest first
+            models.Index(fields=['practitioner', 'waitlist_date', 'state', 'created_at'], name='waitlist_queue'),
+        ]
+
+    def __str__(self):
+        return f"{self.patient.first_name} waiting for {self.practitioner.display_name} on {self.waitlist_date} ({self.state})"
+
+
 # class Booking(models.Model):
 #     """Stores a patient's appointment booking with a doctor."""
 
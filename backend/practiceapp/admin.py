@@ -2,11 +2,12 @@ from django.contrib import admin
 
 # Register your models here.
 
-from .models import PractionerUser, PracticeRegistry, PractionerRegistry, AppointmentType, AvailabilitySlot, PracticeMembers
+from .models import PractionerUser, PracticeRegistry, PractionerRegistry, AppointmentType, AvailabilitySlot, PracticeMembers, CalendarSlot
 
 admin.site.register(PractionerUser)
 admin.site.register(PractionerRegistry)
 admin.site.register(PracticeRegistry)
 admin.site.register(AppointmentType)
 admin.site.register(AvailabilitySlot)
-admin.site.register(PracticeMembers)
\ No newline at end of file
+admin.site.register(PracticeMembers)
+admin.site.register(CalendarSlot)
@@ -0,0 +1,67 @@
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Stored geohash length; 9 characters is a cell of roughly 5m x 5m
+GEOHASH_PRECISION = 9
+
+LATITUDE_KEYS = ("lat", "latitude")
+LONGITUDE_KEYS = ("lng", "lon", "long", "longitude")
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None
+
+
+def location_coordinates(location):
+    """(latitude, longitude) from a practice_location blob, or None when it has no usable point.
+
+    Accepts lat/lng style keys, optionally nested under "coordinates", and
+    GeoJSON points whose coordinates are [lng, lat].
+    """
+    if not isinstance(location, dict):
+        return None
+    coordinates = location.get("coordinates")
+    if isinstance(coordinates, (list, tuple)) and len(coordinates) >= 2:
+        latitude, longitude = _number(coordinates[1]), _number(coordinates[0])
+    elif isinstance(coordinates, dict):
+        return location_coordinates(coordinates)
+    else:
+        latitude = next((_number(location[key]) for key in LATITUDE_KEYS if key in location), None)
+        longitude = next((_number(location[key]) for key in LONGITUDE_KEYS if key in location), None)
+    if latitude is None or longitude is None:
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Interleave longitude and latitude bisection bits, five to a base32 character"""
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, value = (longitude_range, longitude) if even else (latitude_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            interval[0] = middle
+        else:
+            bits = bits * 2
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> tuple:
+    """(height, width) in degrees of a geohash cell; longitude takes the odd bit"""
+    total_bits = precision * 5
+    latitude_bits = total_bits // 2
+    longitude_bits = total_bits - latitude_bits
+    return 180.0 / 2 ** latitude_bits, 360.0 / 2 ** longitude_bits
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.practice_service.calendar import roll_calendar
+
+
+class Command(BaseCommand):
+    help = "Prune past CalendarSlot rows and materialize availability up to the calendar horizon (run nightly)"
+
+    def handle(self, *args, **options):
+        result = roll_calendar()
+        self.stdout.write(self.style.SUCCESS(
+            f"Calendar materialized through {result['through']} "
+            f"from {result['templates']} templates, pruned {result['pruned']} past rows"
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practiceapp', '0011_practicemembers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='practicemembers',
+            index=models.Index(fields=['user', 'is_active'], name='practicemember_user_active'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+import hashlib
+
+from django.db import migrations
+
+
+def backfill_members(apps, schema_editor):
+    """Give every practice owner, including legacy token-associated ones, an OWNER membership"""
+    PracticeRegistry = apps.get_model('practiceapp', 'PracticeRegistry')
+    PracticeMembers = apps.get_model('practiceapp', 'PracticeMembers')
+    PractionerUser = apps.get_model('practiceapp', 'PractionerUser')
+    PractionerSession = apps.get_model('authapp', 'PractionerSession')
+
+    for practice in PracticeRegistry.objects.all():
+        owner_id = practice.practice_owner_id
+        token = practice.practice_associated_with
+        if owner_id is None and token:
+            # The legacy association stored the creator's login token at the time
+            owner_id = (
+                PractionerUser.objects.filter(token=token).values_list('id', flat=True).first()
+                or PractionerSession.objects.filter(
+                    token_hash=hashlib.sha256(token.encode()).hexdigest()
+                ).values_list('user_id', flat=True).first()
+            )
+            if owner_id is None:
+                continue
+            practice.practice_owner_id = owner_id
+            practice.save(update_fields=['practice_owner'])
+        if owner_id is None:
+            continue
+
+        membership, created = PracticeMembers.objects.get_or_create(
+            practice=practice,
+            user_id=owner_id,
+            defaults={'role': 'OWNER', 'is_active': True},
+        )
+        if not created and (membership.role != 'OWNER' or not membership.is_active):
+            membership.role = 'OWNER'
+            membership.is_active = True
+            membership.save(update_fields=['role', 'is_active'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practiceapp', '0012_practicemembers_user_active_index'),
+        ('authapp', '0002_backfill_legacy_tokens'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_members, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practiceapp', '0013_backfill_practice_members'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot_date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('state', models.CharField(choices=[('OPEN', 'Open'), ('BOOKED', 'Booked')], default='OPEN', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('availability', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_slots', to='practiceapp.availabilityslot')),
+                ('practitioner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_slots', to='practiceapp.practionerregistry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['practitioner', 'slot_date', 'start_time'], name='calendarslot_prac_date')],
+                'constraints': [models.UniqueConstraint(fields=('availability', 'slot_date'), name='calendarslot_unique_occurrence')],
+            },
+        ),
+    ]
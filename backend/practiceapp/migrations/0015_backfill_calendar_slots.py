@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+# Frozen copy of CALENDAR_HORIZON_WEEKS at the time of this migration
+HORIZON_WEEKS = 12
+WEEKDAYS = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY']
+
+
+def backfill_calendar(apps, schema_editor):
+    """Materialize the calendar for every active template so reads can switch over immediately"""
+    AvailabilitySlot = apps.get_model('practiceapp', 'AvailabilitySlot')
+    CalendarSlot = apps.get_model('practiceapp', 'CalendarSlot')
+    PatientBooking = apps.get_model('platformuser', 'PatientBooking')
+
+    start = timezone.localdate()
+    end = start + timedelta(weeks=HORIZON_WEEKS) - timedelta(days=1)
+    booked = set(PatientBooking.objects.filter(
+        booking_date__range=[start, end],
+        is_active=True,
+        is_deleted=False
+    ).values_list('booking_slot', 'booking_date'))
+
+    rows = []
+    for slot in AvailabilitySlot.objects.filter(is_active=True):
+        day = start + timedelta(days=(WEEKDAYS.index(slot.day_of_week) - start.weekday()) % 7)
+        while day <= end:
+            rows.append(CalendarSlot(
+                practitioner_id=slot.practitioner_id,
+                availability_id=slot.id,
+                slot_date=day,
+                start_time=slot.start_time,
+                end_time=slot.end_time,
+                state='BOOKED' if (slot.availability_uuid, day) in booked else 'OPEN',
+            ))
+            day += timedelta(weeks=1)
+    CalendarSlot.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practiceapp', '0014_calendarslot'),
+        ('platformuser', '0006_remove_patientbooking_booking_status_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_calendar, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# Frozen copy of practiceapp/geo.py
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None
+
+
+def _coordinates(location):
+    if not isinstance(location, dict):
+        return None
+    coordinates = location.get("coordinates")
+    if isinstance(coordinates, (list, tuple)) and len(coordinates) >= 2:
+        latitude, longitude = _number(coordinates[1]), _number(coordinates[0])
+    elif isinstance(coordinates, dict):
+        return _coordinates(coordinates)
+    else:
+        latitude = next((_number(location[key]) for key in ("lat", "latitude") if key in location), None)
+        longitude = next((_number(location[key]) for key in ("lng", "lon", "long", "longitude") if key in location), None)
+    if latitude is None or longitude is None:
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def _geohash(latitude, longitude, precision=9):
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, value = (longitude_range, longitude) if even else (latitude_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            interval[0] = middle
+        else:
+            bits = bits * 2
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def backfill_location_point(apps, schema_editor):
+    """Historical models skip PracticeRegistry.save(), so derive the point here"""
+    PracticeRegistry = apps.get_model('practiceapp', 'PracticeRegistry')
+
+    practices = []
+    for practice in PracticeRegistry.objects.filter(practice_location__isnull=False).only('id', 'practice_location'):
+        coordinates = _coordinates(practice.practice_location)
+        if coordinates is None:
+            continue
+        practice.latitude, practice.longitude = coordinates
+        practice.geohash = _geohash(*coordinates)
+        practices.append(practice)
+    PracticeRegistry.objects.bulk_update(practices, ['latitude', 'longitude', 'geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practiceapp', '0016_practiceregistry_location_point'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_location_point, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 import uuid
+from .geo import location_coordinates, encode_geohash
  
 
 class PractionerUser(models.Model):
@@ -33,10 +34,29 @@ class PracticeRegistry(models.Model):
     opening_hours = models.JSONField(null=True, blank=True)
     
     practice_location = models.JSONField(null=True, blank=True)
+    # Derived from practice_location on save, for the nearby search
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    geohash = models.CharField(max_length=12, null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Nearby search scans geohash prefix ranges and reads the point from the index
+            models.Index(fields=['geohash', 'latitude', 'longitude'], name='practice_geohash_point'),
+        ]
 
     def __str__(self):
         return self.practice_name
 
+    def save(self, *args, **kwargs):
+        coordinates = location_coordinates(self.practice_location)
+        self.latitude, self.longitude = coordinates or (None, None)
+        self.geohash = encode_geohash(*coordinates) if coordinates else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'practice_location' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'geohash'}
+        super().save(*args, **kwargs)
+
 
 class PracticeMembers(models.Model):
     ROLE_CHOICES = [
@@ -53,6 +73,10 @@ class PracticeMembers(models.Model):
 
     class Meta:
         unique_together = ('practice', 'user')
+        indexes = [
+            # Effective-practice resolution filters on (user, is_active)
+            models.Index(fields=['user', 'is_active'], name='practicemember_user_active'),
+        ]
 
     def __str__(self):
         return f"{self.user.name} - {self.practice.practice_name} ({self.role})"
@@ -126,4 +150,34 @@ class AvailabilitySlot(models.Model):
         if self.start_time >= self.end_time:
             raise ValidationError('Start time must be before end time.')
     
-    
\ No newline at end of file
+    
+
+class CalendarSlot(models.Model):
+    """A concrete, dated occurrence of an AvailabilitySlot template, kept a fixed horizon ahead"""
+    OPEN = 'OPEN'
+    BOOKED = 'BOOKED'
+    STATES = [
+        (OPEN, 'Open'),
+        (BOOKED, 'Booked'),
+    ]
+
+    practitioner = models.ForeignKey(PractionerRegistry, on_delete=models.CASCADE, related_name='calendar_slots')
+    availability = models.ForeignKey(AvailabilitySlot, on_delete=models.CASCADE, related_name='calendar_slots')
+    slot_date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    state = models.CharField(max_length=10, choices=STATES, default=OPEN)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['availability', 'slot_date'], name='calendarslot_unique_occurrence'),
+        ]
+        indexes = [
+            # Availability reads are a range scan over (practitioner, date)
+            models.Index(fields=['practitioner', 'slot_date', 'start_time'], name='calendarslot_prac_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.practitioner.display_name} - {self.slot_date} {self.start_time}-{self.end_time} ({self.state})"
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.search_service.index import rebuild_index
+from api.search_service.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search index and practice facets (after bulk imports that bypass save signals)"
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+        facets = rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} documents and {facets} facet values"))
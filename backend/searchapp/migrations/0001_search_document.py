@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# Frozen copy of the document builders in api/search_service/index.py
+CREATE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_document USING fts5(
+        kind UNINDEXED, object_id UNINDEXED, practice_id UNINDEXED, title, body, tags,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+"""
+INSERT = (
+    "INSERT INTO search_document (rowid, kind, object_id, practice_id, title, body, tags) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s)"
+)
+
+
+def _flatten(value) -> str:
+    if value is None or isinstance(value, (bool, int, float)):
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(
+            key if isinstance(item, (bool, int, float)) else f"{key} {_flatten(item)}"
+            for key, item in value.items()
+            if item
+        )
+    return " ".join(_flatten(item) for item in value)
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 is SQLite-only; on other databases search stays disabled"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    PracticeRegistry = apps.get_model('practiceapp', 'PracticeRegistry')
+    PractionerRegistry = apps.get_model('practiceapp', 'PractionerRegistry')
+
+    documents = [
+        (practice.id * 2, 'practice', practice.id, practice.id,
+         practice.practice_name, practice.about_practice or '', _flatten(practice.facilities))
+        for practice in PracticeRegistry.objects.all()
+    ] + [
+        (practitioner.id * 2 + 1, 'practitioner', practitioner.id, practitioner.practioner_belong_to_id,
+         practitioner.display_name, _flatten(practitioner.professional_areas_of_interest), practitioner.profession)
+        for practitioner in PractionerRegistry.objects.filter(is_active=True)
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE)
+        cursor.executemany(INSERT, documents)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS search_document")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('practiceapp', '0015_backfill_calendar_slots'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('practiceapp', '0017_backfill_location_point'),
+        ('searchapp', '0001_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PracticeFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(choices=[('wheelchair', 'Wheelchair access'), ('facility', 'Facility'), ('language', 'Language spoken by a practitioner')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('practice', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='practiceapp.practiceregistry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['practice', 'name', 'value'], name='practicefacet_practice')],
+                'constraints': [models.UniqueConstraint(fields=('name', 'value', 'practice'), name='practicefacet_unique')],
+            },
+        ),
+    ]
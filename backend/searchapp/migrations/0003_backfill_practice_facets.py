@@ -0,0 +1,57 @@
+import re
+from collections import defaultdict
+
+from django.db import migrations
+
+# Frozen copy of the facet builders in api/search_service/facets.py
+LANGUAGE_SEPARATORS = re.compile(r"[,;/|&+]|\band\b", re.IGNORECASE)
+
+
+def _value(text):
+    return " ".join(str(text).split()).lower()[:100]
+
+
+def _facilities(facilities):
+    if isinstance(facilities, str):
+        names = facilities.split(",")
+    elif isinstance(facilities, dict):
+        names = [key for key, item in facilities.items() if item]
+    elif isinstance(facilities, list):
+        names = [item for item in facilities if isinstance(item, str)]
+    else:
+        names = []
+    return {_value(name) for name in names if name.strip()}
+
+
+def backfill_facets(apps, schema_editor):
+    PracticeRegistry = apps.get_model('practiceapp', 'PracticeRegistry')
+    PractionerRegistry = apps.get_model('practiceapp', 'PractionerRegistry')
+    PracticeFacet = apps.get_model('searchapp', 'PracticeFacet')
+
+    languages = defaultdict(set)
+    for practice_id, spoken in PractionerRegistry.objects.filter(is_active=True).values_list(
+        'practioner_belong_to_id', 'languages_spoken'
+    ):
+        languages[practice_id] |= {
+            _value(language) for language in LANGUAGE_SEPARATORS.split(spoken or "") if language.strip()
+        }
+
+    facets = []
+    for practice in PracticeRegistry.objects.only('id', 'facilities', 'wheel_chair_access'):
+        values = {('facility', value) for value in _facilities(practice.facilities)}
+        values |= {('language', value) for value in languages[practice.id]}
+        if practice.wheel_chair_access is not None:
+            values.add(('wheelchair', "true" if practice.wheel_chair_access else "false"))
+        facets.extend(PracticeFacet(practice_id=practice.id, name=name, value=value) for name, value in values)
+    PracticeFacet.objects.bulk_create(facets, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searchapp', '0002_practicefacet'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import models
+
+from practiceapp.models import PracticeRegistry
+
+
+class PracticeFacet(models.Model):
+    """One row per filterable value of a practice; kept in sync by searchapp.signals"""
+    WHEELCHAIR = 'wheelchair'
+    FACILITY = 'facility'
+    LANGUAGE = 'language'
+    NAME_CHOICES = [
+        (WHEELCHAIR, 'Wheelchair access'),
+        (FACILITY, 'Facility'),
+        (LANGUAGE, 'Language spoken by a practitioner'),
+    ]
+
+    # Covered by practicefacet_practice below
+    practice = models.ForeignKey(PracticeRegistry, on_delete=models.CASCADE, related_name='facets', db_index=False)
+    name = models.CharField(max_length=20, choices=NAME_CHOICES)
+    value = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            # Filters look up (name, value) and read practice ids straight from this index
+            models.UniqueConstraint(fields=['name', 'value', 'practice'], name='practicefacet_unique'),
+        ]
+        indexes = [
+            # Facet counts read the values of the matching practices
+            models.Index(fields=['practice', 'name', 'value'], name='practicefacet_practice'),
+        ]
+
+    def __str__(self):
+        return f"{self.practice_id} {self.name}={self.value}"
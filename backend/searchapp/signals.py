@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.search_service.index import (
+    PRACTICE, PRACTITIONER, delete_document, index_practice, index_practitioner
+)
+from api.search_service.facets import sync_practice_facets, unindex_practice_facets
+from api.search_service.autocomplete import autocomplete_index
+from practiceapp.models import PracticeRegistry, PractionerRegistry
+
+# The index and facets are written in the same transaction as the row they mirror,
+# and the in-memory autocomplete index is updated once it commits.
+# Bulk writes (bulk_create, queryset.update) bypass these; run rebuild_search_index after them.
+
+
+@receiver(post_save, sender=PracticeRegistry)
+def index_practice_on_save(sender, instance, **kwargs):
+    index_practice(instance)
+    sync_practice_facets(instance.id, instance)
+    practice_id, name, practice_uuid = instance.id, instance.practice_name, instance.practice_uuid
+    transaction.on_commit(lambda: autocomplete_index.set_practice(practice_id, name, practice_uuid))
+
+
+@receiver(post_delete, sender=PracticeRegistry)
+def unindex_practice_on_delete(sender, instance, **kwargs):
+    delete_document(PRACTICE, instance.id)
+    unindex_practice_facets(instance.id)
+    practice_id = instance.id
+    transaction.on_commit(lambda: autocomplete_index.remove_practice(practice_id))
+
+
+@receiver(post_save, sender=PractionerRegistry)
+def index_practitioner_on_save(sender, instance, **kwargs):
+    index_practitioner(instance)
+    sync_practice_facets(instance.practioner_belong_to_id)
+    practitioner_id = instance.id
+    if instance.is_active:
+        name, practitioner_uuid, profession = instance.display_name, instance.practitioner_uuid, instance.profession
+        transaction.on_commit(
+            lambda: autocomplete_index.set_practitioner(practitioner_id, name, practitioner_uuid, profession)
+        )
+    else:
+        transaction.on_commit(lambda: autocomplete_index.remove_practitioner(practitioner_id))
+
+
+@receiver(post_delete, sender=PractionerRegistry)
+def unindex_practitioner_on_delete(sender, instance, origin=None, **kwargs):
+    delete_document(PRACTITIONER, instance.id)
+    # Any other origin is a cascade that is deleting the practice, and its facet rows, too
+    if isinstance(origin, PractionerRegistry) or getattr(origin, 'model', None) is PractionerRegistry:
+        sync_practice_facets(instance.practioner_belong_to_id)
+    practitioner_id = instance.id
+    transaction.on_commit(lambda: autocomplete_index.remove_practitioner(practitioner_id))
@@ -10,6 +10,17 @@ from django.core.wsgi import get_wsgi_application
 from fastapi.middleware.wsgi import WSGIMiddleware
 from fastapi.staticfiles import StaticFiles
 from api.config import LOGGER_NAME
+from api.auth_service.utils import run_session_sweeper
+from api.auth_service.tokens import run_revocation_refresher
+from api.auth_service.passwords import password_hasher
+from api.patient_service.holds import run_hold_sweeper
+from api.notification_service.dispatcher import run_notification_dispatcher
+from api.notification_service.reminders import run_reminder_scheduler
+from api.idempotency_service.utils import run_idempotency_sweeper
+from api.search_service.facet_index import run_facet_index_refresher
+from api.search_service.autocomplete import run_autocomplete_refresher
+from contextlib import asynccontextmanager
+import asyncio
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main_backend.settings')
 os.environ.setdefault("DJANGO_CONFIGURATIN", "Localdev")
@@ -35,7 +46,27 @@ def configure_cors(app: FastAPI) -> None:
     )
 logger.info("STARTING SERVER")
 
-app = FastAPI(title=LOGGER_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background jobs owned by this worker
+    background_tasks = [
+        asyncio.create_task(run_session_sweeper()),
+        asyncio.create_task(run_revocation_refresher()),
+        asyncio.create_task(run_hold_sweeper()),
+        asyncio.create_task(run_notification_dispatcher()),
+        asyncio.create_task(run_reminder_scheduler()),
+        asyncio.create_task(run_idempotency_sweeper()),
+        asyncio.create_task(run_facet_index_refresher()),
+        asyncio.create_task(run_autocomplete_refresher()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    password_hasher.shutdown()
+
+
+app = FastAPI(title=LOGGER_NAME, lifespan=lifespan)
 configure_cors(app=app)
 
 
@@ -54,10 +54,7 @@ export default function PracticeDetailPage() {
                                 </span>
                             </div>
                             <div className="flex-1">
-                                <h1 className="text-3xl font-bold text-gray-900 mb-2">{currentPractice.practice_name}</h1>
-                                <p className="text-xl text-blue-600 font-medium mb-4">
-                                    {currentPractice.practice_associated_with}
-                                </p>
+                                <h1 className="text-3xl font-bold text-gray-900 mb-4">{currentPractice.practice_name}</h1>
                                 
                                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
                                     <div className="flex items-center space-x-3 text-gray-600">
@@ -88,7 +88,7 @@ const mockDoctors: Doctor[] = [
 
 export default function PracticePage() {
 
-  const { practices, loading, error, fetchAllPractices } = usePractice();
+  const { practices, loading, error, fetchAllPractices, fetchMorePractices, hasMorePractices } = usePractice();
   const router = useRouter();
   
   const [searchTerm, setSearchTerm] = useState("");
@@ -102,8 +102,7 @@ export default function PracticePage() {
 
   const filteredDoctors = practices?.filter(practice => {
     const matchesSearch = practice.practice_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         practice.practice_associated_with.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         practice.about_practice.toLowerCase().includes(searchTerm.toLowerCase());
+                         (practice.about_practice ?? '').toLowerCase().includes(searchTerm.toLowerCase());
     // Note: The practice data structure doesn't include gender or specialty fields
     // These filters are commented out until the data structure is updated
     // const matchesGender = !selectedGender || practice.gender === selectedGender;
@@ -246,6 +245,12 @@ export default function PracticePage() {
                 </CardContent>
               </Card>
             ))}
+
+            {hasMorePractices && (
+              <Button onClick={fetchMorePractices} variant="outline" className="w-full border-blue-200 text-blue-700">
+                Load more practices
+              </Button>
+            )}
           </div>
 
           {/* Top Doctors Sidebar */}
@@ -2,8 +2,10 @@ import axiosInstance from "@/utils/apiUtils";
 import { RootState } from "@/store";
 import { useDispatch, useSelector } from "react-redux";
 import { useEffect, useState } from "react";
-import { setAllPractices } from "@/store/app";
+import { setAllPractices, appendPractices, setPracticesNextCursor } from "@/store/app";
 
+// The default list fields plus about_practice, which the practice search filter matches on
+const PRACTICE_LIST_FIELDS = "id,practice_uuid,practice_name,phone_number,practice_website,wheel_chair_access,about_practice";
 
 
 export default function usePractice() {
@@ -12,6 +14,7 @@ export default function usePractice() {
     const [currentPractice, setCurrentPractice] = useState<any>(null);
     const [currentPractitioners, setCurrentPractitioners] = useState<any>(null);
     const practices = useSelector((state: RootState) => state.appService.all_practices);
+    const nextCursor = useSelector((state: RootState) => state.appService.practices_next_cursor);
 
 
     const dispatch = useDispatch();
@@ -19,9 +22,10 @@ export default function usePractice() {
 
     const fetchAllPractices = async () => {
         try {
-            const response = await axiosInstance.get('/patient/practices');
+            const response = await axiosInstance.get('/patient/practices', { params: { fields: PRACTICE_LIST_FIELDS } });
             if (response.status === 200) {
-                dispatch(setAllPractices(response.data));
+                dispatch(setAllPractices(response.data.results));
+                dispatch(setPracticesNextCursor(response.data.next_cursor));
             }
         } catch (error) {
             setError(error as string);
@@ -30,6 +34,19 @@ export default function usePractice() {
         }
     }
 
+    const fetchMorePractices = async () => {
+        if (!nextCursor) return;
+        try {
+            const response = await axiosInstance.get('/patient/practices', { params: { cursor: nextCursor, fields: PRACTICE_LIST_FIELDS } });
+            if (response.status === 200) {
+                dispatch(appendPractices(response.data.results));
+                dispatch(setPracticesNextCursor(response.data.next_cursor));
+            }
+        } catch (error) {
+            setError(error as string);
+        }
+    }
+
     const getCurrentPractice = async (practice_id: number) => {
         try {
             const response = await axiosInstance.get(`/patient/practice/${practice_id}`);
@@ -57,5 +74,5 @@ export default function usePractice() {
     }
 
 
-    return { practices, loading, error, fetchAllPractices, getCurrentPractice, currentPractice, getCurrentPractitioners, currentPractitioners };
+    return { practices, loading, error, fetchAllPractices, fetchMorePractices, hasMorePractices: !!nextCursor, getCurrentPractice, currentPractice, getCurrentPractitioners, currentPractitioners };
 }   
\ No newline at end of file
@@ -4,12 +4,13 @@ import { createSlice } from "@reduxjs/toolkit";
 interface AppState {
     isSidebarOpen: boolean;
     all_practices: any[];
-    
+    practices_next_cursor: string | null;
 }
 
 const initialState: AppState = {
     isSidebarOpen: false,
     all_practices: [],
+    practices_next_cursor: null,
 }
 
 const slice = createSlice({
@@ -22,9 +23,15 @@ const slice = createSlice({
         setAllPractices: (state, action) => {
             state.all_practices = action.payload;
         },
+        appendPractices: (state, action) => {
+            state.all_practices = [...state.all_practices, ...action.payload];
+        },
+        setPracticesNextCursor: (state, action) => {
+            state.practices_next_cursor = action.payload;
+        },
     },
 });
 
-export const { setSidebarOpen, setAllPractices } = slice.actions;
+export const { setSidebarOpen, setAllPractices, appendPractices, setPracticesNextCursor } = slice.actions;
 
 export default slice.reducer;
\ No newline at end of file